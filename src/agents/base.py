@@ -7,6 +7,7 @@ class SupportGameState(Protocol):
         self.board = None
 
     def legal_moves(self) -> list[str]: ...
+    def successors(self) -> list[tuple[str, list[list[int]], int]]: ...
     def clone(self) -> "SupportGameState": ...
     def step(self, move: str, spawn: bool = True): ...
 
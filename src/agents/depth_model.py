@@ -0,0 +1,146 @@
+# src/agents/depth_model.py
+"""
+Wybór głębokości expectimaxa pod limit opóźnienia (SLO) z modelu kosztu przeszukiwania.
+
+Dla każdej głębokości osobna regresja liniowa log(czasu ruchu w ms) na tanich cechach
+planszy: liczba pustych pól, liczba różnych kafelków, liczba legalnych ruchów. Koszt
+rośnie z głębokością mniej więcej wykładniczo w liczbie pustych pól (2 x puste dzieci
+każdego węzła losowego), więc w skali logarytmicznej model liniowy wystarcza.
+Rozrzut wokół regresji (odchylenie standardowe reszt w skali log) daje przewidywany
+kwantyl: p99 = exp(przewidywanie + 2.33 * sigma).
+
+select_depth wybiera najgłębszą głębokość, której przewidywany p99 mieści się w celu;
+gdy żadna się nie mieści - najpłytszą z modelu (nigdy głębiej niż max_depth). Próbki do dopasowania pochodzą
+z instrumentacji (run_experiment --search_stats --log_full_games, patrz
+src/scripts/fit_depth_model.py). Czas zależy od maszyny i opcji agenta, więc model
+dopasowuje się dla konfiguracji, z którą będzie używany.
+"""
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.game.state import make_state
+
+FEATURES: Tuple[str, ...] = ("empties", "distinct", "legal")
+# kwantyl 0.99 rozkładu normalnego
+P99_Z = 2.326
+# (głębokość, puste pola, różne kafelki, legalne ruchy, czas ruchu w ms)
+Sample = Tuple[int, int, int, int, float]
+
+
+def board_features(board: Sequence[Sequence[int]], legal: int) -> Tuple[int, int, int]:
+    """(puste pola, różne kafelki, legalne ruchy) - cechy modelu kosztu."""
+    tiles = [v for row in board for v in row]
+    distinct = len(set(tiles) - {0})
+    return tiles.count(0), distinct, legal
+
+
+class DepthCostModel:
+    def __init__(self, coefs: Dict[int, List[float]], sigmas: Dict[int, float], quantile_z: float = P99_Z) -> None:
+        """
+        :param coefs: głębokość -> współczynniki [wyraz wolny, *FEATURES] regresji log(ms)
+        :param sigmas: głębokość -> odchylenie standardowe reszt (skala log)
+        :param quantile_z: przewidywany kwantyl = exp(średnia + quantile_z * sigma)
+        """
+        self.coefs = {int(d): list(c) for d, c in coefs.items()}
+        self.sigmas = {int(d): float(s) for d, s in sigmas.items()}
+        self.quantile_z = quantile_z
+
+    @property
+    def depths(self) -> List[int]:
+        return sorted(self.coefs)
+
+    @classmethod
+    def fit(cls, samples: Iterable[Sample], min_samples: int = 20) -> "DepthCostModel":
+        """Regresja dla każdej głębokości z co najmniej `min_samples` próbkami."""
+        by_depth: Dict[int, List[Sample]] = {}
+        for sample in samples:
+            by_depth.setdefault(sample[0], []).append(sample)
+
+        coefs: Dict[int, List[float]] = {}
+        sigmas: Dict[int, float] = {}
+        for depth, rows in by_depth.items():
+            if len(rows) < min_samples:
+                continue
+            x = np.array([[1.0, e, d, l] for _, e, d, l, _ in rows])
+            # pomiary poniżej rozdzielczości zegara nie mogą dać log(0)
+            y = np.log(np.maximum([ms for *_, ms in rows], 1e-3))
+            coef, *_ = np.linalg.lstsq(x, y, rcond = None)
+            residuals = y - x @ coef
+            coefs[depth] = coef.tolist()
+            sigmas[depth] = float(residuals.std(ddof = min(len(rows) - 1, x.shape[1])))
+
+        if not coefs:
+            raise ValueError(f"Za mało próbek: potrzeba {min_samples} na głębokość")
+        return cls(coefs, sigmas)
+
+    def predict_ms(self, depth: int, features: Sequence[int], quantile: bool = True) -> float:
+        """Przewidywany czas ruchu (domyślnie kwantyl, np. p99) na głębokości `depth`."""
+        coef = self.coefs[depth]
+        mu = coef[0] + sum(c * f for c, f in zip(coef[1:], features))
+        if quantile:
+            mu += self.quantile_z * self.sigmas[depth]
+        return math.exp(mu)
+
+    def select_depth(self, features: Sequence[int], target_ms: float, max_depth: Optional[int] = None) -> int:
+        """
+        Najgłębsza głębokość (<= max_depth) z przewidywanym kwantylem <= target_ms.
+        Gdy wszystkie głębokości modelu przekraczają max_depth - max_depth.
+        """
+        depths = [d for d in self.depths if max_depth is None or d <= max_depth]
+        if not depths:
+            return min(self.depths[0], max_depth)
+        for depth in reversed(depths):
+            if self.predict_ms(depth, features) <= target_ms:
+                return depth
+        return depths[0]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "features": list(FEATURES),
+            "quantile_z": self.quantile_z,
+            "depths": {str(d): {"coef": self.coefs[d], "sigma": self.sigmas[d]} for d in self.depths},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "DepthCostModel":
+        if list(data.get("features", [])) != list(FEATURES):
+            raise ValueError(f"Model dla innych cech: {data.get('features')}")
+        depths = data["depths"]
+        return cls(
+            {int(d): v["coef"] for d, v in depths.items()},
+            {int(d): v["sigma"] for d, v in depths.items()},
+            quantile_z = float(data.get("quantile_z", P99_Z)),
+        )
+
+    def save(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents = True, exist_ok = True)
+        path.write_text(json.dumps(self.to_dict(), indent = 2), encoding = "utf-8")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "DepthCostModel":
+        return cls.from_dict(json.loads(Path(path).read_text(encoding = "utf-8")))
+
+
+def samples_from_log(path: Union[str, Path]) -> List[Sample]:
+    """
+    Próbki z logu gry (GameLogger) zapisanego z --search_stats: decyzja w kroku i
+    była podejmowana na planszy z kroku i - 1. Ruchy bez przeszukiwania (jedyny
+    legalny) i przerwane iteracje (limit czasu) są pomijane.
+    """
+    steps = json.loads(Path(path).read_text(encoding = "utf-8"))["steps"]
+    samples: List[Sample] = []
+    for prev, step in zip(steps, steps[1:]):
+        stats = step.get("search_stats")
+        if not stats or stats["depth"] == 0 or stats["timeouts"] or "move_time_s" not in step:
+            continue
+        board = prev["board"]
+        legal = len(make_state("bitboard", board = board, size = len(board)).legal_moves())
+        samples.append((stats["depth"], *board_features(board, legal), step["move_time_s"] * 1000.0))
+    return samples
@@ -0,0 +1,156 @@
+# src/agents/disk_cache.py
+"""
+Trwały (dyskowy) cache ocen heurystyki i wartości poddrzew expectimaxa.
+
+Dwa poziomy:
+- w procesie: LRU ocen agenta i tablica transpozycji w pamięci (TieredTable),
+- na dysku: DiskTable - tablica o układzie TranspositionTable w pliku mapowanym
+  do pamięci (mmap), współdzielona przez kolejne uruchomienia skryptów.
+
+Klucz wpisu na dysku to spakowana plansza zmieszana z hashem konfiguracji (config_hash):
+wag heurystyki dla ocen, a dla węzłów dodatkowo parametrów zmieniających ich wartości
+(min_prob, próbkowanie). Głębokość jest częścią wpisu jak w tablicy transpozycji,
+a ocena heurystyki to wpis o głębokości 0 z osobnym hashem. Rozmiar pliku jest stały
+(budżet w MB); przy braku miejsca wypierane są wpisy z najstarszych sesji, a spośród
+nich najpłytsze. Każde otwarcie pliku to nowa generacja (sesja).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+
+from src.agents.transposition import ENTRY_BYTES, MAX_NODE, TranspositionTable, _fold64, _table_size, pack_rows
+from src.game import bitboard as bb
+from src.heuristics.evaluate import DEFAULT_WEIGHTS
+
+_MAGIC = b"2048TT01"
+# magic, liczba slotów, okno próbkowania, generacja
+_HEADER = struct.Struct("<8sQQQ")
+_HEADER_BYTES = 64
+
+
+def config_hash(weights: Optional[Dict[str, float]] = None, **params) -> int:
+    """Stabilny (między procesami) 64-bitowy hash wag i parametrów wpływających na wartości."""
+    payload = {"weights": dict(weights or DEFAULT_WEIGHTS), **params}
+    digest = hashlib.blake2b(json.dumps(payload, sort_keys = True).encode(), digest_size = 8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def board_key(board) -> int:
+    """Spakowana plansza (bez sprowadzania do postaci kanonicznej)."""
+    if len(board) == 4:
+        return pack_rows(board)
+    return bb.get_engine(len(board)).pack_board(board)
+
+
+def salted(key: int, salt: int) -> int:
+    """Klucz na dysku: plansza i hash konfiguracji zwinięte do 64 bitów."""
+    return _fold64((key << 64) | salt)
+
+
+class DiskTable(TranspositionTable):
+    """
+    TranspositionTable w pliku mapowanym do pamięci. Plik o innym rozmiarze lub
+    formacie jest zakładany od nowa (to tylko cache).
+    """
+
+    def __init__(self, path: Union[str, Path], size_mb: float = 256.0, probe: int = 4) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents = True, exist_ok = True)
+        size = _table_size(size_mb, probe)
+        nbytes = _HEADER_BYTES + size * ENTRY_BYTES
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+        try:
+            header = os.pread(fd, _HEADER.size, 0)
+            fresh = (
+                    os.fstat(fd).st_size != nbytes
+                    or len(header) != _HEADER.size
+                    or _HEADER.unpack(header)[:3] != (_MAGIC, size, probe)
+            )
+            if fresh:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, nbytes)
+            self._mmap = mmap.mmap(fd, nbytes)
+        finally:
+            os.close(fd)
+
+        self._body = memoryview(self._mmap)[_HEADER_BYTES:]
+        super().__init__(size_mb, probe, buffer = self._body)
+        # każde otwarcie to nowa sesja: wpisy z poprzednich idą do wymiany jako pierwsze
+        self.generation = 1
+        if not fresh:
+            self.generation = _HEADER.unpack_from(self._mmap)[3]
+            self.new_search()
+        self._write_header()
+
+    def new_search(self) -> None:
+        super().new_search()
+        self._write_header()
+
+    def _write_header(self) -> None:
+        _HEADER.pack_into(self._mmap, 0, _MAGIC, self.size, self.probe, self.generation)
+
+    def flush(self) -> None:
+        self._mmap.flush()
+
+    def close(self) -> None:
+        if self._mmap is None:
+            return
+        self._write_header()
+        self._release()
+        self._body.release()
+        self._mmap.flush()
+        self._mmap.close()
+        self._mmap = None
+
+
+class TieredTable(TranspositionTable):
+    """
+    Tablica transpozycji w pamięci z drugim poziomem na dysku: chybienie w pamięci
+    sprawdza DiskTable, a każdy zapis trafia do obu poziomów.
+    """
+
+    def __init__(self, size_mb: float, disk: DiskTable, salt: int, probe: int = 4) -> None:
+        super().__init__(size_mb, probe)
+        self.disk = disk
+        self.salt = salt
+        self.disk_hits = 0
+
+    def lookup(self, key: int, kind: int, depth: int) -> Optional[float]:
+        v = super().lookup(key, kind, depth)
+        if v is None:
+            v = self.disk.lookup(salted(key, self.salt), kind, depth)
+            if v is not None:
+                self.disk_hits += 1
+                # tylko do pamięci - wpis na dysku już jest
+                super().store(key, kind, depth, v)
+        return v
+
+    def store(self, key: int, kind: int, depth: int, value: float) -> None:
+        super().store(key, kind, depth, value)
+        self.disk.store(salted(key, self.salt), kind, depth, value)
+
+    def stats(self) -> Dict[str, float]:
+        stats = super().stats()
+        stats["disk_hits"] = self.disk_hits
+        return stats
+
+
+def disk_evaluator(evaluate: Callable, disk: DiskTable, salt: int) -> Callable:
+    """Ocena planszy przez DiskTable: wpis o głębokości 0 pod kluczem (plansza, wagi)."""
+
+    def cached(board) -> float:
+        key = salted(board_key(board), salt)
+        v = disk.lookup(key, MAX_NODE, 0)
+        if v is None:
+            v = evaluate(board)
+            disk.store(key, MAX_NODE, 0, v)
+        return v
+
+    return cached
@@ -1,15 +1,41 @@
 from __future__ import annotations
 
+import math
+import random
+import threading
 import time
-from functools import lru_cache
+import weakref
+from functools import lru_cache, partial
 from typing import Optional, Tuple, Dict, Union, List
 
+import numpy as np
+
 from src.agents.base import Agent
+from src.agents.depth_model import DepthCostModel, board_features
+from src.agents.disk_cache import DiskTable, TieredTable, config_hash, disk_evaluator
 from src.agents.greedy import GreedyAgent
-from src.game.state import GameState
-from src.heuristics.evaluate import evaluate
+from src.agents.sampling import max_tile_position, sample_spawns
+from src.agents.search_stats import SearchStats
+from src.agents.time_manager import TimeManager
+from src.agents.transposition import CHANCE_NODE, MAX_NODE, TranspositionTable, pack_rows
+from src.game import bitboard as bb
+from src.game.batch import all_afterstates
+from src.game.state import ALLOWED_MOVES, GameState
+from src.game.symmetry import canonical, canonical_rows
+from src.heuristics.evaluate import evaluate_bounds, evaluate_exponents
+from src.heuristics.incremental import feature_breakdown
+from src.heuristics.table_eval import get_evaluator
+
+SEARCH_MODES: Tuple[str, ...] = ("copy", "inplace", "frontier")
+SAMPLE_STRATA: Tuple[str, ...] = ("none", "value", "distance", "both")
+PRUNING_MODES: Tuple[str, ...] = ("none", "star1", "star2")
+
+_INF = float("inf")
+_NIBBLES = np.arange(0, 64, 4, dtype = np.uint64)
+
 
-CacheKey = Tuple[Tuple[Tuple[int, ...], ...], str, int]
+class _SearchTimeout(Exception):
+    """Limit czasu minął w trakcie iteracji pogłębiania."""
 
 class ExpectimaxAgent(Agent):
     def __init__(
@@ -19,20 +45,184 @@ class ExpectimaxAgent(Agent):
             adaptive_depth_config: Optional[Dict[str, int]] = None,
             time_limit_ms: Optional[int] = None,
             greedy_fallback: Optional[GreedyAgent] = None,
-            cache_maxsize: int = 100000
+            cache_maxsize: int = 100000,
+            symmetry: bool = True,
+            eval_mode: str = "scalar",
+            incremental_eval: bool = True,
+            search: str = "copy",
+            tt_mb: float = 16.0,
+            min_prob: float = 0.0,
+            sample_threshold: Optional[int] = None,
+            sample_budget: int = 8,
+            sample_seed: int = 0,
+            sample_stratify: str = "none",
+            workers: int = 0,
+            pruning: str = "none",
+            disk_cache: Optional[DiskTable] = None,
+            time_manager: Optional[TimeManager] = None,
+            ponder: bool = False,
+            collect_stats: bool = False,
+            frontier_plies: int = 3,
+            depth_model: Optional[DepthCostModel] = None,
+            latency_target_ms: Optional[float] = None,
     ) -> None:
+        """
+        :param cache_maxsize: rozmiar cache'a ocen heurystyki (LRU)
+        :param tt_mb: budżet pamięci tablicy transpozycji (wartości węzłów MAX/CHANCE, patrz transposition)
+        :param min_prob: węzeł losowy, do którego prowadzi ścieżka o łącznym prawdopodobieństwie
+            spawnów < min_prob, jest oceniany heurystyką zamiast rozwijany (0 = wyłączone)
+        :param sample_threshold: węzeł losowy z liczbą pustych pól > próg rozwija tylko
+            `sample_budget` wylosowanych spawnów (nieobciążony estymator, patrz sampling); None = wyłączone
+        :param sample_seed: ziarno próbkowania (ta sama plansza i głębokość -> ta sama próbka)
+        :param sample_stratify: "none" | "value" (2/4) | "distance" (odległość od max kafelka) | "both"
+        :param symmetry: klucze cache'y to postać kanoniczna planszy (8 obrotów/odbić
+            dzieli jeden wpis); wartości expectimaxa i heurystyki są na nie niezmiennicze
+        :param eval_mode: "scalar" (evaluate) | "table" (tablice wierszy, patrz table_eval)
+        :param incremental_eval: w trybie "scalar" liście pod ostatnim węzłem losowym
+            oceniane są przyrostowo (tylko wiersz i kolumna nowego kafelka, patrz incremental)
+        :param time_limit_ms: limit czasu na ruch; włącza iteracyjne pogłębianie (patrz choose_move)
+        :param greedy_fallback: nieużywany od czasu iteracyjnego pogłębiania (zostawiony dla zgodności)
+        :param search: "copy" - węzły jako nowe stany z krotek, z cache'ami węzłów MAX/CHANCE |
+            "inplace" - jedna kopia stanu na ruch, przeszukiwana przez apply_move/place_tile + undo |
+            "frontier" - jak "copy", ale węzeł losowy z najwyżej `frontier_plies` (1-3) półruchami
+            do liści rozwijany jest wszerz na tablicach NumPy, a liście oceniane jednym wywołaniem
+            evaluate_exponents (patrz _frontier_value); plansze 4x4, cechy bazowe evaluate
+        :param workers: > 1 - węzły MAX na głębokości 2 liczone na puli tylu procesów ze wspólną
+            tablicą transpozycji w pamięci współdzielonej (patrz parallel; procesy robocze
+            przeszukują w trybie "copy"); 0 lub 1 = przeszukiwanie w jednym procesie
+        :param pruning: "none" | "star1" - odcinanie dzieci węzła losowego, gdy reszta masy
+            prawdopodobieństwa nie może już zmienić decyzji węzła MAX (z ograniczeń evaluate_bounds) |
+            "star2" - jak star1, plus sondowanie jednego ruchu każdego dziecka przed pełnym rozwinięciem;
+            tylko search="copy" w jednym procesie i cechy bazowe evaluate
+        :param disk_cache: otwarta DiskTable - drugi, trwały poziom za cache'em ocen i tablicą
+            transpozycji (patrz disk_cache); ten sam plik przyspiesza kolejne uruchomienia
+        :param time_manager: budżet czasu na grę / N ruchów rozdzielany według trudności pozycji
+            (patrz time_manager); zastępuje stały time_limit_ms
+        :param ponder: po zwróceniu ruchu wątek w tle przeszukuje możliwe spawny (najpierw
+            dwójki) i wypełnia wspólną tablicę transpozycji; kolejne choose_move zatrzymuje go
+            i korzysta z policzonych poddrzew (patrz _ponder); tylko w jednym procesie
+        :param depth_model: model kosztu przeszukiwania (patrz depth_model); z latency_target_ms
+            zastępuje adaptive_depth_config: głębokość to najgłębsza (<= max_depth), której
+            przewidywany p99 czasu ruchu mieści się w latency_target_ms; time_limit_ms dalej
+            obowiązuje jako twardy limit (iteracyjne pogłębianie), więc model dopasowany bez
+            limitu czasu przewiduje czas tylko wtedy, gdy time_limit_ms jest wyłączony albo
+            większy od latency_target_ms
+        :param collect_stats: statystyki każdego ruchu (węzły według głębokości, oceny,
+            trafienia cache'y, przerwane iteracje) w self.last_stats (patrz search_stats)
+        """
         self.weights = weights
         self.max_depth_fixed = max_depth
         self.adaptive_depth_config = adaptive_depth_config
+        if (depth_model is None) != (latency_target_ms is None):
+            raise ValueError("depth_model i latency_target_ms podaje się razem")
+        self.depth_model = depth_model
+        self.latency_target_ms = latency_target_ms
         self.time_limit_ms = time_limit_ms
-        self.greedy_fallback = greedy_fallback or GreedyAgent(
-            weights = weights, fallback = "up"
-        )
+        self.time_manager = time_manager
+        self.greedy_fallback = greedy_fallback
         self._deadline: Optional[float] = None
-        self._max_value_cached = lru_cache(maxsize = cache_maxsize)(self._max_value_inner)
-        self._chance_value_cached = lru_cache(maxsize = cache_maxsize)(self._chance_value_inner)
+        self.last_depth = 0
+        self.last_target_depth = 0
+        self._state_cls = GameState
+        self.symmetry = symmetry
+        self.eval_mode = eval_mode
+        self._evaluate = get_evaluator(weights, eval_mode)
+        if disk_cache is not None:
+            self._evaluate = disk_evaluator(self._evaluate, disk_cache, config_hash(weights))
+        self.incremental_eval = incremental_eval and eval_mode == "scalar"
+        if search not in SEARCH_MODES:
+            raise ValueError(f"Nieznany tryb przeszukiwania: {search}")
+        self.search = search
+        if search == "frontier":
+            if frontier_plies not in (1, 2, 3):
+                raise ValueError("frontier_plies musi być 1, 2 lub 3")
+            extra = set(weights or {}) - {"empty", "mono", "smooth", "corner"}
+            if any((weights or {}).get(name, 0.0) != 0.0 for name in extra):
+                raise ValueError(f"Ocena wektorowa nie obsługuje cech: {sorted(extra)}")
+        if frontier_plies == 3 and (sample_threshold is not None or min_prob > 0.0):
+            # węzły losowe drugiego poziomu rozwijane są w całości, bez próbkowania i odcięcia
+            frontier_plies = 2
+        self.frontier_plies = frontier_plies if search == "frontier" else 0
+        # ocena stosu plansz (N, 4, 4) w wykładnikach
+        self._evaluate_frontier = partial(evaluate_exponents, weights = weights)
+        # ocena heurystyki zależy tylko od planszy i wag, więc ten cache przeżywa kolejne ruchy
+        self._evaluate_cached = lru_cache(maxsize = cache_maxsize)(self._evaluate_inner)
+        # wartości węzłów zależą tylko od planszy, rodzaju węzła i pozostałej głębokości,
+        # więc tablica transpozycji przeżywa kolejne ruchy (i gry z tymi samymi wagami)
+        self.workers = workers
+        self._pool = None
+        if workers > 1 and disk_cache is not None:
+            raise ValueError("disk_cache działa tylko w jednym procesie (workers <= 1)")
+        if workers > 1 and ponder:
+            raise ValueError("ponder działa tylko w jednym procesie (workers <= 1)")
+        # opcje wpływające na wartości węzłów - kopie agenta (procesy robocze, ponder) liczą to samo
+        self._config = dict(
+            weights = weights, max_depth = max_depth, cache_maxsize = cache_maxsize,
+            symmetry = symmetry, eval_mode = eval_mode, incremental_eval = incremental_eval,
+            min_prob = min_prob, sample_threshold = sample_threshold, sample_budget = sample_budget,
+            sample_seed = sample_seed, sample_stratify = sample_stratify,
+            search = search, frontier_plies = frontier_plies, pruning = pruning,
+        )
+        if workers > 1:
+            from src.agents.parallel import SearchPool
+
+            self._pool = SearchPool(workers, self._config, tt_mb)
+            self.tt = self._pool.tt
+            # pula i segment pamięci współdzielonej są zwalniane także bez jawnego close()
+            self._close_pool = weakref.finalize(self, self._pool.close)
+        elif disk_cache is not None:
+            # wartości węzłów zależą od wag i od parametrów przycinania drzewa
+            salt = config_hash(
+                weights, min_prob = min_prob, sample_threshold = sample_threshold,
+                sample_budget = sample_budget, sample_seed = sample_seed, sample_stratify = sample_stratify,
+            )
+            self.tt = TieredTable(tt_mb, disk_cache, salt)
+        else:
+            self.tt = TranspositionTable(tt_mb)
+        if pruning not in PRUNING_MODES:
+            raise ValueError(f"Nieznany tryb odcinania: {pruning}")
+        if pruning != "none":
+            if search != "copy" or workers > 1:
+                raise ValueError("Odcinanie star1/star2 działa tylko z search='copy' w jednym procesie")
+            extra = set(weights or {}) - {"empty", "mono", "smooth", "corner"}
+            if any((weights or {}).get(name, 0.0) != 0.0 for name in extra):
+                raise ValueError(f"Brak ograniczeń heurystyki dla cech: {sorted(extra)}")
+        self.pruning = pruning
+        # (dolne, górne) ograniczenie wartości węzłów bieżącego ruchu (patrz _search_bounds)
+        self._bounds: Tuple[float, float] = (-_INF, _INF)
+        self.min_prob = min_prob
+        if sample_stratify not in SAMPLE_STRATA:
+            raise ValueError(f"Nieznany tryb warstw próbkowania: {sample_stratify}")
+        self.sample_threshold = sample_threshold
+        self.sample_budget = sample_budget
+        self.sample_seed = sample_seed
+        self.sample_stratify = sample_stratify
+        self.ponder = ponder
+        self._ponderer: Optional[ExpectimaxAgent] = None
+        self._ponder_thread: Optional[threading.Thread] = None
+        # spawny przeszukane w całości przez ostatnie pondering
+        self.last_pondered = 0
+        # bez statystyk metody węzłów zostają nietknięte
+        self.search_stats: Optional[SearchStats] = None
+        self.last_stats: Optional[Dict[str, object]] = None
+        if collect_stats:
+            self.search_stats = SearchStats()
+            self.search_stats.install(self)
 
     def choose_move(self, state: GameState) -> str:
+        """
+        Bez limitu czasu: jedno przeszukanie na pełną głębokość.
+        Z limitem: iteracyjne pogłębianie 1, 2, ..., głębokość docelowa, dopóki starcza czasu;
+        wynikiem jest najlepszy ruch z najgłębszej w pełni zakończonej iteracji
+        (przerwana iteracja jest odrzucana w całości). Osiągnięta głębokość -> self.last_depth.
+        Z time_manager limit ruchu i decyzja o kolejnej iteracji pochodzą z niego.
+        Jedyny legalny ruch jest zwracany od razu (last_depth = 0).
+        """
+        start = time.perf_counter()
+        self._stop_pondering()
+        stats = self.search_stats
+        if stats is not None:
+            stats.begin(self)
         self._deadline = (
             time.perf_counter() + ( self.time_limit_ms / 1000.0 )
 
@@ -40,147 +230,759 @@ class ExpectimaxAgent(Agent):
             else None
         )
 
-        self._max_value_cached.cache_clear()
-        self._chance_value_cached.cache_clear()
+        self.tt.new_search()
+
+        # węzły przeszukiwania tworzymy w tym samym backendzie co stan wejściowy
+        self._state_cls = type(state)
 
         current_max_depth = self._get_adaptive_depth(state)
+        self.last_depth = 0
+        self.last_target_depth = current_max_depth
+        if self.pruning != "none":
+            self._bounds = self._search_bounds(state, current_max_depth)
 
-        best_move = None
-        best_val = float("-inf")
-        moves = state.legal_moves()
+        successors = state.successors()
 
-        if not moves:
+        if not successors:
+            if stats is not None:
+                self.last_stats = stats.end(self, 0)
             return "up"
 
-        scored_moves: List[Tuple[float, str]] = []
-        for move in moves:
-            ns = state.clone()
-            ns.step(move, spawn = False)
-            score = evaluate(ns.board, self.weights)
-            scored_moves.append((score, move))
+        tm = self.time_manager
+        if tm is not None:
+            hard_ms = tm.start_move(state.board, len(successors), state.empty_count())
+            self._deadline = start + hard_ms / 1000.0
+
+        # jedyny legalny ruch nie wymaga przeszukiwania
+        if len(successors) == 1:
+            if tm is not None:
+                tm.end_move((time.perf_counter() - start) * 1000.0)
+            if stats is not None:
+                self.last_stats = stats.end(self, 0)
+            self._start_pondering(successors[0][1])
+            return successors[0][0]
+
+        order = self._root_order(successors)
+
+        # głębokość 1 = ocena stanów po ruchu, czyli dokładnie kolejność z _root_order
+        best_move = order[0][0]
+        self.last_depth = 1
+
+        if self._deadline is None:
+            depths = range(current_max_depth, current_max_depth + 1) if current_max_depth > 1 else range(0)
+        else:
+            depths = range(2, current_max_depth + 1)
+
+        for depth_limit in depths:
+            try:
+                values = self._search_root(state, order, depth_limit)
+            except _SearchTimeout:
+                if stats is not None:
+                    stats.timeouts += 1
+                break
+
+            best_idx = max(range(len(values)), key = values.__getitem__)
+            best_move = order[best_idx][0]
+            self.last_depth = depth_limit
+
+            # kolejna iteracja zaczyna od ruchów najlepszych w tej (stabilnie, remisy bez zmian)
+            ranked = sorted(range(len(values)), key = lambda i: values[i], reverse = True)
+            order = [order[i] for i in ranked]
+
+            if tm is not None and not tm.should_continue((time.perf_counter() - start) * 1000.0, values):
+                break
+
+        if tm is not None:
+            tm.end_move((time.perf_counter() - start) * 1000.0)
+
+        if stats is not None:
+            self.last_stats = stats.end(self, self.last_depth)
+        self._start_pondering(next(board for move, board, _ in successors if move == best_move))
+        return best_move
+
+    def close(self) -> None:
+        """Zatrzymuje pondering i pulę procesów roboczych, zwalnia współdzieloną tablicę transpozycji."""
+        self._stop_pondering()
+        if self._pool is not None:
+            self._close_pool()
+
+    def _root_order(self, successors) -> List[Tuple[str, List[List[int]]]]:
+        """Ruchy korzenia (ruch, plansza) od najlepszej oceny statycznej (stabilnie)."""
+        scored_moves: List[Tuple[float, str, List[List[int]]]] = []
+        for move, board, _ in successors:
+            score = self._evaluate_cached(self._key(self._board_to_tuple(board)))
+            scored_moves.append((score, move, board))
 
         scored_moves.sort(key = lambda x: x[0], reverse = True)
+        return [(move, board) for _, move, board in scored_moves]
+
+    def _start_pondering(self, board: List[List[int]]) -> None:
+        """Uruchamia pondering dla planszy po wybranym ruchu (przed spawnem)."""
+        if not self.ponder:
+            return
+        if self._ponderer is None:
+            # osobny agent, bo termin i stan przeszukiwania są per wątek;
+            # tablica transpozycji i cache ocen są wspólne
+            ponderer = ExpectimaxAgent(
+                **self._config, adaptive_depth_config = self.adaptive_depth_config,
+                depth_model = self.depth_model, latency_target_ms = self.latency_target_ms, tt_mb = 0,
+            )
+            ponderer.tt = self.tt
+            ponderer._evaluate_cached = self._evaluate_cached
+            self._ponderer = ponderer
+        self._ponderer._deadline = None
+        self._ponderer._state_cls = self._state_cls
+        self.last_pondered = 0
+        self._ponder_thread = threading.Thread(
+            target = self._ponder, args = (self._board_to_tuple(board),), daemon = True
+        )
+        self._ponder_thread.start()
+
+    def _stop_pondering(self) -> None:
+        """Przerywa pondering (najbliższe _check_deadline wątku rzuca _SearchTimeout) i czeka na wątek."""
+        if self._ponder_thread is None:
+            return
+        self._ponderer._deadline = 0.0
+        self._ponder_thread.join()
+        self._ponder_thread = None
+
+    def _ponder(self, board_tuple: Tuple[Tuple[int, ...], ...]) -> None:
+        """
+        Przeszukuje plansze po każdym możliwym spawnie - najpierw dwójki (p = 0.9), potem
+        czwórki - na głębokość, którą wybierze dla nich choose_move. Wartości trafiają do
+        tablicy transpozycji (wpis głębszy obsługuje też płytsze iteracje pogłębiania),
+        więc gdy spawn się zgadza, kolejny ruch czyta gotowe wartości korzenia, a gdy
+        pondering nie zdążył, korzysta z policzonych już poddrzew. Bez new_search:
+        generacja należy do przeszukiwania właściwego.
+        """
+        agent = self._ponderer
+        empties = [(r, c) for r, row in enumerate(board_tuple) for c, v in enumerate(row) if v == 0]
+
+        try:
+            for value in (2, 4):
+                for r, c in empties:
+                    state = agent._state_cls.from_rows(agent._place_tile(board_tuple, r, c, value))
+                    successors = state.successors()
+                    depth_limit = agent._get_adaptive_depth(state)
+                    if len(successors) > 1 and depth_limit > 1:
+                        if agent.pruning != "none":
+                            agent._bounds = agent._search_bounds(state, depth_limit)
+                        agent._search_root(state, agent._root_order(successors), depth_limit)
+                    self.last_pondered += 1
+        except _SearchTimeout:
+            pass
+
+    def _search_root(self, state: GameState, order: List[Tuple[str, List[List[int]]]], depth_limit: int) -> List[float]:
+        """Wartości ruchów z `order` dla jednej głębokości; _SearchTimeout przerywa całą iterację."""
+        # przy płytszych iteracjach komunikacja z pulą kosztuje więcej niż samo przeszukiwanie
+        if self._pool is not None and depth_limit >= 3:
+            return self._search_root_parallel(order, depth_limit)
+
+        if self.pruning != "none":
+            # ruchy są posortowane od najlepszego, więc alpha szybko rośnie
+            values = []
+            alpha = -_INF
+            for i, (_, board) in enumerate(order):
+                self._check_deadline()
+                board_tuple = self._board_to_tuple(board)
+                if i and self.pruning == "star2":
+                    # okno zerowe: tylko "czy ruch jest lepszy od alpha?"; skończona beta
+                    # pozwala sondowaniu Star2 odcinać od góry, a pełne przeszukanie
+                    # (na wypełnionej już tablicy) dostają tylko ruchy, które ją przekroczą
+                    v = self._chance_value_star(board_tuple, depth_limit, 1, alpha, math.nextafter(alpha, _INF))
+                    if v > alpha:
+                        v = self._chance_value_star(board_tuple, depth_limit, 1, alpha, _INF)
+                else:
+                    v = self._chance_value_star(board_tuple, depth_limit, 1, alpha, _INF)
+                values.append(v)
+                alpha = max(alpha, v)
+            return values
+
+        # make/unmake: jedna kopia na iterację, więc partia (i stos cofania wejścia) zostają nietknięte
+        work = state.clone() if self.search == "inplace" else None
+        values: List[float] = []
+
+        for move, board in order:
+            self._check_deadline()
+
+            if work is not None:
+                work.apply_move(move)
+                values.append(self._chance_value_inplace(work, depth_limit, 1))
+                work.undo()
+            else:
+                values.append(self._chance_value(self._board_to_tuple(board), depth_limit, 1))
+
+        return values
+
+    def _search_root_parallel(self, order: List[Tuple[str, List[List[int]]]], depth_limit: int) -> List[float]:
+        """
+        Węzły losowe korzenia rozwijane lokalnie (jak w _chance_value_inner), a ich dzieci -
+        węzły MAX na głębokości 2 - liczone razem na puli procesów. Wartości składane są
+        w tej samej kolejności co w przeszukiwaniu sekwencyjnym.
+        """
+        self._check_deadline()
+        remaining = depth_limit - 1
+        # na ruch: gotowa wartość albo (klucz, wyniki spawnu (waga, plansza, prawd.), dzielnik)
+        plans: List[Union[float, Tuple[int, List[Tuple[float, Tuple[Tuple[int, ...], ...], float]], float]]] = []
+
+        for _, board in order:
+            board_tuple = self._board_to_tuple(board)
+            key = self._tt_key(board_tuple)
+            v = self.tt.lookup(key, CHANCE_NODE, remaining)
+            if v is not None:
+                plans.append(v)
+                continue
+
+            state = self._state_cls.from_rows(board_tuple)
+            if state.is_terminal():
+                plans.append(self._evaluate_cached(self._key(board_tuple)))
+                continue
+
+            empties = state.empty_cells()
+            if not empties:
+                outcomes = [(1.0, board_tuple, 1.0)]
+                divisor = 1.0
+            elif self._should_sample(empties):
+                outcomes = [
+                    (w, self._place_tile(board_tuple, r, c, v), (0.9 if v == 2 else 0.1) / len(empties))
+                    for w, r, c, v in self._spawn_sample(board_tuple, empties, 1)
+                ]
+                divisor = 1.0
+            else:
+                outcomes = []
+                for (r, c) in empties:
+                    outcomes.append((0.9, self._place_tile(board_tuple, r, c, 2), 0.9 / len(empties)))
+                    outcomes.append((0.1, self._place_tile(board_tuple, r, c, 4), 0.1 / len(empties)))
+                divisor = float(len(empties))
+            plans.append((key, outcomes, divisor))
+
+        pending = [plan for plan in plans if isinstance(plan, tuple)]
+        boards = [b for _, outcomes, _ in pending for _, b, _ in outcomes]
+        probs = [p for _, outcomes, _ in pending for _, _, p in outcomes]
+        deadline = None if self._deadline is None else time.time() + (self._deadline - time.perf_counter())
+        results = iter(self._pool.max_values(self._state_cls, boards, probs, depth_limit, deadline))
+
+        values: List[float] = []
+        for plan in plans:
+            if not isinstance(plan, tuple):
+                values.append(plan)
+                continue
+
+            key, outcomes, divisor = plan
+            expected = 0.0
+            for w, _, _ in outcomes:
+                v = next(results)
+                if v is None:
+                    raise _SearchTimeout
+                expected += w * v
+            # bez pustych pól i przy próbkowaniu dzielnik 1.0 nie zmienia wyniku
+            v = expected / divisor
+            self.tt.store(key, CHANCE_NODE, remaining, v)
+            values.append(v)
+
+        return values
+
+    def _max_value(self, board_tuple: Tuple[Tuple[int, ...], ...], max_depth_limit: int, depth: int, prob: float = 1.0) -> float:
+        remaining = max_depth_limit - depth
+        if remaining <= 0:
+            return self._evaluate_cached(self._key(board_tuple))
+
+        key = self._tt_key(board_tuple)
+        v = self.tt.lookup(key, MAX_NODE, remaining)
+        if v is None:
+            v = self._max_value_inner(board_tuple, max_depth_limit, depth, prob)
+            self.tt.store(key, MAX_NODE, remaining, v)
+        return v
 
-        for score, move in scored_moves:
-            if self._timed_out():
-                return self.greedy_fallback.choose_move(state)
+    def _chance_value(self, board_tuple: Tuple[Tuple[int, ...], ...], max_depth_limit: int, depth: int, prob: float = 1.0) -> float:
+        remaining = max_depth_limit - depth
+        # odcięcie po prawdopodobieństwie nie trafia do tablicy transpozycji
+        if remaining <= 0 or prob < self.min_prob:
+            return self._evaluate_cached(self._key(board_tuple))
+
+        key = self._tt_key(board_tuple)
+        v = self.tt.lookup(key, CHANCE_NODE, remaining)
+        if v is None:
+            v = self._chance_value_inner(board_tuple, max_depth_limit, depth, prob)
+            self.tt.store(key, CHANCE_NODE, remaining, v)
+        return v
 
-            ns = state.clone()
-            ns.step(move, spawn = False)
+    def _max_value_inner(self, board_tuple: Tuple[Tuple[int, ...], ...], max_depth_limit: int, depth: int, prob: float) -> float:
+        state = self._state_cls.from_rows(board_tuple)
 
-            board_tuple = self._board_to_tuple(ns.board)
-            val = self._chance_value_cached(board_tuple, "CHANCE", current_max_depth, depth = 1)
+        if self._cutoff(state, depth, max_depth_limit):
+            return self._evaluate_cached(self._key(board_tuple))
 
-            if val > best_val:
-                best_val = val
-                best_move = move
+        successors = state.successors()
 
-        return best_move or "up"
+        if not successors:
+            return self._evaluate_cached(self._key(board_tuple))
 
+        v = float("-inf")
 
-    def _max_value(self, state, depth: int) -> float:
-        if self._cutoff(state, depth):
-            return evaluate(state.board, self.weights)
+        for move, board, _ in successors:
+            self._check_deadline()
+            v = max(v, self._chance_value(self._board_to_tuple(board), max_depth_limit, depth + 1, prob))
 
-        moves = state.legal_moves()
+        return v
 
-        if not moves:
-            return evaluate(state.board, self.weights)
 
-        v = float("-inf")
+    def _chance_value_inner(self, board_tuple: Tuple[Tuple[int, ...], ...], max_depth_limit: int, depth: int, prob: float) -> float:
+        state = self._state_cls.from_rows(board_tuple)
 
-        for move in moves:
-            if self._timed_out():
-                return evaluate(state.board, self.weights)
+        if self._cutoff(state, depth, max_depth_limit):
+            return self._evaluate_cached(self._key(board_tuple))
 
-            ns = state.clone()
-            ns.step(move, spawn = False)
-            v = max(v, self._chance_value(ns, depth + 1))
+        empties = state.empty_cells()
 
-        return v
+        if not empties:
+            return self._max_value(board_tuple, max_depth_limit, depth + 1, prob)
 
-    def _max_value_inner(self, board_tuple: Tuple[Tuple[int, ...], ...], node_type: str, max_depth_limit: int, depth: int) -> float:
-        state = GameState(board = self._tuple_to_board(board_tuple))
+        if self.frontier_plies and depth + self.frontier_plies >= max_depth_limit and len(board_tuple) == 4:
+            return self._frontier_value(board_tuple, empties, max_depth_limit - depth, depth)
 
-        if self._cutoff(state, depth, max_depth_limit):
-            return evaluate(state.board, self.weights)
+        if self.incremental_eval and depth + 1 >= max_depth_limit:
+            return self._chance_leaf_value(board_tuple, empties)
 
-        moves = state.legal_moves()
+        if self._should_sample(empties):
+            expected = 0.0
+            for w, r, c, v in self._spawn_sample(board_tuple, empties, depth):
+                self._check_deadline()
+                child_prob = prob * (0.9 if v == 2 else 0.1) / len(empties)
+                expected += w * self._max_value(self._place_tile(board_tuple, r, c, v), max_depth_limit, depth + 1, child_prob)
+            return expected
 
-        if not moves:
-            return evaluate(state.board, self.weights)
+        expected = 0.0
+        prob_2 = prob * 0.9 / len(empties)
+        prob_4 = prob * 0.1 / len(empties)
 
-        v = float("-inf")
+        for (r, c) in empties:
+            self._check_deadline()
 
-        for move in moves:
-            if self._timed_out():
-                return evaluate(state.board, self.weights)
+            # kafelek 2
+            expected += 0.9 * self._max_value(self._place_tile(board_tuple, r, c, 2), max_depth_limit, depth + 1, prob_2)
 
-            ns = state.clone()
-            ns.step(move, spawn = False)
+            # kafelek 4
+            expected += 0.1 * self._max_value(self._place_tile(board_tuple, r, c, 4), max_depth_limit, depth + 1, prob_4)
 
-            next_board_tuple = self._board_to_tuple(ns.board)
-            v = max(v, self._chance_value_cached(next_board_tuple, "CHANCE", max_depth_limit, depth + 1))
+        return expected / float(len(empties))
 
-        return v
+    def _search_bounds(self, state: GameState, depth_limit: int) -> Tuple[float, float]:
+        """
+        Ograniczenia wartości wszystkich węzłów przeszukiwania z tego stanu: każda wartość to
+        średnia ważona ocen liści, a liść jest co najwyżej depth_limit // 2 spawnów dalej.
+        Ruch nie zmniejsza liczby pustych pól, a spawn zmniejsza ją o 1; suma kafelków rośnie
+        najwyżej o 4 na spawn, więc największy kafelek <= suma + 4 * spawny.
+        """
+        spawns = depth_limit // 2
+        total = sum(sum(row) for row in state.board)
+        return evaluate_bounds(
+            self.weights,
+            size = len(state.board),
+            max_exp = (total + 4 * spawns).bit_length() - 1,
+            min_empty = max(0, state.empty_count() - spawns),
+        )
 
+    def _max_value_star(
+            self, board_tuple: Tuple[Tuple[int, ...], ...], max_depth_limit: int, depth: int,
+            alpha: float, beta: float, prob: float = 1.0,
+    ) -> float:
+        """
+        _max_value z oknem (alpha, beta). Wynik <= alpha lub >= beta jest tylko ograniczeniem
+        wartości, więc do tablicy transpozycji trafiają wyłącznie wartości dokładne.
+        """
+        remaining = max_depth_limit - depth
+        if remaining <= 0:
+            return self._evaluate_cached(self._key(board_tuple))
+
+        key = self._tt_key(board_tuple)
+        v = self.tt.lookup(key, MAX_NODE, remaining)
+        if v is not None:
+            return v
+
+        state = self._state_cls.from_rows(board_tuple)
+        successors = None if self._cutoff(state, depth, max_depth_limit) else state.successors()
+
+        if not successors:
+            v = self._evaluate_cached(self._key(board_tuple))
+            self.tt.store(key, MAX_NODE, remaining, v)
+            return v
+
+        best = -_INF
+        for move, board, _ in successors:
+            self._check_deadline()
+            v = self._chance_value_star(self._board_to_tuple(board), max_depth_limit, depth + 1, max(alpha, best), beta, prob)
+            if v > best:
+                best = v
+                if best >= beta:
+                    return best
+
+        # best > alpha: dziecko z best przekroczyło swoje okno od dołu, więc jest dokładne
+        if best > alpha:
+            self.tt.store(key, MAX_NODE, remaining, best)
+        return best
+
+    def _chance_value_star(
+            self, board_tuple: Tuple[Tuple[int, ...], ...], max_depth_limit: int, depth: int,
+            alpha: float, beta: float, prob: float = 1.0,
+    ) -> float:
+        """_chance_value z oknem (alpha, beta); dzieci odcinane według Star1 (i sondowania Star2)."""
+        remaining = max_depth_limit - depth
+        if remaining <= 0 or prob < self.min_prob:
+            return self._evaluate_cached(self._key(board_tuple))
+
+        key = self._tt_key(board_tuple)
+        v = self.tt.lookup(key, CHANCE_NODE, remaining)
+        if v is not None:
+            return v
+
+        state = self._state_cls.from_rows(board_tuple)
 
-    def _chance_value(self, state, depth: int) -> float:
-        if self._cutoff(state, depth):
-            return evaluate(state.board, self.weights)
+        if self._cutoff(state, depth, max_depth_limit):
+            v = self._evaluate_cached(self._key(board_tuple))
+            self.tt.store(key, CHANCE_NODE, remaining, v)
+            return v
 
         empties = state.empty_cells()
 
         if not empties:
-            return self._max_value(state, depth + 1)
+            v = self._max_value_star(board_tuple, max_depth_limit, depth + 1, alpha, beta, prob)
+            if alpha < v < beta:
+                self.tt.store(key, CHANCE_NODE, remaining, v)
+            return v
+
+        if self.incremental_eval and depth + 1 >= max_depth_limit:
+            v = self._chance_leaf_value(board_tuple, empties)
+            self.tt.store(key, CHANCE_NODE, remaining, v)
+            return v
+
+        # (waga, plansza dziecka, prawdopodobieństwo ścieżki); wartość = suma wag * wartości / dzielnik
+        if self._should_sample(empties):
+            outcomes = [
+                (w, self._place_tile(board_tuple, r, c, v), prob * (0.9 if v == 2 else 0.1) / len(empties))
+                for w, r, c, v in self._spawn_sample(board_tuple, empties, depth)
+            ]
+            divisor = 1.0
+        else:
+            prob_2 = prob * 0.9 / len(empties)
+            prob_4 = prob * 0.1 / len(empties)
+            outcomes = []
+            for (r, c) in empties:
+                outcomes.append((0.9, self._place_tile(board_tuple, r, c, 2), prob_2))
+                outcomes.append((0.1, self._place_tile(board_tuple, r, c, 4), prob_4))
+            divisor = float(len(empties))
+
+        v, exact = self._star_expectation(outcomes, divisor, max_depth_limit, depth, alpha, beta)
+        if exact:
+            self.tt.store(key, CHANCE_NODE, remaining, v)
+        return v
 
-        expected = 0.0
+    def _star_expectation(
+            self,
+            outcomes: List[Tuple[float, Tuple[Tuple[int, ...], ...], float]],
+            divisor: float,
+            max_depth_limit: int,
+            depth: int,
+            alpha: float,
+            beta: float,
+    ) -> Tuple[float, bool]:
+        """
+        Star1: po policzeniu części dzieci wartość węzła leży w
+        [suma + reszta masy * L, suma + reszta masy * U], gdzie L, U to ograniczenia wartości dziecka.
+        Jeśli ten przedział leży poza oknem (alpha, beta), pozostałe dzieci są pomijane.
+        Każde dziecko dostaje okno, poza którym jego wartość na pewno przesunęłaby rodzica poza okno.
+        Star2: przed pełnym rozwinięciem dolnym ograniczeniem dziecka (węzła MAX) jest wartość
+        jego najlepszego statycznie ruchu; już samo to może dać odcięcie od góry. Skończona beta
+        pojawia się tylko przy teście zerowym oknem w korzeniu (patrz _search_root).
+        Zwraca (wartość, czy dokładna) - przy odcięciu wartość jest tylko ograniczeniem.
+        """
+        lo, hi = self._bounds
+        lower = [lo] * len(outcomes)
+
+        # sondujemy tylko dzieci, których ruchy prowadzą do liści: taka sonda to kilka ocen
+        # i od razu dokładna wartość dziecka; głębsza sonda to pełne poddrzewo, droższe niż
+        # rzadkie odcięcia od góry, które daje (patrz tests/profile_pruning.py)
+        if self.pruning == "star2" and beta < _INF and max_depth_limit - depth == 2:
+            for i, (_, child, child_prob) in enumerate(outcomes):
+                self._check_deadline()
+                lower[i] = self._probe_max(child, max_depth_limit, depth + 1, child_prob)
+            bound = sum(w * low for (w, _, _), low in zip(outcomes, lower))
+            if bound >= beta * divisor:
+                return bound / divisor, False
+
+        # masa (w jednostkach wag) dzieci za bieżącym: dolna i górna granica ich wkładu
+        n = len(outcomes)
+        rest_lo = [0.0] * (n + 1)
+        rest_hi = [0.0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            w = outcomes[i][0]
+            rest_lo[i] = rest_lo[i + 1] + w * lower[i]
+            rest_hi[i] = rest_hi[i + 1] + w * hi
+
+        acc = 0.0
+        for i, (w, child, child_prob) in enumerate(outcomes):
+            self._check_deadline()
+            a = (alpha * divisor - acc - rest_hi[i + 1]) / w
+            b = (beta * divisor - acc - rest_lo[i + 1]) / w
+            v = self._max_value_star(child, max_depth_limit, depth + 1, a, b, child_prob)
+            acc += w * v
+            if v <= a:
+                return (acc + rest_hi[i + 1]) / divisor, False
+            if v >= b:
+                return (acc + rest_lo[i + 1]) / divisor, False
+
+        return acc / divisor, True
+
+    def _probe_max(self, board_tuple: Tuple[Tuple[int, ...], ...], max_depth_limit: int, depth: int, prob: float) -> float:
+        """Dolne ograniczenie węzła MAX: dokładna wartość jego najlepszego statycznie ruchu."""
+        remaining = max_depth_limit - depth
+        v = self.tt.lookup(self._tt_key(board_tuple), MAX_NODE, remaining)
+        if v is not None:
+            return v
+
+        state = self._state_cls.from_rows(board_tuple)
+        successors = None if self._cutoff(state, depth, max_depth_limit) else state.successors()
+        if not successors:
+            return self._evaluate_cached(self._key(board_tuple))
+
+        boards = [self._board_to_tuple(board) for _, board, _ in successors]
+        scores = [self._evaluate_cached(self._key(b)) for b in boards]
+        if remaining == 1:
+            # dzieci są liśćmi: sonda jest od razu dokładną wartością węzła
+            v = max(scores)
+            self.tt.store(self._tt_key(board_tuple), MAX_NODE, remaining, v)
+            return v
+
+        best = boards[max(range(len(boards)), key = scores.__getitem__)]
+        # pełne okno: wynik jest dokładny i trafia do tablicy, więc późniejsze rozwinięcie go nie powtarza
+        return self._chance_value_star(best, max_depth_limit, depth + 1, -_INF, _INF, prob)
+
+    def _max_value_inplace(self, state: GameState, max_depth_limit: int, depth: int, prob: float = 1.0) -> float:
+        """Odpowiednik _max_value na jednym stanie modyfikowanym w miejscu."""
+        remaining = max_depth_limit - depth
+        if remaining <= 0:
+            return self._evaluate_state(state)
+
+        key = self._state_key(state)
+        v = self.tt.lookup(key, MAX_NODE, remaining)
+        if v is None:
+            v = self._max_value_inplace_inner(state, max_depth_limit, depth, prob)
+            self.tt.store(key, MAX_NODE, remaining, v)
+        return v
 
-        for (r, c) in empties:
-            if self._timed_out():
-                return evaluate(state.board, self.weights)
+    def _chance_value_inplace(self, state: GameState, max_depth_limit: int, depth: int, prob: float = 1.0) -> float:
+        remaining = max_depth_limit - depth
+        if remaining <= 0 or prob < self.min_prob:
+            return self._evaluate_state(state)
+
+        key = self._state_key(state)
+        v = self.tt.lookup(key, CHANCE_NODE, remaining)
+        if v is None:
+            v = self._chance_value_inplace_inner(state, max_depth_limit, depth, prob)
+            self.tt.store(key, CHANCE_NODE, remaining, v)
+        return v
 
-            ns2 = state.clone()
-            ns2.board[r][c] = 2
-            expected += 0.9 * self._max_value(ns2, depth + 1)
+    def _max_value_inplace_inner(self, state: GameState, max_depth_limit: int, depth: int, prob: float) -> float:
+        if self._cutoff(state, depth, max_depth_limit):
+            return self._evaluate_state(state)
 
-            ns4 = state.clone()
-            ns4.board[r][c] = 4
-            expected += 0.1 * self._max_value(ns4, depth + 1)
+        v = float("-inf")
 
-        return expected / float(len(empties))
+        for move in ALLOWED_MOVES:
+            if not state.apply_move(move):
+                continue
 
-    def _chance_value_inner(self, board_tuple: Tuple[Tuple[int, ...], ...], node_type: str, max_depth_limit: int, depth: int) -> float:
-        state = GameState(board = self._tuple_to_board(board_tuple))
+            self._check_deadline()
+            v = max(v, self._chance_value_inplace(state, max_depth_limit, depth + 1, prob))
+            state.undo()
 
+        if v == float("-inf"):
+            return self._evaluate_state(state)
+
+        return v
+
+    def _chance_value_inplace_inner(self, state: GameState, max_depth_limit: int, depth: int, prob: float) -> float:
+        """Kafelki wstawiane i zdejmowane z tego samego stanu."""
         if self._cutoff(state, depth, max_depth_limit):
-            return evaluate(state.board, self.weights)
+            return self._evaluate_state(state)
 
         empties = state.empty_cells()
 
         if not empties:
-            return self._max_value_cached(board_tuple, "MAX", max_depth_limit, depth + 1)
+            return self._max_value_inplace(state, max_depth_limit, depth + 1, prob)
+
+        if self.incremental_eval and depth + 1 >= max_depth_limit:
+            return self._chance_leaf_value(state.board, empties)
+
+        if self._should_sample(empties):
+            expected = 0.0
+            for w, r, c, v in self._spawn_sample(self._board_to_tuple(state.board), empties, depth):
+                self._check_deadline()
+                child_prob = prob * (0.9 if v == 2 else 0.1) / len(empties)
+                state.place_tile(r, c, v)
+                expected += w * self._max_value_inplace(state, max_depth_limit, depth + 1, child_prob)
+                state.undo()
+            return expected
 
         expected = 0.0
+        prob_2 = prob * 0.9 / len(empties)
+        prob_4 = prob * 0.1 / len(empties)
 
         for (r, c) in empties:
-            if self._timed_out():
-                return evaluate(state.board, self.weights)
+            self._check_deadline()
 
-            # kafelek 2
-            ns2 = state.clone()
-            ns2.board[r][c] = 2
-            next_board_tuple_2 = self._board_to_tuple(ns2.board)
-            expected += 0.9 * self._max_value_cached(next_board_tuple_2, "MAX", max_depth_limit, depth + 1)
+            state.place_tile(r, c, 2)
+            expected += 0.9 * self._max_value_inplace(state, max_depth_limit, depth + 1, prob_2)
+            state.undo()
 
-            # kafelek 4
-            ns4 = state.clone()
-            ns4.board[r][c] = 4
-            next_board_tuple_4 = self._board_to_tuple(ns4.board)
-            expected += 0.1 * self._max_value_cached(next_board_tuple_4, "MAX", max_depth_limit, depth + 1)
+            state.place_tile(r, c, 4)
+            expected += 0.1 * self._max_value_inplace(state, max_depth_limit, depth + 1, prob_4)
+            state.undo()
 
         return expected / float(len(empties))
 
+    def _should_sample(self, empties: List[Tuple[int, int]]) -> bool:
+        return (
+            self.sample_threshold is not None
+            and len(empties) > self.sample_threshold
+            and self.sample_budget < 2 * len(empties)
+        )
+
+    def _spawn_sample(self, board_tuple: Tuple[Tuple[int, ...], ...], empties: List[Tuple[int, int]], depth: int):
+        """Próbka spawnów dla węzła; ziarno zależy od planszy i głębokości, nie od kolejności odwiedzin."""
+        rng = random.Random(hash((self.sample_seed, board_tuple, depth)))
+        return sample_spawns(
+            empties,
+            self.sample_budget,
+            rng,
+            stratify_value = self.sample_stratify in ("value", "both"),
+            stratify_distance = self.sample_stratify in ("distance", "both"),
+            anchor = max_tile_position(board_tuple),
+        )
+
+    def _spawn_stack(
+            self, board_tuple: Tuple[Tuple[int, ...], ...], empties: List[Tuple[int, int]], depth: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Plansze po spawnach węzła losowego (N, 4, 4) w wykładnikach i ich wagi w wartości oczekiwanej."""
+        if self._should_sample(empties):
+            sample = self._spawn_sample(board_tuple, empties, depth)
+            cells = [4 * r + c for _, r, c, _ in sample]
+            tiles = [1 if v == 2 else 2 for _, _, _, v in sample]
+            probs = np.array([w for w, _, _, _ in sample])
+        else:
+            n = len(empties)
+            cells = [4 * r + c for r, c in empties] * 2
+            tiles = [1] * n + [2] * n
+            probs = np.repeat([0.9 / n, 0.1 / n], n)
+
+        base = (np.uint64(pack_rows(board_tuple)) >> _NIBBLES) & np.uint64(0xF)
+        spawns = np.repeat(base.astype(np.uint8)[None], len(cells), axis = 0)
+        spawns[np.arange(len(cells)), cells] = tiles
+        return spawns.reshape(-1, 4, 4), probs
+
+    def _frontier_value(
+            self, board_tuple: Tuple[Tuple[int, ...], ...], empties: List[Tuple[int, int]], plies: int, depth: int,
+    ) -> float:
+        """
+        Węzeł losowy z `plies` (1-3) półruchami do liści, rozwinięty wszerz: wszystkie spawny
+        (albo ich próbka) jako stos plansz, przy 2 półruchach także wszystkie ruchy z każdej
+        z nich (all_afterstates), przy 3 dodatkowo wszystkie spawny po tych ruchach
+        (_expect_spawns). Liście oceniane są jednym wywołaniem na poziom. Wartość jak
+        w rekurencji, z dokładnością do kolejności sumowania; węzły wewnątrz omijają
+        tablicę transpozycji i cache ocen.
+        """
+        spawns, probs = self._spawn_stack(board_tuple, empties, depth)
+
+        if plies == 1:
+            values = self._evaluate_frontier(spawns)
+        else:
+            self._check_deadline()
+            after, _, moved = all_afterstates(spawns)
+            scores = np.full(moved.shape, -_INF)
+            if plies == 2:
+                scores[moved] = self._evaluate_frontier(after[moved])
+            else:
+                # ten sam stan po ruchu bywa osiągalny z wielu spawnów - liczymy go raz
+                keys = (after[moved].reshape(-1, 16).astype(np.uint64) << _NIBBLES).sum(axis = 1)
+                _, first, inverse = np.unique(keys, return_index = True, return_inverse = True)
+                scores[moved] = self._expect_spawns(after[moved][first])[inverse]
+            values = scores.max(axis = 0)
+            # plansza bez legalnego ruchu to liść oceniany sam
+            stuck = ~moved.any(axis = 0)
+            if stuck.any():
+                values[stuck] = self._evaluate_frontier(spawns[stuck])
+
+        return float(probs @ values)
+
+    def _expect_spawns(self, boards: np.ndarray) -> np.ndarray:
+        """Wartości oczekiwane (M,) węzłów losowych `boards` (M, 4, 4), których dzieci to liście."""
+        flat = boards.reshape(len(boards), 16)
+        rows, cells = np.nonzero(flat == 0)
+        n = len(rows)
+        leaves = np.repeat(flat[rows], 2, axis = 0)
+        idx = np.arange(n)
+        leaves[2 * idx, cells] = 1
+        leaves[2 * idx + 1, cells] = 2
+        values = self._evaluate_frontier(leaves.reshape(-1, 4, 4))
+        weighted = 0.9 * values[0::2] + 0.1 * values[1::2]
+        counts = np.bincount(rows, minlength = len(boards))
+        return np.bincount(rows, weights = weighted, minlength = len(boards)) / counts
+
+    def _evaluate_state(self, state: GameState) -> float:
+        return self._evaluate_cached(self._key(self._board_to_tuple(state.board)))
+
+    def _chance_leaf_value(self, board_tuple: Tuple[Tuple[int, ...], ...], empties: List[Tuple[int, int]]) -> float:
+        """
+        Węzeł losowy, którego dzieci są liśćmi: zamiast budować i oceniać od zera
+        2 x (liczba pustych) plansz, liczymy cechy rodzica raz i dla każdego dziecka
+        przeliczamy tylko wiersz i kolumnę nowego kafelka. Wynik jak w ścieżce ogólnej.
+        """
+        parent = feature_breakdown(board_tuple)
+        weights = self.weights
+        expected = 0.0
+
+        for (r, c) in empties:
+            expected += 0.9 * parent.score_with_tile(r, c, 2, weights)
+            expected += 0.1 * parent.score_with_tile(r, c, 4, weights)
+
+        return expected / float(len(empties))
+
+    def _evaluate_inner(self, board_tuple: Tuple[Tuple[int, ...], ...]) -> float:
+        return self._evaluate(board_tuple)
+
+    def _key(self, board_tuple: Tuple[Tuple[int, ...], ...]) -> Tuple[Tuple[int, ...], ...]:
+        """Klucz cache'a: postać kanoniczna planszy (jeśli włączone symetrie)."""
+        if self.symmetry:
+            return canonical_rows(board_tuple)
+        return board_tuple
+
+    def _tt_key(self, board) -> int:
+        """Klucz tablicy transpozycji: spakowana plansza (kanoniczna, jeśli włączone symetrie)."""
+        size = len(board)
+        if size == 4:
+            bits = pack_rows(board)
+            return canonical(bits) if self.symmetry else bits
+        if self.symmetry:
+            board = canonical_rows(self._board_to_tuple(board))
+        return bb.get_engine(size).pack_board(board)
+
+    def _state_key(self, state: GameState) -> int:
+        bits = getattr(state, "bits", None)
+        if bits is not None and state.size == 4:
+            return canonical(bits) if self.symmetry else bits
+        return self._tt_key(state.board)
+
+    def cache_stats(self) -> Dict[str, Tuple[int, int]]:
+        """(trafienia, chybienia) od utworzenia agenta: tablica transpozycji i cache ocen."""
+        tt = self.tt
+        return {
+            "tt": (tt.hits, tt.lookups - tt.hits),
+            "eval": self._evaluate_cached.cache_info()[:2],
+        }
+
+    def tt_stats(self) -> Dict[str, float]:
+        return self.tt.stats()
+
     def _cutoff(self, state: GameState, current_depth: int, max_depth_limit: Optional[int] = None) -> bool:
         """Warunki zatrzymania rekurencji"""
 
@@ -190,17 +992,22 @@ class ExpectimaxAgent(Agent):
         if state.is_terminal():
             return True
 
-        if self._timed_out():
-            return True
+        self._check_deadline()
 
         return False
 
-    def _timed_out(self) -> bool:
-        return self._deadline is not None and time.perf_counter() > self._deadline
+    def _check_deadline(self) -> None:
+        """Po przekroczeniu limitu przerywa bieżącą iterację (żadna ucięta wartość nie trafia do wyniku)."""
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise _SearchTimeout
 
     def _get_adaptive_depth(self, state: GameState) -> int:
         """Zwraca adaptacyjną głębokość w zależności od liczby pustych pól"""
 
+        if self.depth_model is not None:
+            features = board_features(state.board, len(state.legal_moves()))
+            return self.depth_model.select_depth(features, self.latency_target_ms, self.max_depth_fixed)
+
         if self.adaptive_depth_config is None:
             return self.max_depth_fixed
 
@@ -208,7 +1015,7 @@ class ExpectimaxAgent(Agent):
         threshold = self.adaptive_depth_config.get("threshold", 6)
         bonus = self.adaptive_depth_config.get("bonus", 1)
 
-        if len(state.empty_cells()) >= threshold:
+        if state.empty_count() >= threshold:
             return base + bonus
 
         return base
@@ -217,6 +1024,12 @@ class ExpectimaxAgent(Agent):
     def _board_to_tuple(board: List[List[int]]) -> Tuple[Tuple[int, ...], ...]:
         return tuple(tuple(row) for row in board)
 
+    @staticmethod
+    def _place_tile(board_tuple: Tuple[Tuple[int, ...], ...], r: int, c: int, value: int) -> Tuple[Tuple[int, ...], ...]:
+        row = board_tuple[r]
+        new_row = row[:c] + (value,) + row[c + 1:]
+        return board_tuple[:r] + (new_row,) + board_tuple[r + 1:]
+
     @staticmethod
     def _tuple_to_board(board_tuple: Tuple[Tuple[int, ...], ...]) -> List[List[int]]:
         return [list(row) for row in board_tuple]
\ No newline at end of file
@@ -1,37 +1,88 @@
 from __future__ import annotations
-from typing import Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
 
 from src.agents.base import Agent, SupportGameState
-from src.heuristics.evaluate import evaluate
+from src.agents.disk_cache import DiskTable, config_hash, disk_evaluator
+from src.game.state import ALLOWED_MOVES
+from src.heuristics.evaluate import evaluate_exponents
+from src.heuristics.table_eval import get_evaluator
 from src.heuristics.weights_loader import load_weights
 
+if TYPE_CHECKING:
+    from src.game.batch import BatchGameState
+
 
 class GreedyAgent(Agent):
-    def __init__(self, weights: Optional[dict[str, float]] = None, fallback: str = "up"):
+    def __init__(
+            self,
+            weights: Optional[dict[str, float]] = None,
+            fallback: str = "up",
+            eval_mode: str = "scalar",
+            disk_cache: Optional[DiskTable] = None,
+            cache_maxsize: int = 100000,
+    ):
         """
         :param weights: słownik wag dla heurystyki; Jeśli None, evaluate użyje domyślnych
         :param fallback: ruch awaryjny gdy brak legalnych
+        :param eval_mode: "scalar" (evaluate) | "table" (tablice wierszy, patrz table_eval)
+        :param disk_cache: otwarta DiskTable - oceny idą przez LRU (cache_maxsize) i trwały
+            cache na dysku, współdzielony przez kolejne gry i uruchomienia (patrz disk_cache)
         """
 
         self.weights = weights
         self.fallback = fallback
+        self.eval_mode = eval_mode
+        self.disk_cache = disk_cache
+        self._evaluate = get_evaluator(weights, eval_mode)
+
+        if disk_cache is not None:
+            self._evaluate_cached = lru_cache(maxsize = cache_maxsize)(
+                disk_evaluator(self._evaluate, disk_cache, config_hash(weights))
+            )
+            self._evaluate = self._evaluate_tiered
+
+    def _evaluate_tiered(self, board) -> float:
+        return self._evaluate_cached(tuple(tuple(row) for row in board))
 
     def choose_move(self, state: SupportGameState) -> str:
-        moves = state.legal_moves()
+        successors = state.successors()
 
-        if not moves:
+        if not successors:
             return self.fallback
 
         best_move = None
         best_val = float("-inf")
 
-        for move in moves:
-            ns = state.clone()
-            ns.step(move, spawn = False)
-            val = evaluate(ns.board, self.weights)
+        for move, board, _ in successors:
+            val = self._evaluate(board)
 
             if val > best_val:
                 best_val = val
                 best_move = move
 
-        return best_move or self.fallback
\ No newline at end of file
+        return best_move or self.fallback
+
+    def choose_moves_batch(self, batch: BatchGameState) -> np.ndarray:
+        """
+        Wersja wsadowa choose_move: indeksy ruchów (ALLOWED_MOVES) dla wszystkich gier w partii.
+        Remisy rozstrzygane jak w choose_move (pierwszy ruch w kolejności ALLOWED_MOVES).
+        Tylko eval_mode="scalar" bez disk_cache i z cechami bazowymi evaluate.
+        """
+        if self.eval_mode != "scalar" or self.disk_cache is not None:
+            raise ValueError("choose_moves_batch działa tylko z eval_mode='scalar' bez disk_cache")
+        extra = set(self.weights or {}) - {"empty", "mono", "smooth", "corner"}
+        if any((self.weights or {}).get(name, 0.0) != 0.0 for name in extra):
+            raise ValueError(f"Ocena wektorowa nie obsługuje cech: {sorted(extra)}")
+
+        after, _, legal = batch.afterstates()
+
+        # oceniamy tylko legalne afterstate'y; zakończone gry nic nie kosztują
+        values = np.full(legal.shape, -np.inf)
+        values[legal] = evaluate_exponents(after[legal], self.weights)
+
+        best = values.argmax(axis = 0)
+        fallback = ALLOWED_MOVES.index(self.fallback)
+        return np.where(legal.any(axis = 0), best, fallback)
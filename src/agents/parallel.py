@@ -0,0 +1,96 @@
+# src/agents/parallel.py
+"""
+Równoległe przeszukiwanie korzenia expectimaxa na stałej puli procesów.
+
+Korzeń ma najwyżej 4 ruchy, a ich poddrzewa bywają bardzo nierówne, więc zadaniem
+dla procesu roboczego nie jest cały ruch, tylko węzeł MAX na głębokości 2:
+(ruch, pole spawnu, kafelek). Takich zadań jest kilkadziesiąt na iterację, co
+wyrównuje obciążenie. Wartości wracają do agenta, który składa je w wartości
+węzłów losowych korzenia dokładnie tak, jak robi to przeszukiwanie sekwencyjne.
+
+Procesy robocze to kopie agenta (te same wagi i opcje) dołączone do jednej
+SharedTranspositionTable, więc korzystają nawzajem z policzonych poddrzew - także
+między iteracjami pogłębiania i kolejnymi ruchami. Pula startuje przy pierwszym
+przeszukiwaniu i żyje do close() agenta.
+"""
+from __future__ import annotations
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.agents.transposition import SharedTranspositionTable
+
+Board = Tuple[Tuple[int, ...], ...]
+
+# agent procesu roboczego (ustawiany przez _init_worker)
+_WORKER = None
+
+
+def _init_worker(config: Dict[str, Any], tt_name: str, tt_mb: float) -> None:
+    global _WORKER
+    from src.agents.expectimax import ExpectimaxAgent
+
+    agent = ExpectimaxAgent(**config, tt_mb = 0)
+    # procesy potomne dzielą resource_tracker z procesem głównym, więc segment
+    # jest rejestrowany raz i usuwany tylko przez właściciela
+    agent.tt = SharedTranspositionTable(tt_mb, name = tt_name)
+    _WORKER = agent
+
+
+def _max_node_task(task: Tuple[type, Board, int, float, int, Optional[float]]) -> Optional[float]:
+    """Wartość węzła MAX na głębokości 2; None, jeśli minął limit czasu."""
+    from src.agents.expectimax import _SearchTimeout
+
+    state_cls, board, depth_limit, prob, generation, deadline = task
+    agent = _WORKER
+    agent._state_cls = state_cls
+    agent.tt.generation = generation
+    # perf_counter nie jest wspólny dla procesów, więc termin przychodzi jako czas zegarowy
+    agent._deadline = None if deadline is None else time.perf_counter() + (deadline - time.time())
+
+    try:
+        return agent._max_value(board, depth_limit, 2, prob)
+    except _SearchTimeout:
+        return None
+
+
+class SearchPool:
+    """Pula procesów roboczych i współdzielona tablica transpozycji jednego agenta."""
+
+    def __init__(self, workers: int, config: Dict[str, Any], tt_mb: float) -> None:
+        self.workers = workers
+        self.tt = SharedTranspositionTable(tt_mb)
+        self._config = config
+        self._tt_mb = tt_mb
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _start(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers = self.workers,
+                initializer = _init_worker,
+                initargs = (self._config, self.tt.name, self._tt_mb),
+            )
+        return self._executor
+
+    def max_values(
+            self,
+            state_cls: type,
+            boards: Sequence[Board],
+            probs: Sequence[float],
+            depth_limit: int,
+            deadline: Optional[float],
+    ) -> List[Optional[float]]:
+        """Wartości węzłów MAX (głębokość 2) dla `boards`, liczone równolegle; None = przerwane."""
+        generation = self.tt.generation
+        tasks = [(state_cls, b, depth_limit, p, generation, deadline) for b, p in zip(boards, probs)]
+        # kilka zadań na paczkę: mniej komunikacji, a wciąż kilka paczek na proces
+        chunksize = max(1, len(tasks) // (4 * self.workers))
+        return list(self._start().map(_max_node_task, tasks, chunksize = chunksize))
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures = True)
+            self._executor = None
+        self.tt.close()
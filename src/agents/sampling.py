@@ -0,0 +1,95 @@
+# src/agents/sampling.py
+"""
+Próbkowanie spawnów w węzłach losowych expectimaxa.
+
+Pełny węzeł losowy ma 2 x (liczba pustych) dzieci. Przy dużej liczbie pustych pól
+oceniamy tylko `budget` wylosowanych wyników (pole, kafelek). Każdy wynik ma wagę
+dobraną tak, by suma wag * wartości była nieobciążonym estymatorem wartości oczekiwanej:
+
+- bez warstw: `budget` losowań z pełnego rozkładu spawnu (pole jednostajnie, 2 z p = 0.9),
+  z wagą 1 / budget każde,
+- warstwy 2/4: osobne próby pól dla kafelka 2 i 4 (budżet dzielony 9:1, min. 1 na warstwę),
+  wynik = 0.9 * średnia(2) + 0.1 * średnia(4),
+- warstwy odległości: w każdej warstwie wartości pola dzielone są dodatkowo według
+  odległości (Manhattan) od największego kafelka (1, 2, 3+). Każda grupa dostaje próbę
+  proporcjonalną do liczności (min. 1) z wagą N_g / (E * n_g).
+
+W warstwach pola losowane są bez zwracania, więc grupa mniejsza od swojej próby
+jest po prostu rozwijana w całości.
+"""
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Sequence, Tuple
+
+Cell = Tuple[int, int]
+# (waga w estymatorze, wiersz, kolumna, kafelek)
+Outcome = Tuple[float, int, int, int]
+
+SPAWN_PROBS: Tuple[Tuple[int, float], ...] = ((2, 0.9), (4, 0.1))
+
+
+def max_tile_position(board: Sequence[Sequence[int]]) -> Cell:
+    best = (0, 0)
+    best_v = -1
+    for r, row in enumerate(board):
+        for c, v in enumerate(row):
+            if v > best_v:
+                best_v = v
+                best = (r, c)
+    return best
+
+
+def _split(total: int, shares: Sequence[float]) -> List[int]:
+    """Podział `total` proporcjonalnie do `shares`, co najmniej 1 na udział."""
+    return [max(1, round(total * s)) for s in shares]
+
+
+def _distance_groups(empties: Sequence[Cell], anchor: Cell) -> List[List[Cell]]:
+    groups: Dict[int, List[Cell]] = {}
+    ar, ac = anchor
+    for cell in empties:
+        d = min(abs(cell[0] - ar) + abs(cell[1] - ac), 3)
+        groups.setdefault(d, []).append(cell)
+    return [groups[d] for d in sorted(groups)]
+
+
+def sample_spawns(
+        empties: Sequence[Cell],
+        budget: int,
+        rng: random.Random,
+        stratify_value: bool = False,
+        stratify_distance: bool = False,
+        anchor: Cell = (0, 0),
+) -> List[Outcome]:
+    """
+    Wylosowane wyniki spawnu z wagami (suma wag = 1).
+    `anchor` to pozycja największego kafelka (używana przy warstwach odległości).
+    """
+    n = len(empties)
+
+    if not stratify_value and not stratify_distance:
+        w = 1.0 / budget
+        out: List[Outcome] = []
+        for _ in range(budget):
+            r, c = empties[rng.randrange(n)]
+            out.append((w, r, c, 2 if rng.random() < 0.9 else 4))
+        return out
+
+    if stratify_value:
+        value_strata = list(zip(SPAWN_PROBS, _split(budget, [p for _, p in SPAWN_PROBS])))
+    else:
+        # bez warstw 2/4 kafelek losowany jest razem z polem
+        value_strata = [((0, 1.0), budget)]
+
+    groups = _distance_groups(empties, anchor) if stratify_distance else [list(empties)]
+
+    out = []
+    for (value, p_value), n_value in value_strata:
+        for group, n_group in zip(groups, _split(n_value, [len(g) / n for g in groups])):
+            take = min(n_group, len(group))
+            w = p_value * len(group) / (n * take)
+            for r, c in rng.sample(group, take):
+                v = value or (2 if rng.random() < 0.9 else 4)
+                out.append((w, r, c, v))
+    return out
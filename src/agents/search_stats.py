@@ -0,0 +1,128 @@
+# src/agents/search_stats.py
+"""
+Statystyki przeszukiwania expectimaxa dla pojedynczego ruchu.
+
+Liczniki węzłów nie siedzą w samym przeszukiwaniu: SearchStats.install podmienia
+metody węzłów MAX/CHANCE na instancji agenta na wersje liczące (wywołania rekurencyjne
+idą przez self, więc trafiają w podmienione metody). Agent bez statystyk wykonuje
+dokładnie ten sam kod co wcześniej - wyłączone statystyki nic nie kosztują.
+
+Na ruch (SearchStats.end):
+- max_nodes / chance_nodes: odwiedzone węzły według głębokości (także trafienia w tablicy
+  transpozycji; węzły na głębokości docelowej to liście),
+- probe_nodes: sondy Star2 (_probe_max) - liczone osobno, bo ten sam węzeł MAX bywa
+  potem rozwinięty w całości i trafia też do max_nodes,
+- leaf_evals: oceny heurystyki (przez cache ocen) plus liście oceniane przyrostowo
+  i wektorowo (search="frontier"; węzłów MAX tego poziomu nie ma w max_nodes),
+- tt_* i eval_*: trafienia, chybienia i wyparcia tablicy transpozycji i cache'a ocen,
+- timeouts: iteracje pogłębiania przerwane limitem czasu,
+- depth: osiągnięta głębokość, ebf: efektywny współczynnik rozgałęzienia N ** (1 / depth),
+  gdzie N to wszystkie węzły i oceny ruchu.
+
+Przy workers > 1 węzły liczone w procesach roboczych nie trafiają do liczników.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List
+
+MAX_METHODS = ("_max_value", "_max_value_inplace", "_max_value_star")
+PROBE_METHODS = ("_probe_max",)
+CHANCE_METHODS = ("_chance_value", "_chance_value_inplace", "_chance_value_star")
+
+
+def _counting(method: Callable, counts: List[int]) -> Callable:
+    """Metoda węzła zliczająca wywołania według głębokości (trzeci argument pozycyjny)."""
+
+    def counted(*args, **kwargs):
+        depth = args[2]
+        if depth >= len(counts):
+            counts.extend([0] * (depth + 1 - len(counts)))
+        counts[depth] += 1
+        return method(*args, **kwargs)
+
+    return counted
+
+
+class SearchStats:
+    def __init__(self) -> None:
+        self.max_nodes: List[int] = []
+        self.chance_nodes: List[int] = []
+        self.probe_nodes: List[int] = []
+        self.incremental_leaves = 0
+        self.frontier_leaves = 0
+        self.timeouts = 0
+        self._tt_start: Dict[str, float] = {}
+        self._eval_start = (0, 0, 0)
+
+    def install(self, agent: Any) -> None:
+        """Podmienia metody węzłów agenta na liczące."""
+        for name in MAX_METHODS:
+            setattr(agent, name, _counting(getattr(agent, name), self.max_nodes))
+        for name in CHANCE_METHODS:
+            setattr(agent, name, _counting(getattr(agent, name), self.chance_nodes))
+        for name in PROBE_METHODS:
+            setattr(agent, name, _counting(getattr(agent, name), self.probe_nodes))
+
+        leaf_value = agent._chance_leaf_value
+
+        def counted_leaf_value(board_tuple, empties):
+            self.incremental_leaves += 2 * len(empties)
+            return leaf_value(board_tuple, empties)
+
+        agent._chance_leaf_value = counted_leaf_value
+
+        evaluate_frontier = agent._evaluate_frontier
+
+        def counted_evaluate_frontier(exps):
+            self.frontier_leaves += len(exps)
+            return evaluate_frontier(exps)
+
+        agent._evaluate_frontier = counted_evaluate_frontier
+
+    def begin(self, agent: Any) -> None:
+        # listy są zamknięte w podmienionych metodach, więc czyścimy je w miejscu
+        self.max_nodes.clear()
+        self.chance_nodes.clear()
+        self.probe_nodes.clear()
+        self.incremental_leaves = 0
+        self.frontier_leaves = 0
+        self.timeouts = 0
+        self._tt_start = agent.tt.stats()
+        info = agent._evaluate_cached.cache_info()
+        self._eval_start = (info.hits, info.misses, info.currsize)
+
+    def end(self, agent: Any, depth: int) -> Dict[str, Any]:
+        tt = agent.tt.stats()
+        tt_lookups = tt["lookups"] - self._tt_start["lookups"]
+        tt_hits = tt["hits"] - self._tt_start["hits"]
+
+        info = agent._evaluate_cached.cache_info()
+        hits0, misses0, size0 = self._eval_start
+        eval_hits = info.hits - hits0
+        eval_misses = info.misses - misses0
+        # chybienie, które nie powiększyło cache'a, wyparło starszy wpis
+        eval_evictions = max(0, eval_misses - (info.currsize - size0))
+
+        leaf_evals = eval_hits + eval_misses + self.incremental_leaves + self.frontier_leaves
+        max_nodes = sum(self.max_nodes)
+        chance_nodes = sum(self.chance_nodes)
+        probe_nodes = sum(self.probe_nodes)
+        total = max_nodes + chance_nodes + probe_nodes + leaf_evals
+
+        return {
+            "depth": depth,
+            "max_nodes": max_nodes,
+            "chance_nodes": chance_nodes,
+            "max_nodes_by_depth": list(self.max_nodes),
+            "chance_nodes_by_depth": list(self.chance_nodes),
+            "probe_nodes": probe_nodes,
+            "leaf_evals": leaf_evals,
+            "tt_hits": tt_hits,
+            "tt_misses": tt_lookups - tt_hits,
+            "tt_evictions": tt["evictions"] - self._tt_start["evictions"],
+            "eval_hits": eval_hits,
+            "eval_misses": eval_misses,
+            "eval_evictions": eval_evictions,
+            "timeouts": self.timeouts,
+            "ebf": round(total ** (1.0 / depth), 3) if depth > 0 and total > 0 else 0.0,
+        }
@@ -0,0 +1,267 @@
+# src/agents/server.py
+"""
+Lokalny serwer agentów (asyncio, TCP): inne procesy - GUI, generator obciążenia,
+front-end gry - pytają o ruch bez tworzenia agenta i rozgrzewania cache'y przy każdym
+wywołaniu.
+
+Protokół: jedna wiadomość JSON na linię w obie strony. Żądanie ruchu:
+    {"id": 7, "agent": "greedy" | "expectimax", "session": "gra-1", "board": [[...]], "score": 0}
+Odpowiedź:
+    {"id": 7, "move": "left", "stats": {...}, "server_ms": 0.41}
+albo {"id": 7, "error": "..."}. Pozostałe operacje: {"op": "close", "session": ...}
+(zwalnia agenta sesji) i {"op": "stats"} (liczniki serwera). Odpowiedzi na jednym
+połączeniu mogą przychodzić w innej kolejności niż żądania - łączy je "id".
+
+- greedy: jeden agent dla wszystkich. Żądania zebrane w oknie `batch_window_ms`
+  (domyślnie jeden przebieg pętli zdarzeń) albo do `max_batch` są oceniane razem przez
+  choose_moves_batch - jedno wektorowe wywołanie evaluate_exponents na paczkę,
+- expectimax: agent na sesję (własna tablica transpozycji i cache ocen żyją między
+  ruchami jednej gry), przeszukiwanie w puli wątków, żeby pętla zdarzeń dalej zbierała
+  paczki greedy. Sesji jest najwyżej `max_sessions`; nadmiarowa zwalnia najdawniej używaną.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.agents.expectimax import ExpectimaxAgent
+from src.agents.greedy import GreedyAgent
+from src.game.batch import BatchGameState
+from src.game.state import ALLOWED_MOVES, make_state
+
+Board = List[List[int]]
+
+# największy kafelek mieszczący się w 4-bitowym wykładniku (bitboard, BatchGameState)
+MAX_TILE = 1 << 15
+
+
+def check_board(board: Any) -> None:
+    """Plansza z żądania: kwadratowa lista wierszy liczb całkowitych 0 lub 2 ** k <= MAX_TILE."""
+    if not isinstance(board, list) or not board:
+        raise ValueError("board musi być niepustą listą wierszy")
+    size = len(board)
+    for row in board:
+        if not isinstance(row, list) or len(row) != size:
+            raise ValueError(f"board musi być kwadratem {size}x{size}")
+        for v in row:
+            if type(v) is not int or not (v == 0 or (2 <= v <= MAX_TILE and v & (v - 1) == 0)):
+                raise ValueError(f"Niepoprawny kafelek: {v!r} (0 albo potęga dwójki <= {MAX_TILE})")
+
+
+class _Session:
+    def __init__(self, agent: ExpectimaxAgent) -> None:
+        self.agent = agent
+        # ruchy jednej sesji nie mogą przeszukiwać wspólnych struktur równolegle
+        self.lock = asyncio.Lock()
+
+
+class AgentServer:
+    def __init__(
+            self,
+            host: str = "127.0.0.1",
+            port: int = 8048,
+            weights: Optional[Dict[str, float]] = None,
+            expectimax_options: Optional[Dict[str, Any]] = None,
+            backend: str = "list",
+            batch_window_ms: float = 0.0,
+            max_batch: int = 256,
+            max_sessions: int = 32,
+            search_threads: int = 1,
+    ) -> None:
+        """
+        :param expectimax_options: argumenty ExpectimaxAgent (poza wagami) dla agentów sesji,
+            np. {"max_depth": 3, "tt_mb": 4.0, "time_limit_ms": 50}
+        :param batch_window_ms: jak długo pierwsze żądanie greedy czeka na kolejne do paczki;
+            0 = paczka to żądania odczytane w tym samym przebiegu pętli zdarzeń
+        :param search_threads: wątki przeszukiwania expectimax (GIL: więcej wątków nie
+            przyspiesza obliczeń, tylko przeplata sesje)
+        """
+        self.host = host
+        self.port = port
+        self.weights = weights
+        self.expectimax_options = dict(expectimax_options or {"max_depth": 3, "tt_mb": 4.0})
+        self.backend = backend
+        self.batch_window_ms = batch_window_ms
+        self.max_batch = max_batch
+        self.max_sessions = max_sessions
+
+        self.greedy = GreedyAgent(weights = weights, fallback = "up")
+        self.sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers = search_threads)
+        self._server: Optional[asyncio.base_events.Server] = None
+
+        self._pending: List[Tuple[Board, asyncio.Future]] = []
+        # zadania obsługi połączeń - close() je przerywa
+        self._clients: "set[asyncio.Task]" = set()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        self.requests = 0
+        self.greedy_batches = 0
+        self.greedy_batched = 0
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        # port 0 = wolny port wybrany przez system
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for client in list(self._clients):
+                client.cancel()
+            await asyncio.gather(*self._clients, return_exceptions = True)
+            await self._server.wait_closed()
+        for session in self.sessions.values():
+            session.agent.close()
+        self.sessions.clear()
+        self._executor.shutdown(wait = True)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        client = asyncio.current_task()
+        self._clients.add(client)
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                # każde żądanie osobno: kilka żądań greedy z jednego połączenia trafia do jednej paczki
+                task = asyncio.create_task(self._respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            # zamknięcie serwera: przerywamy też żądania tego połączenia
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions = True)
+        finally:
+            self._clients.discard(client)
+            writer.close()
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter) -> None:
+        start = time.perf_counter()
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            response = await self.handle(request)
+        except Exception as exc:  # błąd jednego żądania nie zamyka połączenia
+            response = {"error": f"{type(exc).__name__}: {exc}"}
+        response["id"] = request_id
+        response["server_ms"] = round((time.perf_counter() - start) * 1000.0, 3)
+        writer.write(json.dumps(response).encode() + b"\n")
+        await writer.drain()
+
+    async def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Odpowiedź na jedno żądanie (bez "id" i "server_ms")."""
+        op = request.get("op", "move")
+        if op == "stats":
+            return {"stats": self.stats()}
+        if op == "close":
+            session = self.sessions.pop(str(request.get("session")), None)
+            if session is not None:
+                session.agent.close()
+            return {"closed": session is not None}
+        if op != "move":
+            raise ValueError(f"Nieznana operacja: {op}")
+
+        self.requests += 1
+        board = request["board"]
+        # błędna plansza to błąd tylko tego żądania - do paczki greedy nie trafia
+        check_board(board)
+        agent_type = request.get("agent", "greedy")
+        if agent_type == "greedy":
+            return await self._greedy_move(board)
+        if agent_type == "expectimax":
+            return await self._expectimax_move(str(request.get("session", "default")), board, request.get("score", 0))
+        raise ValueError(f"Nieznany agent: {agent_type}")
+
+    async def _greedy_move(self, board: Board) -> Dict[str, Any]:
+        if len(board) != 4:
+            # paczki wektorowe są tylko dla 4x4
+            state = make_state("bitboard", board = board, size = len(board))
+            return {"move": self.greedy.choose_move(state), "stats": {"batch_size": 1}}
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((board, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window_ms / 1000.0, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Ocena zebranej paczki greedy jednym wywołaniem choose_moves_batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        try:
+            batch = BatchGameState.from_boards([0] * len(pending), [board for board, _ in pending])
+            moves = self.greedy.choose_moves_batch(batch)
+        except Exception:
+            # awaria paczki nie może zepsuć poprawnych żądań: każde liczone osobno
+            for board, future in pending:
+                if future.done():
+                    continue
+                try:
+                    move = self.greedy.choose_move(make_state("bitboard", board = board, size = len(board)))
+                    future.set_result({"move": move, "stats": {"batch_size": 1}})
+                except Exception as exc:
+                    future.set_exception(exc)
+            return
+
+        self.greedy_batches += 1
+        self.greedy_batched += len(pending)
+        stats = {"batch_size": len(pending)}
+        for (_, future), move in zip(pending, moves):
+            if not future.done():
+                future.set_result({"move": ALLOWED_MOVES[int(move)], "stats": stats})
+
+    def _session(self, session_id: str) -> _Session:
+        session = self.sessions.get(session_id)
+        if session is None:
+            agent = ExpectimaxAgent(weights = self.weights, collect_stats = True, **self.expectimax_options)
+            session = self.sessions[session_id] = _Session(agent)
+            # najdawniej używana sesja, która właśnie nie szuka, zwalnia miejsce
+            for old_id, old in list(self.sessions.items()):
+                if len(self.sessions) <= self.max_sessions:
+                    break
+                if old is not session and not old.lock.locked():
+                    del self.sessions[old_id]
+                    old.agent.close()
+        self.sessions.move_to_end(session_id)
+        return session
+
+    async def _expectimax_move(self, session_id: str, board: Board, score: int) -> Dict[str, Any]:
+        session = self._session(session_id)
+        state = make_state(self.backend, board = board, score = score, size = len(board))
+        async with session.lock:
+            agent = session.agent
+            move = await asyncio.get_running_loop().run_in_executor(self._executor, agent.choose_move, state)
+            tt = agent.tt_stats()
+            stats = dict(agent.last_stats or {}, tt_hit_rate = round(tt["hit_rate"], 4), tt_fill = round(tt["fill"], 4))
+        return {"move": move, "stats": stats}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "sessions": len(self.sessions),
+            "greedy_batches": self.greedy_batches,
+            "avg_greedy_batch": round(self.greedy_batched / self.greedy_batches, 2) if self.greedy_batches else 0.0,
+        }
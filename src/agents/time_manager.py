@@ -0,0 +1,138 @@
+# src/agents/time_manager.py
+"""
+Zarządzanie czasem przeszukiwania: budżet na grę (albo na każde N ruchów) rozdzielany
+na ruchy według trudności pozycji.
+
+Czas bazowy ruchu to pozostały budżet / pozostałe ruchy (w oknie N ruchów albo do
+oczekiwanej długości gry). Mnożnik trudności liczymy z sygnałów, które agent i tak ma:
+- liczba legalnych ruchów: jeden ruch nie wymaga przeszukiwania (czas 0),
+  dwa to zwykle pozycja pod presją,
+- liczba pustych pól: mało pustych = blisko końca gry, dużo = pozycja bezpieczna,
+- największy kafelek poza rogiem: strategia narożna jest zagrożona.
+Po każdej iteracji pogłębiania decyduje jeszcze rozrzut wartości ruchów w korzeniu:
+wyraźnie najlepszy ruch kończy przeszukiwanie wcześniej, remis je wydłuża.
+
+Nowa gra jest wykrywana po sumie kafelków: w trakcie gry rośnie z każdym ruchem (spawn),
+więc suma nie większa niż w poprzednim ruchu oznacza nową planszę.
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple
+
+from src.agents.sampling import max_tile_position
+
+# mnożniki czasu bazowego
+LEGAL_FACTORS = {2: 1.5, 3: 1.0, 4: 0.8}
+# (maksymalna liczba pustych pól, mnożnik); ostatni próg obejmuje resztę
+EMPTY_FACTORS: Tuple[Tuple[int, float], ...] = ((2, 2.0), (4, 1.5), (8, 1.0), (16 * 16, 0.6))
+OFF_CORNER_FACTOR = 1.3
+
+
+class TimeManager:
+    def __init__(
+            self,
+            budget_ms: float,
+            per_moves: Optional[int] = None,
+            expected_moves: int = 1000,
+            min_move_ms: float = 1.0,
+            max_factor: float = 4.0,
+            clear_spread: float = 0.05,
+            close_spread: float = 0.002,
+    ) -> None:
+        """
+        :param budget_ms: budżet czasu na grę (per_moves=None) albo na każde `per_moves` ruchów
+        :param expected_moves: oczekiwana długość gry przy budżecie na grę
+            (po jej przekroczeniu budżet jest dzielony na ostatnie min. 50 ruchów)
+        :param min_move_ms: minimalny czas ruchu (poza ruchem jedynym)
+        :param max_factor: ruch dostaje najwyżej max_factor x czas bazowy
+        :param clear_spread: względna przewaga najlepszego ruchu, przy której kończymy pogłębianie
+        :param close_spread: względna przewaga, poniżej której ruchy uznajemy za remis (dłuższe szukanie)
+        """
+        self.budget_ms = budget_ms
+        self.per_moves = per_moves
+        self.expected_moves = expected_moves
+        self.min_move_ms = min_move_ms
+        self.max_factor = max_factor
+        self.clear_spread = clear_spread
+        self.close_spread = close_spread
+
+        self.spent_ms = 0.0
+        self.moves = 0
+        self._last_sum = -1
+        self._soft_ms = 0.0
+        self._hard_ms = 0.0
+        self._factor = 1.0
+        self.last_allocated_ms = 0.0
+
+    def new_game(self) -> None:
+        self.spent_ms = 0.0
+        self.moves = 0
+        self._last_sum = -1
+
+    def _window(self) -> Tuple[float, int]:
+        """(pozostały budżet w ms, pozostałe ruchy) w bieżącym oknie budżetu."""
+        if self.per_moves:
+            done = self.moves % self.per_moves
+            if done == 0:
+                self.spent_ms = 0.0
+            return self.budget_ms - self.spent_ms, self.per_moves - done
+        return self.budget_ms - self.spent_ms, max(50, self.expected_moves - self.moves)
+
+    @staticmethod
+    def difficulty(board: Sequence[Sequence[int]], legal: int, empties: int) -> float:
+        """Mnożnik czasu bazowego dla pozycji (0 przy jedynym legalnym ruchu)."""
+        if legal <= 1:
+            return 0.0
+
+        factor = LEGAL_FACTORS.get(legal, 1.0)
+        for limit, f in EMPTY_FACTORS:
+            if empties <= limit:
+                factor *= f
+                break
+
+        n = len(board)
+        r, c = max_tile_position(board)
+        if r not in (0, n - 1) or c not in (0, len(board[0]) - 1):
+            factor *= OFF_CORNER_FACTOR
+        return factor
+
+    def start_move(self, board: Sequence[Sequence[int]], legal: int, empties: int) -> float:
+        """Początek ruchu: twardy limit czasu w ms (po nim iteracja jest przerywana)."""
+        tile_sum = sum(sum(row) for row in board)
+        if tile_sum <= self._last_sum:
+            self.new_game()
+        self._last_sum = tile_sum
+
+        remaining, moves_left = self._window()
+        factor = self.difficulty(board, legal, empties)
+        self._factor = factor
+        if factor == 0.0:
+            self._soft_ms = self._hard_ms = 0.0
+        else:
+            base = max(remaining, 0.0) / moves_left
+            soft = min(base * factor, base * self.max_factor)
+            self._soft_ms = max(soft, self.min_move_ms)
+            # twardy limit: 2x miękki, ale nie więcej niż zostało w budżecie
+            self._hard_ms = max(min(2.0 * self._soft_ms, remaining), self.min_move_ms)
+
+        self.last_allocated_ms = self._soft_ms
+        return self._hard_ms
+
+    def should_continue(self, elapsed_ms: float, values: List[float]) -> bool:
+        """Po zakończonej iteracji: czy zaczynać następną (głębszą)."""
+        if len(values) > 1:
+            top, second = sorted(values, reverse = True)[:2]
+            spread = (top - second) / (abs(top) + 1.0)
+            # wczesne zakończenie tylko w pozycjach łatwych; w trudnych wyraźny
+            # faworyt na małej głębokości bywa złudny
+            if spread >= self.clear_spread and self._factor <= 1.0:
+                return False
+            if spread <= self.close_spread:
+                # remis w korzeniu: następna iteracja może korzystać z całego limitu twardego
+                return elapsed_ms < 0.5 * self._hard_ms
+        # kolejna iteracja trwa zwykle kilka razy dłużej niż wszystkie dotychczasowe
+        return elapsed_ms < 0.5 * self._soft_ms
+
+    def end_move(self, elapsed_ms: float) -> None:
+        self.spent_ms += elapsed_ms
+        self.moves += 1
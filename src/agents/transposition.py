@@ -0,0 +1,248 @@
+# src/agents/transposition.py
+"""
+Tablica transpozycji dla expectimaxa.
+
+Wpis to (klucz planszy, rodzaj węzła MAX/CHANCE, pozostała głębokość, wartość, generacja).
+Kluczem jest spakowana plansza (64 bity dla 4x4; większe plansze są zwijane do 64 bitów).
+Sloty leżą w jednym prealokowanym buforze (budżet pamięci w MB), widzianym jako tablice
+kluczy, wartości, generacji i głębokości; pozycja wpisu to hash klucza z otwartym
+adresowaniem w oknie `probe` kolejnych slotów.
+
+- Wartość policzona na większą pozostałą głębokość odpowiada też na płytsze zapytania.
+- Tablica przeżywa kolejne ruchy: new_search() tylko podbija generację.
+- Przy braku miejsca w oknie wypierany jest wpis z najstarszej generacji,
+  a spośród równie starych ten o najmniejszej głębokości.
+
+SharedTranspositionTable trzyma ten sam bufor w multiprocessing.shared_memory, więc
+wiele procesów (patrz parallel) czyta i zapisuje jedną tablicę bez blokad. Żeby
+rozerwany zapis (klucz jednego wpisu, wartość innego) nie dał błędnego trafienia,
+w slocie zapisywany jest klucz XOR suma kontrolna wartości i głębokości (jak w
+"lockless hashing" z silników szachowych); niespójny slot po prostu nie pasuje do klucza.
+"""
+from __future__ import annotations
+
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Sequence
+
+MAX_NODE = 0
+CHANCE_NODE = 1
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+
+# 8 (klucz) + 8 (wartość) + 1 (głębokość i rodzaj) + 2 (generacja)
+ENTRY_BYTES = 19
+
+# spakowane wiersze 4x4 (wartości kafelków -> 16 bitów), liczone raz na wiersz
+_ROW_BITS: Dict[tuple, int] = {}
+
+
+def pack_rows(board: Sequence[Sequence[int]]) -> int:
+    """Szybkie pakowanie planszy 4x4 (krotki lub listy wierszy) do 64 bitów, jak bitboard.pack_board."""
+    bits = 0
+    shift = 0
+    for row in board:
+        row = tuple(row)
+        packed = _ROW_BITS.get(row)
+        if packed is None:
+            packed = 0
+            for i, v in enumerate(row):
+                if v:
+                    packed |= (v.bit_length() - 1) << (4 * i)
+            _ROW_BITS[row] = packed
+        bits |= packed << shift
+        shift += 16
+    return bits
+
+
+def _check(value: float, meta: int) -> int:
+    """Suma kontrolna treści slotu (XOR-owana z kluczem)."""
+    return (hash(value) ^ meta) & _MASK64
+
+
+def _fold64(key: int) -> int:
+    """Klucze dłuższe niż 64 bity (plansze 5x5+) zwijane do 64 bitów."""
+    folded = 0
+    while key:
+        folded = ((folded ^ (key & _MASK64)) * _GOLDEN) & _MASK64
+        key >>= 64
+    return folded
+
+
+def _table_size(size_mb: float, probe: int) -> int:
+    wanted = max(probe, int(size_mb * (1 << 20)) // ENTRY_BYTES)
+    return 1 << max(wanted.bit_length() - 1, 2)
+
+
+class TranspositionTable:
+    def __init__(self, size_mb: float = 16.0, probe: int = 4, buffer = None) -> None:
+        """:param buffer: gotowy bufor na size * ENTRY_BYTES bajtów (np. pamięć współdzielona); None = nowy"""
+        self.size = _table_size(size_mb, probe)
+        bits = self.size.bit_length() - 1
+        self.probe = probe
+        self._mask = self.size - 1
+        self._shift = 64 - bits
+
+        if buffer is None:
+            buffer = bytearray(self.size * ENTRY_BYTES)
+        self._bind(buffer)
+        self.generation = 1
+
+        self.lookups = 0
+        self.hits = 0
+        self.shallow = 0
+        self.stores = 0
+        self.evictions = 0
+        self.used = 0
+
+    def _bind(self, buffer) -> None:
+        n = self.size
+        view = memoryview(buffer).cast("B")
+        self._view = view
+        self.keys = view[:8 * n].cast("Q")  # klucz XOR suma kontrolna (patrz _check)
+        self.values = view[8 * n:16 * n].cast("d")
+        self.ages = view[16 * n:18 * n].cast("H")  # generacja zapisu; 0 = pusty slot
+        self.meta = view[18 * n:19 * n].cast("B")  # (pozostała głębokość << 1) | rodzaj węzła
+
+    def _release(self) -> None:
+        for view in (self.keys, self.values, self.ages, self.meta, self._view):
+            view.release()
+
+    @property
+    def size_mb(self) -> float:
+        return self.size * ENTRY_BYTES / (1 << 20)
+
+    def _slot(self, key: int) -> int:
+        return ((key * _GOLDEN) & _MASK64) >> self._shift
+
+    def new_search(self) -> None:
+        """Początek nowego ruchu: wpisy zostają, ale stare generacje idą do wymiany jako pierwsze."""
+        self.generation += 1
+        if self.generation > 0xFFFF:
+            # przepełnienie licznika: wszystkie zajęte sloty stają się "starą" generacją 1
+            ages = self.ages
+            for i in range(self.size):
+                if ages[i]:
+                    ages[i] = 1
+            self.generation = 2
+
+    def lookup(self, key: int, kind: int, depth: int) -> Optional[float]:
+        """Wartość węzła, jeśli zapisano ją dla pozostałej głębokości >= `depth`, inaczej None."""
+        self.lookups += 1
+        if key > _MASK64:
+            key = _fold64(key)
+        keys = self.keys
+        ages = self.ages
+        slot = self._slot(key)
+        mask = self._mask
+
+        for _ in range(self.probe):
+            if not ages[slot]:
+                return None
+            meta = self.meta[slot]
+            value = self.values[slot]
+            if keys[slot] ^ _check(value, meta) == key:
+                if meta & 1 == kind:
+                    if meta >> 1 >= depth:
+                        self.hits += 1
+                        ages[slot] = self.generation
+                        return value
+                    self.shallow += 1
+                    return None
+            slot = (slot + 1) & mask
+
+        return None
+
+    def store(self, key: int, kind: int, depth: int, value: float) -> None:
+        self.stores += 1
+        if key > _MASK64:
+            key = _fold64(key)
+        keys = self.keys
+        values = self.values
+        ages = self.ages
+        meta = self.meta
+        generation = self.generation
+        slot = self._slot(key)
+        mask = self._mask
+
+        victim = -1
+        victim_rank = None
+
+        for _ in range(self.probe):
+            age = ages[slot]
+            if not age:
+                victim = slot
+                self.used += 1
+                break
+            if keys[slot] ^ _check(values[slot], meta[slot]) == key and meta[slot] & 1 == kind:
+                if meta[slot] >> 1 > depth:
+                    # głębszy wynik zostaje, odświeżamy tylko generację
+                    ages[slot] = generation
+                    return
+                victim = slot
+                break
+            # najpierw najstarsza generacja, potem najpłytszy wpis
+            rank = (age, meta[slot] >> 1)
+            if victim_rank is None or rank < victim_rank:
+                victim = slot
+                victim_rank = rank
+            slot = (slot + 1) & mask
+        else:
+            self.evictions += 1
+
+        stored_meta = (min(depth, 127) << 1) | kind
+        values[victim] = value
+        meta[victim] = stored_meta
+        keys[victim] = key ^ _check(value, stored_meta)
+        ages[victim] = generation
+
+    def clear(self) -> None:
+        n = self.size
+        self._view[16 * n:18 * n] = bytes(2 * n)
+        self.generation = 1
+        self.used = 0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "shallow": self.shallow,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "fill": self.used / self.size,
+        }
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    Tablica w multiprocessing.shared_memory. Właściciel (name=None) tworzy segment,
+    procesy robocze dołączają do niego po nazwie z tymi samymi size_mb i probe.
+    Liczniki statystyk są lokalne dla procesu, generację ustawia właściciel.
+    """
+
+    def __init__(self, size_mb: float = 16.0, probe: int = 4, name: Optional[str] = None) -> None:
+        nbytes = _table_size(size_mb, probe) * ENTRY_BYTES
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create = True, size = nbytes)
+            self._owner = True
+        else:
+            self._shm = shared_memory.SharedMemory(name = name)
+            self._owner = False
+        self._buf = self._shm.buf[:nbytes]
+        super().__init__(size_mb, probe, buffer = self._buf)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def close(self) -> None:
+        """Odłącza segment; właściciel dodatkowo go usuwa."""
+        if self._shm is None:
+            return
+        self._release()
+        self._buf.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
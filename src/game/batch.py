@@ -0,0 +1,196 @@
+# src/game/batch.py
+"""
+Wektorowe środowisko 2048: N plansz trzymanych jako tablica wykładników
+(N, 4, 4) uint8 i przesuwanych jednocześnie w NumPy.
+
+Ruchy liczone są tymi samymi tablicami wierszy co silnik bitboard
+(src/game/bitboard.py). Spawny są losowane z osobnego, deterministycznego
+strumienia dla każdej gry (licznik + splitmix64), więc wynik gry zależy tylko
+od jej seeda, a nie od rozmiaru ani składu partii. Strumień nie odtwarza
+sekwencji random.Random z GameState.
+"""
+from __future__ import annotations
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.game import bitboard as bb
+from src.game.state import ALLOWED_MOVES
+
+MOVE_INDEX = {m: i for i, m in enumerate(ALLOWED_MOVES)}
+
+_ROW_LEFT = np.array(bb.ROW_LEFT, dtype = np.uint16)
+_GAIN_LEFT = np.array(bb.GAIN_LEFT, dtype = np.int64)
+_SHIFTS = np.array([0, 4, 8, 12], dtype = np.uint16)
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    z = x + _GOLDEN
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _to_left(exps: np.ndarray, move_idx: int) -> np.ndarray:
+    """Obraca stos plansz tak, by ruch `move_idx` stał się ruchem w lewo."""
+    move = ALLOWED_MOVES[move_idx]
+    if move == "left":
+        return exps
+    if move == "right":
+        return exps[:, :, ::-1]
+    if move == "up":
+        return exps.transpose(0, 2, 1)
+    return exps.transpose(0, 2, 1)[:, :, ::-1]
+
+
+def _from_left(exps: np.ndarray, move_idx: int) -> np.ndarray:
+    move = ALLOWED_MOVES[move_idx]
+    if move == "left":
+        return exps
+    if move == "right":
+        return exps[:, :, ::-1]
+    if move == "up":
+        return exps.transpose(0, 2, 1)
+    return exps[:, :, ::-1].transpose(0, 2, 1)
+
+
+def slide_left(exps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Ruch w lewo dla stosu (N, 4, 4); zwraca (nowe plansze, zysk (N,))."""
+    rows = exps.astype(np.uint16)
+    idx = (rows << _SHIFTS).sum(axis = 2, dtype = np.uint16)
+    res = _ROW_LEFT[idx]
+    out = ((res[:, :, None] >> _SHIFTS) & 0xF).astype(np.uint8)
+    return out, _GAIN_LEFT[idx].sum(axis = 1)
+
+
+def all_afterstates(exps: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Wszystkie 4 ruchy naraz: (plansze (4, N, 4, 4), zyski (4, N), czy coś się ruszyło (4, N)).
+    Kolejność ruchów jak w ALLOWED_MOVES.
+    """
+    n = exps.shape[0]
+    after = np.empty((4, n, 4, 4), dtype = np.uint8)
+    gains = np.empty((4, n), dtype = np.int64)
+
+    for m in range(4):
+        moved_left, gain = slide_left(_to_left(exps, m))
+        after[m] = _from_left(moved_left, m)
+        gains[m] = gain
+
+    moved = (after != exps[None]).any(axis = (2, 3))
+    return after, gains, moved
+
+
+class BatchGameState:
+    """N niezależnych gier 2048 przesuwanych w jednym kroku."""
+
+    def __init__(
+            self,
+            seeds: Sequence[int],
+            exps: Optional[np.ndarray] = None,
+    ) -> None:
+        self.seeds = np.asarray(seeds, dtype = np.int64)
+        n = len(self.seeds)
+        self._keys = _splitmix64(self.seeds.astype(np.uint64))
+        self._counters = np.zeros(n, dtype = np.uint64)
+
+        self.scores = np.zeros(n, dtype = np.int64)
+        self.moves_count = np.zeros(n, dtype = np.int64)
+
+        if exps is None:
+            self.exps = np.zeros((n, 4, 4), dtype = np.uint8)
+            everyone = np.ones(n, dtype = bool)
+            # jak logic.new_game: dwa kafelki "2" na pustej planszy
+            self._spawn(everyone, allow_four = False)
+            self._spawn(everyone, allow_four = False)
+        else:
+            self.exps = np.array(exps, dtype = np.uint8).reshape(n, 4, 4)
+
+        self.done = np.zeros(n, dtype = bool)
+        self._refresh()
+
+    @classmethod
+    def from_boards(cls, seeds: Sequence[int], boards) -> "BatchGameState":
+        """Tworzy partię z listy plansz (wartości kafelków, nie wykładniki)."""
+        values = np.asarray(boards, dtype = np.int64)
+        exps = np.where(values > 0, np.log2(np.maximum(values, 1)), 0).astype(np.uint8)
+        return cls(seeds, exps = exps)
+
+    def __len__(self) -> int:
+        return len(self.seeds)
+
+    def _uniform(self, mask: np.ndarray) -> np.ndarray:
+        """Kolejna liczba z [0, 1) dla każdej gry; licznik przesuwa się tylko dla `mask`."""
+        z = _splitmix64(self._keys + self._counters * _GOLDEN)
+        self._counters += mask.astype(np.uint64)
+        return (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+    def _spawn(self, mask: np.ndarray, allow_four: bool = True) -> None:
+        flat = self.exps.reshape(len(self), 16)
+        empty = flat == 0
+        n_empty = empty.sum(axis = 1)
+        mask = mask & (n_empty > 0)
+
+        u_cell = self._uniform(mask)
+        u_val = self._uniform(mask)
+
+        if not mask.any():
+            return
+
+        pick = np.minimum((u_cell * n_empty).astype(np.int64), np.maximum(n_empty - 1, 0))
+        cell = (np.cumsum(empty, axis = 1) > pick[:, None]).argmax(axis = 1)
+        value = np.where(allow_four & (u_val < 0.1), 2, 1).astype(np.uint8)
+
+        rows = np.nonzero(mask)[0]
+        flat[rows, cell[rows]] = value[rows]
+
+    def _refresh(self) -> None:
+        self._after, self._gains, moved = all_afterstates(self.exps)
+        won = (self.exps == bb.WIN_EXPONENT).any(axis = (1, 2))
+        self.done = won | ~moved.any(axis = 0)
+        self._legal = moved & ~self.done[None]
+
+    def afterstates(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(plansze po ruchu bez spawnu (4, N, 4, 4), zyski (4, N), maska legalnych ruchów (4, N))."""
+        return self._after, self._gains, self._legal
+
+    def legal_mask(self) -> np.ndarray:
+        """Maska legalnych ruchów (N, 4) w kolejności ALLOWED_MOVES."""
+        return self._legal.T
+
+    def step(self, moves: np.ndarray, spawn: bool = True) -> np.ndarray:
+        """
+        Wykonuje ruchy (indeksy w ALLOWED_MOVES, kształt (N,)) dla wszystkich aktywnych gier.
+        Gry zakończone i ruchy nielegalne nie zmieniają planszy. Zwraca nagrody (N,).
+        """
+        moves = np.asarray(moves, dtype = np.int64)
+        idx = np.arange(len(self))
+        moved = self._legal[moves, idx]
+
+        rewards = np.where(moved, self._gains[moves, idx], 0)
+        self.exps = np.where(moved[:, None, None], self._after[moves, idx], self.exps)
+        self.scores += rewards
+        self.moves_count += moved
+
+        if spawn:
+            self._spawn(moved)
+
+        self._refresh()
+        return rewards
+
+    def boards(self) -> np.ndarray:
+        """Plansze jako wartości kafelków (N, 4, 4)."""
+        return np.where(self.exps > 0, np.left_shift(1, self.exps.astype(np.int64)), 0)
+
+    def max_tile(self) -> np.ndarray:
+        m = self.exps.max(axis = (1, 2)).astype(np.int64)
+        return np.where(m > 0, np.left_shift(1, m), 0)
+
+    def empty_count(self) -> np.ndarray:
+        return (self.exps == 0).sum(axis = (1, 2))
+
+    def all_done(self) -> bool:
+        return bool(self.done.all())
@@ -0,0 +1,425 @@
+# src/game/bitboard.py
+"""
+Spakowany silnik 2048: plansza 4x4 trzymana jako 16 wykładników (po 4 bity)
+w jednej 64-bitowej liczbie całkowitej.
+
+Komórka (r, c) zajmuje półbajt o indeksie 4 * r + c, tzn. wiersz r to bity
+16 * r .. 16 * r + 15, a kolumna c w wierszu to bity 4 * c .. 4 * c + 3.
+Wartość 0 oznacza puste pole, k > 0 oznacza kafelek 2 ** k.
+
+Największy kafelek to 2 ** 15 = 32768 (MAX_EXPONENT): pack_board odrzuca większe
+(ValueError), a dwa kafelki 32768 się nie łączą - w odróżnieniu od backendu list,
+który dałby 65536.
+
+Ruchy, zysk punktowy i wykrywanie "czy coś się ruszyło" liczone są przez
+tablice przejść dla wszystkich 65 536 możliwych wierszy.
+
+Dla innych rozmiarów planszy (3x3, 5x5, 6x6, ...) służy BoardEngine z
+get_engine(size): ten sam układ wierszy, ale szerokość komórki i tablice
+wierszy zależą od rozmiaru (patrz niżej).
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+Bitboard = int
+
+ROW_MASK = 0xFFFF
+COL_MASK = 0x000F000F000F000F
+MAX_EXPONENT = 15
+WIN_EXPONENT = 11  # 2048
+
+MOVES: tuple[str, ...] = ("up", "down", "left", "right")
+
+
+def _reverse_row(row: int) -> int:
+    return (
+        ((row & 0x000F) << 12)
+        | ((row & 0x00F0) << 4)
+        | ((row & 0x0F00) >> 4)
+        | ((row & 0xF000) >> 12)
+    )
+
+
+def _unpack_col(row: int) -> int:
+    """Rozkłada 16-bitowy wiersz na kolumnę (półbajty co 16 bitów)."""
+    return (row | (row << 12) | (row << 24) | (row << 36)) & COL_MASK
+
+
+def _slide_row_left(row: int, size: int = 4, cell_bits: int = 4) -> Tuple[int, int]:
+    """Przesuwa jeden wiersz w lewo; zwraca (nowy wiersz, zysk)."""
+    cell_mask = (1 << cell_bits) - 1
+    tiles = [(row >> (cell_bits * i)) & cell_mask for i in range(size)]
+    tiles = [t for t in tiles if t]
+    out: List[int] = []
+    gain = 0
+    i = 0
+    while i < len(tiles):
+        t = tiles[i]
+        if i + 1 < len(tiles) and tiles[i + 1] == t and t < cell_mask:
+            out.append(t + 1)
+            gain += 1 << (t + 1)
+            i += 2
+        else:
+            out.append(t)
+            i += 1
+
+    result = 0
+    for k, t in enumerate(out):
+        result |= t << (cell_bits * k)
+    return result, gain
+
+
+def _build_tables() -> Tuple[List[int], List[int], List[int], List[int], List[int], List[int]]:
+    row_left = [0] * 65536
+    row_right = [0] * 65536
+    col_up = [0] * 65536
+    col_down = [0] * 65536
+    gain_left = [0] * 65536
+    gain_right = [0] * 65536
+
+    for row in range(65536):
+        result, gain = _slide_row_left(row)
+        rev_row = _reverse_row(row)
+        rev_result = _reverse_row(result)
+
+        row_left[row] = result
+        gain_left[row] = gain
+        row_right[rev_row] = rev_result
+        gain_right[rev_row] = gain
+        col_up[row] = _unpack_col(result)
+        col_down[rev_row] = _unpack_col(rev_result)
+
+    return row_left, row_right, col_up, col_down, gain_left, gain_right
+
+
+ROW_LEFT, ROW_RIGHT, COL_UP, COL_DOWN, GAIN_LEFT, GAIN_RIGHT = _build_tables()
+
+
+def transpose(board: Bitboard) -> Bitboard:
+    a1 = board & 0xF0F00F0FF0F00F0F
+    a2 = board & 0x0000F0F00000F0F0
+    a3 = board & 0x0F0F00000F0F0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00FF0000FF00FF
+    b2 = a & 0x00FF00FF00000000
+    b3 = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def move_left(board: Bitboard) -> Tuple[Bitboard, int]:
+    r0 = board & ROW_MASK
+    r1 = (board >> 16) & ROW_MASK
+    r2 = (board >> 32) & ROW_MASK
+    r3 = (board >> 48) & ROW_MASK
+    result = ROW_LEFT[r0] | (ROW_LEFT[r1] << 16) | (ROW_LEFT[r2] << 32) | (ROW_LEFT[r3] << 48)
+    return result, GAIN_LEFT[r0] + GAIN_LEFT[r1] + GAIN_LEFT[r2] + GAIN_LEFT[r3]
+
+
+def move_right(board: Bitboard) -> Tuple[Bitboard, int]:
+    r0 = board & ROW_MASK
+    r1 = (board >> 16) & ROW_MASK
+    r2 = (board >> 32) & ROW_MASK
+    r3 = (board >> 48) & ROW_MASK
+    result = ROW_RIGHT[r0] | (ROW_RIGHT[r1] << 16) | (ROW_RIGHT[r2] << 32) | (ROW_RIGHT[r3] << 48)
+    return result, GAIN_RIGHT[r0] + GAIN_RIGHT[r1] + GAIN_RIGHT[r2] + GAIN_RIGHT[r3]
+
+
+def move_up(board: Bitboard) -> Tuple[Bitboard, int]:
+    t = transpose(board)
+    c0 = t & ROW_MASK
+    c1 = (t >> 16) & ROW_MASK
+    c2 = (t >> 32) & ROW_MASK
+    c3 = (t >> 48) & ROW_MASK
+    result = COL_UP[c0] | (COL_UP[c1] << 4) | (COL_UP[c2] << 8) | (COL_UP[c3] << 12)
+    return result, GAIN_LEFT[c0] + GAIN_LEFT[c1] + GAIN_LEFT[c2] + GAIN_LEFT[c3]
+
+
+def move_down(board: Bitboard) -> Tuple[Bitboard, int]:
+    t = transpose(board)
+    c0 = t & ROW_MASK
+    c1 = (t >> 16) & ROW_MASK
+    c2 = (t >> 32) & ROW_MASK
+    c3 = (t >> 48) & ROW_MASK
+    result = COL_DOWN[c0] | (COL_DOWN[c1] << 4) | (COL_DOWN[c2] << 8) | (COL_DOWN[c3] << 12)
+    return result, GAIN_RIGHT[c0] + GAIN_RIGHT[c1] + GAIN_RIGHT[c2] + GAIN_RIGHT[c3]
+
+
+MOVE_FUNCS = {
+    "up": move_up,
+    "down": move_down,
+    "left": move_left,
+    "right": move_right,
+}
+
+
+def execute_move(board: Bitboard, move: str) -> Tuple[Bitboard, bool, int]:
+    """Zwraca (nowa plansza, czy coś się ruszyło, zysk punktowy)."""
+    result, gain = MOVE_FUNCS[move](board)
+    return result, result != board, gain
+
+
+def legal_moves(board: Bitboard) -> List[str]:
+    return [m for m in MOVES if MOVE_FUNCS[m](board)[0] != board]
+
+
+def count_empty(board: Bitboard) -> int:
+    empty = 0
+    for i in range(16):
+        if not (board >> (4 * i)) & 0xF:
+            empty += 1
+    return empty
+
+
+def empty_cells(board: Bitboard) -> List[Tuple[int, int]]:
+    return [(i >> 2, i & 3) for i in range(16) if not (board >> (4 * i)) & 0xF]
+
+
+def max_exponent(board: Bitboard) -> int:
+    best = 0
+    while board:
+        t = board & 0xF
+        if t > best:
+            best = t
+        board >>= 4
+    return best
+
+
+def has_exponent(board: Bitboard, exponent: int) -> bool:
+    for i in range(16):
+        if (board >> (4 * i)) & 0xF == exponent:
+            return True
+    return False
+
+
+def is_terminal(board: Bitboard) -> bool:
+    """Odpowiednik logic.game_state(...) in ("win", "lose")."""
+    if has_exponent(board, WIN_EXPONENT):
+        return True
+    if count_empty(board):
+        return False
+    # pełna plansza: ruch w lewo zmienia ją wtedy i tylko wtedy, gdy zmienia ją ruch w prawo
+    return move_left(board)[0] == board and move_up(board)[0] == board
+
+
+def set_cell(board: Bitboard, r: int, c: int, exponent: int) -> Bitboard:
+    shift = 4 * (4 * r + c)
+    return (board & ~(0xF << shift)) | (exponent << shift)
+
+
+def get_cell(board: Bitboard, r: int, c: int) -> int:
+    return (board >> (4 * (4 * r + c))) & 0xF
+
+
+def pack_board(board: List[List[int]]) -> Bitboard:
+    """Lista list wartości kafelków -> spakowana plansza (kafelki do 2 ** MAX_EXPONENT)."""
+    packed = 0
+    for r in range(4):
+        row = board[r]
+        for c in range(4):
+            v = row[c]
+            if v:
+                t = v.bit_length() - 1
+                if t > MAX_EXPONENT:
+                    raise ValueError(f"Kafelek {v} nie mieści się w 4 bitach (max {1 << MAX_EXPONENT})")
+                packed |= t << (4 * (4 * r + c))
+    return packed
+
+
+def unpack_board(board: Bitboard) -> List[List[int]]:
+    """Spakowana plansza -> lista list wartości kafelków."""
+    out: List[List[int]] = []
+    for r in range(4):
+        row: List[int] = []
+        for c in range(4):
+            t = (board >> (4 * (4 * r + c))) & 0xF
+            row.append(1 << t if t else 0)
+        out.append(row)
+    return out
+
+
+# --- plansze dowolnego rozmiaru ---
+
+def _reverse_cells(row: int, size: int, cell_bits: int) -> int:
+    cell_mask = (1 << cell_bits) - 1
+    out = 0
+    for i in range(size):
+        out |= ((row >> (cell_bits * i)) & cell_mask) << (cell_bits * (size - 1 - i))
+    return out
+
+
+class _RowCache(dict):
+    """Tablica wierszy wypełniana na żądanie (dla rozmiarów, gdzie pełna tablica jest za duża)."""
+
+    def __init__(self, size: int, cell_bits: int) -> None:
+        super().__init__()
+        self.size = size
+        self.cell_bits = cell_bits
+
+    def __missing__(self, row: int) -> Tuple[int, int, int, int]:
+        entry = _row_entry(row, self.size, self.cell_bits)
+        self[row] = entry
+        return entry
+
+
+def _row_entry(row: int, size: int, cell_bits: int) -> Tuple[int, int, int, int]:
+    """(wiersz po ruchu w lewo, zysk, wiersz po ruchu w prawo, zysk)"""
+    left, gain_left = _slide_row_left(row, size, cell_bits)
+    rev_right, gain_right = _slide_row_left(_reverse_cells(row, size, cell_bits), size, cell_bits)
+    return left, gain_left, _reverse_cells(rev_right, size, cell_bits), gain_right
+
+
+class BoardEngine:
+    """
+    Spakowana plansza size x size. Komórka (r, c) to pole bitowe o indeksie size * r + c.
+
+    - size <= 4: 4 bity na komórkę (kafelki do 2 ** 15, plansza mieści się w 64 bitach),
+      pełna tablica wierszy (16 ** size wpisów) budowana przy pierwszym użyciu rozmiaru,
+    - size >= 5: 5 bitów na komórkę (kafelki do 2 ** 31, liczba całkowita szersza niż 64 bity),
+      wiersze liczone leniwie i zapamiętywane - w praktyce gra odwiedza znikomy
+      ułamek z 32 ** size możliwych wierszy.
+
+    Większe kafelki pack_board odrzuca (ValueError); dwa największe kafelki się nie łączą.
+    """
+
+    FULL_TABLE_MAX_SIZE = 4
+
+    def __init__(self, size: int) -> None:
+        if size < 2:
+            raise ValueError(f"Nieobsługiwany rozmiar planszy: {size}")
+        self.size = size
+        self.cell_bits = 4 if size <= self.FULL_TABLE_MAX_SIZE else 5
+        self.cell_mask = (1 << self.cell_bits) - 1
+        self.row_bits = size * self.cell_bits
+        self.row_mask = (1 << self.row_bits) - 1
+        self.n_cells = size * size
+
+        self._rows: Dict[int, Tuple[int, int, int, int]] | List[Tuple[int, int, int, int]]
+        if size <= self.FULL_TABLE_MAX_SIZE:
+            self._rows = [_row_entry(row, size, self.cell_bits) for row in range(1 << self.row_bits)]
+        else:
+            self._rows = _RowCache(size, self.cell_bits)
+
+    def _shift(self, r: int, c: int) -> int:
+        return self.cell_bits * (self.size * r + c)
+
+    def transpose(self, board: Bitboard) -> Bitboard:
+        n = self.size
+        out = 0
+        for r in range(n):
+            for c in range(n):
+                out |= ((board >> self._shift(r, c)) & self.cell_mask) << self._shift(c, r)
+        return out
+
+    def _move_rows(self, board: Bitboard, right: bool) -> Tuple[Bitboard, int]:
+        rows = self._rows
+        result = 0
+        gain = 0
+        for r in range(self.size):
+            shift = r * self.row_bits
+            entry = rows[(board >> shift) & self.row_mask]
+            if right:
+                result |= entry[2] << shift
+                gain += entry[3]
+            else:
+                result |= entry[0] << shift
+                gain += entry[1]
+        return result, gain
+
+    def execute_move(self, board: Bitboard, move: str) -> Tuple[Bitboard, bool, int]:
+        """Zwraca (nowa plansza, czy coś się ruszyło, zysk punktowy)."""
+        if move == "left" or move == "right":
+            result, gain = self._move_rows(board, move == "right")
+        elif move == "up" or move == "down":
+            moved_t, gain = self._move_rows(self.transpose(board), move == "down")
+            result = self.transpose(moved_t)
+        else:
+            raise ValueError(f"Nieznany ruch: {move}")
+        return result, result != board, gain
+
+    def legal_moves(self, board: Bitboard) -> List[str]:
+        return [m for m in MOVES if self.execute_move(board, m)[1]]
+
+    def cells(self, board: Bitboard) -> List[int]:
+        return [(board >> (self.cell_bits * i)) & self.cell_mask for i in range(self.n_cells)]
+
+    def count_empty(self, board: Bitboard) -> int:
+        return self.cells(board).count(0)
+
+    def empty_cells(self, board: Bitboard) -> List[Tuple[int, int]]:
+        n = self.size
+        return [divmod(i, n) for i, t in enumerate(self.cells(board)) if not t]
+
+    def max_exponent(self, board: Bitboard) -> int:
+        return max(self.cells(board))
+
+    def has_exponent(self, board: Bitboard, exponent: int) -> bool:
+        return exponent in self.cells(board)
+
+    def is_terminal(self, board: Bitboard) -> bool:
+        if self.has_exponent(board, WIN_EXPONENT):
+            return True
+        if self.count_empty(board):
+            return False
+        return not self.execute_move(board, "left")[1] and not self.execute_move(board, "up")[1]
+
+    def set_cell(self, board: Bitboard, r: int, c: int, exponent: int) -> Bitboard:
+        shift = self._shift(r, c)
+        return (board & ~(self.cell_mask << shift)) | (exponent << shift)
+
+    def get_cell(self, board: Bitboard, r: int, c: int) -> int:
+        return (board >> self._shift(r, c)) & self.cell_mask
+
+    def pack_board(self, board: List[List[int]]) -> Bitboard:
+        packed = 0
+        for r in range(self.size):
+            row = board[r]
+            for c in range(self.size):
+                v = row[c]
+                if v:
+                    t = v.bit_length() - 1
+                    if t > self.cell_mask:
+                        raise ValueError(
+                            f"Kafelek {v} nie mieści się w {self.cell_bits} bitach (max {1 << self.cell_mask})"
+                        )
+                    packed |= t << self._shift(r, c)
+        return packed
+
+    def unpack_board(self, board: Bitboard) -> List[List[int]]:
+        n = self.size
+        flat = [1 << t if t else 0 for t in self.cells(board)]
+        return [flat[r * n:(r + 1) * n] for r in range(n)]
+
+
+class _Engine4x4(BoardEngine):
+    """BoardEngine dla 4x4 korzystający z wyspecjalizowanych funkcji modułu."""
+
+    def __init__(self) -> None:
+        self.size = 4
+        self.cell_bits = 4
+        self.cell_mask = 0xF
+        self.row_bits = 16
+        self.row_mask = ROW_MASK
+        self.n_cells = 16
+
+    transpose = staticmethod(transpose)
+    execute_move = staticmethod(execute_move)
+    legal_moves = staticmethod(legal_moves)
+    count_empty = staticmethod(count_empty)
+    empty_cells = staticmethod(empty_cells)
+    max_exponent = staticmethod(max_exponent)
+    has_exponent = staticmethod(has_exponent)
+    is_terminal = staticmethod(is_terminal)
+    set_cell = staticmethod(set_cell)
+    get_cell = staticmethod(get_cell)
+    pack_board = staticmethod(pack_board)
+    unpack_board = staticmethod(unpack_board)
+
+
+@lru_cache(maxsize = None)
+def get_engine(size: int = 4) -> BoardEngine:
+    """Silnik dla planszy size x size; tablice wierszy budowane przy pierwszym wywołaniu."""
+    if size == 4:
+        return _Engine4x4()
+    return BoardEngine(size)
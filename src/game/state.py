@@ -1,16 +1,19 @@
 # src/game/state.py
 from __future__ import annotations
 
-import copy
 import random
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Optional, Tuple
 
+from src.game import bitboard as bb
 from src.game import constants as c
-from src.game.logic import game_state, new_game
+from src.game.logic import new_game
 
 Move = str
 ALLOWED_MOVES: tuple[str, ...] = ("up", "down", "left", "right")
+MOVE_INDEX = {m: i for i, m in enumerate(ALLOWED_MOVES)}
+Successor = Tuple[Move, List[List[int]], int]
 
 
 @dataclass
@@ -19,52 +22,189 @@ class StepResult:
     done: bool
 
 
-class GameState:
-    def __init__(
-            self,
-            seed: Optional[int] = None,
-            board: Optional[List[List[int]]] = None,
-            score: int = 0,
-    ) -> None:
-        self.rng = random.Random(seed)
-        self._seed = seed
-        self.board = new_game(c.GRID_LEN) if board is None else copy.deepcopy(board)
-        self.score = int(score)
-        self.done = self._compute_done()
+@lru_cache(maxsize = None)
+def _move_lines(size: int, move: Move) -> Tuple[Tuple[Tuple[int, int], ...], ...]:
+    """Współrzędne linii planszy w kolejności, w której ruch `move` zsuwa kafelki (pierwsza = docelowa)."""
+    idx = range(size)
+    if move == "left":
+        return tuple(tuple((i, j) for j in idx) for i in idx)
+    if move == "right":
+        return tuple(tuple((i, size - 1 - j) for j in idx) for i in idx)
+    if move == "up":
+        return tuple(tuple((j, i) for j in idx) for i in idx)
+    return tuple(tuple((size - 1 - j, i) for j in idx) for i in idx)
 
-    def reset(self, seed: Optional[int] = None) -> None:
-        if seed is not None:
-            self.rng = random.Random(seed)
-            self._seed = seed
-        elif self._seed is not None:
-            self.rng = random.Random(self._seed)
-        self.board = new_game(c.GRID_LEN)
-        self.score = 0
-        self.done = self._compute_done()
 
-    def clone(self) -> "GameState":
-        return GameState(seed=self._seed, board=self.board, score=self.score)
+def _slide_values(values: List[int]) -> Tuple[List[int], int]:
+    """
+    Zsunięcie i scalenie jednej linii (wartości kafelków) - jedyna implementacja reguły
+    ruchu w backendzie list (symulacja i ruch w miejscu); zachowuje się jak cover_up/merge z logic.
+    """
+    tiles = [v for v in values if v]
+    out: List[int] = []
+    gain = 0
+    i = 0
+    while i < len(tiles):
+        v = tiles[i]
+        if i + 1 < len(tiles) and tiles[i + 1] == v:
+            out.append(2 * v)
+            gain += 2 * v
+            i += 2
+        else:
+            out.append(v)
+            i += 1
+    out.extend([0] * (len(values) - len(out)))
+    return out, gain
+
+
+class _CachedState:
+    """
+    Część wspólna backendów stanu gry.
+
+    Węzły przeszukiwania tworzone są masowo, więc stan jest "lekki":
+    - __slots__ zamiast __dict__,
+    - RNG tworzony leniwie z seeda dopiero przy pierwszym spawnie
+      (klon dostaje świeży Random(seed), tak jak wcześniej, ale tylko jeśli go użyje),
+    - pochodne planszy (ruchy po symulacji, maska legalnych ruchów, puste pola,
+      max tile, flaga końca gry) liczone są raz na zmianę planszy i unieważniane
+      przy każdym przypisaniu nowej planszy.
+
+    Planszy nie należy modyfikować w miejscu - tylko przez step/reset/przypisanie
+    albo przez parę make/unmake (apply_move/place_tile + undo), która sama pilnuje cache.
+    """
+
+    __slots__ = ("_rng", "_seed", "score", "_moves", "_mask", "_empties", "_max_tile", "_win", "_done", "_undo")
+
+    # --- do zaimplementowania przez backend ---
+
+    def _simulate(self, move: Move):
+        """(plansza po ruchu w natywnej reprezentacji, czy się ruszyło, zysk)"""
+        raise NotImplementedError
+
+    def _scan(self) -> Tuple[List[Tuple[int, int]], int, bool]:
+        """(puste pola, max tile, czy jest kafelek 2048)"""
+        raise NotImplementedError
+
+    def _set_native(self, native) -> None:
+        raise NotImplementedError
+
+    def _native_to_board(self, native) -> List[List[int]]:
+        raise NotImplementedError
+
+    def _place(self, r: int, k: int, value: int) -> None:
+        raise NotImplementedError
+
+    def _move_in_place(self, move: Move):
+        """Ruch w miejscu: (dane do cofnięcia albo None, jeśli nic się nie ruszyło; zysk)"""
+        raise NotImplementedError
+
+    def _place_in_place(self, r: int, k: int, value: int):
+        """Wstawia kafelek w miejscu i zwraca dane do cofnięcia."""
+        raise NotImplementedError
+
+    def _restore(self, payload) -> None:
+        raise NotImplementedError
+
+    # --- cache ---
+
+    def _invalidate(self) -> None:
+        self._moves = None
+        self._mask = None
+        self._empties = None
+        self._max_tile = None
+        self._win = None
+        self._done = None
+
+    def _cache_snapshot(self) -> tuple:
+        return self._moves, self._mask, self._empties, self._max_tile, self._win, self._done
+
+    def _restore_cache(self, snapshot: tuple) -> None:
+        self._moves, self._mask, self._empties, self._max_tile, self._win, self._done = snapshot
+
+    def _copy_cache_to(self, other: "_CachedState") -> None:
+        other._moves = self._moves
+        other._mask = self._mask
+        other._empties = self._empties
+        other._max_tile = self._max_tile
+        other._win = self._win
+        other._done = self._done
+
+    def _all_moves(self) -> list:
+        """Wszystkie ruchy zmieniające planszę (bez względu na `done`), każdy symulowany raz."""
+        if self._moves is None:
+            out = []
+            for m in ALLOWED_MOVES:
+                after, moved, gain = self._simulate(m)
+                if moved:
+                    out.append((m, after, gain))
+            self._moves = out
+        return self._moves
+
+    def _ensure_scan(self) -> None:
+        if self._empties is None:
+            self._empties, self._max_tile, self._win = self._scan()
+
+    # --- publiczny interfejs ---
+
+    @property
+    def rng(self) -> random.Random:
+        if self._rng is None:
+            self._rng = random.Random(self._seed)
+        return self._rng
+
+    @rng.setter
+    def rng(self, value: random.Random) -> None:
+        self._rng = value
+
+    @property
+    def done(self) -> bool:
+        if self._done is None:
+            self._done = self._compute_done()
+        return self._done
+
+    @done.setter
+    def done(self, value: Optional[bool]) -> None:
+        self._done = value
+
+    def legal_mask(self) -> int:
+        """Bit i ustawiony <=> ALLOWED_MOVES[i] jest legalny."""
+        if self._mask is None:
+            mask = 0
+            if not self.done:
+                for m, _, _ in self._all_moves():
+                    mask |= 1 << MOVE_INDEX[m]
+            self._mask = mask
+        return self._mask
 
     def legal_moves(self) -> List[Move]:
         if self.done:
             return []
-        legal: List[Move] = []
-        for m in ALLOWED_MOVES:
-            _, moved, _ = self._simulate_move_with_gain(m, self.board)
-            if moved:
-                legal.append(m)
-        return legal
+        return [m for m, _, _ in self._all_moves()]
+
+    def successors(self) -> List[Successor]:
+        """
+        Zwraca (ruch, plansza po ruchu bez spawnu, zysk) dla każdego legalnego ruchu.
+        Każdy ruch symulowany jest dokładnie raz na planszę; zwróconych plansz nie modyfikować.
+        """
+        if self.done:
+            return []
+        return [(m, self._native_to_board(after), gain) for m, after, gain in self._all_moves()]
 
     def is_terminal(self) -> bool:
-        return self._compute_done()
+        return self.done
 
     def empty_cells(self) -> List[Tuple[int, int]]:
-        cells: List[Tuple[int, int]] = []
-        for r in range(c.GRID_LEN):
-            for k in range(c.GRID_LEN):
-                if self.board[r][k] == 0:
-                    cells.append((r, k))
-        return cells
+        """Lista pustych pól (kopia - zmiany wyniku nie psują cache'a)."""
+        self._ensure_scan()
+        return list(self._empties)
+
+    def empty_count(self) -> int:
+        self._ensure_scan()
+        return len(self._empties)
+
+    def max_tile(self) -> int:
+        self._ensure_scan()
+        return self._max_tile
 
     def step(self, move: Move, spawn: bool = True) -> StepResult:
         if self.done:
@@ -72,90 +212,68 @@ class GameState:
         if move not in ALLOWED_MOVES:
             raise ValueError(f"Nieznany ruch: {move}")
 
-        new_board, moved, gain = self._simulate_move_with_gain(move, self.board)
+        if self._moves is not None:
+            after, moved, gain = None, False, 0
+            for m, a, g in self._moves:
+                if m == move:
+                    after, moved, gain = a, True, g
+                    break
+        else:
+            after, moved, gain = self._simulate(move)
+
         if not moved:
-            self.done = self._compute_done()
             return StepResult(reward=0, done=self.done)
 
-        self.board = new_board
+        self._set_native(after)
         self.score += gain
 
         if spawn:
             self._spawn_tile()
 
-        self.done = self._compute_done()
         return StepResult(reward=gain, done=self.done)
 
-    def _simulate_move_with_gain(
-            self, move: Move, board: List[List[int]]
-    ) -> Tuple[List[List[int]], bool, int]:
-        b = copy.deepcopy(board)
-        gain = 0
+    # --- make/unmake (przeszukiwanie jednej linii gry bez kopiowania stanu) ---
 
-        def cover_up(mat: List[List[int]]) -> Tuple[List[List[int]], bool]:
-            new = [[0] * c.GRID_LEN for _ in range(c.GRID_LEN)]
-            done_local = False
-            for i in range(c.GRID_LEN):
-                count = 0
-                for j in range(c.GRID_LEN):
-                    if mat[i][j] != 0:
-                        new[i][count] = mat[i][j]
-                        if j != count:
-                            done_local = True
-                        count += 1
-            return new, done_local
-
-        def merge_gain(mat: List[List[int]], done_flag: bool) -> Tuple[List[List[int]], bool]:
-            nonlocal gain
-            for i in range(c.GRID_LEN):
-                for j in range(c.GRID_LEN - 1):
-                    if mat[i][j] != 0 and mat[i][j] == mat[i][j + 1]:
-                        mat[i][j] *= 2
-                        gain += mat[i][j]
-                        mat[i][j + 1] = 0
-                        done_flag = True
-            return mat, done_flag
-
-        def reverse(mat: List[List[int]]) -> List[List[int]]:
-            return [list(reversed(row)) for row in mat]
-
-        def transpose(mat: List[List[int]]) -> List[List[int]]:
-            return [list(row) for row in zip(*mat)]
-
-        before = [row[:] for row in b]  # szybka kopia
-
-        d1 = False # Inicjalizacja d1 i d2
-        d2 = False
-
-        if move == "left":
-            b, d1 = cover_up(b)
-            b, d2 = merge_gain(b, d1) # Poprawka: przekazujemy d1
-            b, _ = cover_up(b)
-        elif move == "right":
-            b = reverse(b)
-            b, d1 = cover_up(b)
-            b, d2 = merge_gain(b, d1) # Poprawka: przekazujemy d1
-            b, _ = cover_up(b)
-            b = reverse(b)
-        elif move == "up":
-            b = transpose(b)
-            b, d1 = cover_up(b)
-            b, d2 = merge_gain(b, d1) # Poprawka: przekazujemy d1
-            b, _ = cover_up(b)
-            b = transpose(b)
-        elif move == "down":
-            b = transpose(b)
-            b = reverse(b)
-            b, d1 = cover_up(b)
-            b, d2 = merge_gain(b, d1) # Poprawka: przekazujemy d1
-            b, _ = cover_up(b)
-            b = reverse(b)
-            b = transpose(b)
-        else:
-            return board, False, 0
+    def apply_move(self, move: Move) -> bool:
+        """
+        Wykonuje ruch w miejscu (bez spawnu) i odkłada wpis na stos cofania.
+        Zwraca False (bez wpisu na stosie), jeśli ruch nic nie zmienia.
+        """
+        payload, gain = self._move_in_place(move)
+        if payload is None:
+            return False
+        self._push_undo(payload, gain)
+        self.score += gain
+        return True
+
+    def place_tile(self, r: int, k: int, value: int) -> None:
+        """Wstawia kafelek `value` w puste pole (r, k); cofany przez remove_tile/undo."""
+        self._push_undo(self._place_in_place(r, k, value), 0, (r, k))
+
+    def remove_tile(self, r: int, k: int) -> None:
+        """Cofa ostatni place_tile, który musiał wstawić kafelek w (r, k)."""
+        if not self._undo or self._undo[-1][0] != (r, k):
+            raise ValueError(f"Ostatnia zmiana to nie wstawienie kafelka w ({r}, {k})")
+        self.undo()
+
+    def undo(self) -> None:
+        """Cofa ostatnie apply_move/place_tile: plansza, wynik i pochodne wracają do stanu sprzed zmiany."""
+        if not self._undo:
+            raise IndexError("Stos cofania jest pusty")
+        _, payload, gain, snapshot = self._undo.pop()
+        self._restore(payload)
+        self.score -= gain
+        self._restore_cache(snapshot)
+
+    def undo_depth(self) -> int:
+        return len(self._undo) if self._undo else 0
 
-        moved = d1 or d2 or (b != before)
-        return b, moved, gain
+    def _push_undo(self, payload, gain: int, cell: Optional[Tuple[int, int]] = None) -> None:
+        if self._undo is None:
+            self._undo = []
+        # wpis: (pole wstawionego kafelka albo None, dane do cofnięcia, zysk, pochodne rodzica)
+        self._undo.append((cell, payload, gain, self._cache_snapshot()))
+        self._invalidate()
 
     def _spawn_tile(self) -> None:
         empties = self.empty_cells()
@@ -163,16 +281,298 @@ class GameState:
             return
         r, k = self.rng.choice(empties)
         val = 4 if self.rng.random() < 0.1 else 2
-        self.board[r][k] = val
+        self._place(r, k, val)
 
     def _compute_done(self) -> bool:
-        return game_state(self.board) in ("win", "lose")
-
-    def max_tile(self) -> int:
-        return max(max(row) for row in self.board)
+        # win -> koniec; są puste pola -> gra trwa; pełna plansza -> koniec, jeśli brak ruchów
+        self._ensure_scan()
+        if self._win:
+            return True
+        if self._empties:
+            return False
+        return not self._all_moves()
 
     def __repr__(self) -> str:
         lines = [f"Score: {self.score}  Done: {self.done}"]
         for row in self.board:
             lines.append(" ".join(f"{v:4d}" for v in row))
-        return "\n".join(lines)
\ No newline at end of file
+        return "\n".join(lines)
+
+
+class GameState(_CachedState):
+    """Stan gry na liście list (backend "list")."""
+
+    __slots__ = ("_board",)
+
+    def __init__(
+            self,
+            seed: Optional[int] = None,
+            board: Optional[List[List[int]]] = None,
+            score: int = 0,
+    ) -> None:
+        self._rng: Optional[random.Random] = None
+        self._seed = seed
+        self._undo = None
+        self.board = new_game(c.GRID_LEN) if board is None else [list(row) for row in board]
+        self.score = int(score)
+
+    @classmethod
+    def from_rows(cls, rows, score: int = 0, seed: Optional[int] = None) -> "GameState":
+        """Szybka ścieżka dla węzłów przeszukiwania: kopia wierszy, bez RNG, pochodne liczone leniwie."""
+        state = cls.__new__(cls)
+        state._rng = None
+        state._seed = seed
+        state._undo = None
+        state.board = [list(row) for row in rows]
+        state.score = score
+        return state
+
+    @property
+    def board(self) -> List[List[int]]:
+        """
+        Plansza stanu (bez kopii). Zmiany tylko przez setter (state.board = ...) albo
+        apply_move/place_tile: zapis w miejscu (state.board[r][c] = v) nie unieważnia
+        cache'a pól pustych, ruchów i końca gry.
+        """
+        return self._board
+
+    @board.setter
+    def board(self, value: List[List[int]]) -> None:
+        self._board = value
+        self._invalidate()
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        if seed is not None:
+            self._seed = seed
+        self._rng = None
+        self._undo = None
+        self.board = new_game(c.GRID_LEN)
+        self.score = 0
+
+    def clone(self) -> "GameState":
+        ns = type(self).from_rows(self._board, score=self.score, seed=self._seed)
+        self._copy_cache_to(ns)
+        return ns
+
+    def _simulate(self, move: Move):
+        return self._simulate_move_with_gain(move, self._board)
+
+    def _scan(self) -> Tuple[List[Tuple[int, int]], int, bool]:
+        cells: List[Tuple[int, int]] = []
+        max_v = 0
+        win = False
+        for r in range(c.GRID_LEN):
+            row = self._board[r]
+            for k in range(c.GRID_LEN):
+                v = row[k]
+                if v == 0:
+                    cells.append((r, k))
+                elif v > max_v:
+                    max_v = v
+                if v == 2048:
+                    win = True
+        return cells, max_v, win
+
+    def _set_native(self, native: List[List[int]]) -> None:
+        # plansza mogła zostać zwrócona przez successors(), więc kopiujemy wiersze
+        self.board = [row[:] for row in native]
+
+    def _native_to_board(self, native: List[List[int]]) -> List[List[int]]:
+        return native
+
+    def _place(self, r: int, k: int, value: int) -> None:
+        self._board[r][k] = value
+        self._invalidate()
+
+    def _move_in_place(self, move: Move):
+        if move not in ALLOWED_MOVES:
+            raise ValueError(f"Nieznany ruch: {move}")
+        board = self._board
+        changes: List[Tuple[int, int, int]] = []
+        gain = 0
+
+        for line in _move_lines(len(board), move):
+            values = [board[r][k] for r, k in line]
+            new, g = _slide_values(values)
+            if new == values:
+                continue
+            gain += g
+            for (r, k), old, v in zip(line, values, new):
+                if old != v:
+                    changes.append((r, k, old))
+                    board[r][k] = v
+
+        return (changes or None), gain
+
+    def _place_in_place(self, r: int, k: int, value: int):
+        old = self._board[r][k]
+        self._board[r][k] = value
+        return ((r, k, old),)
+
+    def _restore(self, payload) -> None:
+        board = self._board
+        for r, k, old in payload:
+            board[r][k] = old
+
+    def _simulate_move_with_gain(
+            self, move: Move, board: List[List[int]]
+    ) -> Tuple[List[List[int]], bool, int]:
+        """Plansza po ruchu (nowa; wejście nie jest modyfikowane), czy coś się ruszyło, zysk."""
+        if move not in ALLOWED_MOVES:
+            return board, False, 0
+        out = [row[:] for row in board]
+        gain = 0
+
+        for line in _move_lines(len(board), move):
+            values = [board[r][k] for r, k in line]
+            new, g = _slide_values(values)
+            if new == values:
+                continue
+            gain += g
+            for (r, k), v in zip(line, new):
+                out[r][k] = v
+
+        return out, out != board, gain
+
+
+class BitboardGameState(_CachedState):
+    """
+    GameState na spakowanej planszy (patrz src/game/bitboard.py).
+    Ten sam interfejs co GameState; `board` to widok listy list budowany na żądanie.
+    Rozmiar planszy wynika z przekazanej planszy albo z parametru `size`
+    (domyślnie constants.GRID_LEN); 4x4 mieści się w 64 bitach.
+    """
+
+    __slots__ = ("_bits", "_engine")
+
+    def __init__(
+            self,
+            seed: Optional[int] = None,
+            board: Optional[List[List[int]]] = None,
+            score: int = 0,
+            size: Optional[int] = None,
+    ) -> None:
+        if size is None:
+            size = c.GRID_LEN if board is None else len(board)
+        self._engine = bb.get_engine(size)
+        self._rng: Optional[random.Random] = None
+        self._seed = seed
+        self._undo = None
+        self.bits = self._engine.pack_board(new_game(size) if board is None else board)
+        self.score = int(score)
+
+    @classmethod
+    def from_bits(
+            cls, bits: int, score: int = 0, seed: Optional[int] = None, size: int = 4
+    ) -> "BitboardGameState":
+        state = cls.__new__(cls)
+        state._engine = bb.get_engine(size)
+        state._rng = None
+        state._seed = seed
+        state._undo = None
+        state.bits = bits
+        state.score = score
+        return state
+
+    @classmethod
+    def from_rows(cls, rows, score: int = 0, seed: Optional[int] = None) -> "BitboardGameState":
+        size = len(rows)
+        return cls.from_bits(bb.get_engine(size).pack_board(rows), score=score, seed=seed, size=size)
+
+    @property
+    def size(self) -> int:
+        return self._engine.size
+
+    @property
+    def bits(self) -> int:
+        return self._bits
+
+    @bits.setter
+    def bits(self, value: int) -> None:
+        self._bits = value
+        self._invalidate()
+
+    @property
+    def board(self) -> List[List[int]]:
+        """Rozpakowana kopia planszy - zapis w niej nie zmienia stanu; zmiany przez setter."""
+        return self._engine.unpack_board(self._bits)
+
+    @board.setter
+    def board(self, value: List[List[int]]) -> None:
+        self.bits = self._engine.pack_board(value)
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        if seed is not None:
+            self._seed = seed
+        self._rng = None
+        self._undo = None
+        self.bits = self._engine.pack_board(new_game(self._engine.size))
+        self.score = 0
+
+    def clone(self) -> "BitboardGameState":
+        ns = type(self).from_bits(self._bits, score=self.score, seed=self._seed, size=self._engine.size)
+        self._copy_cache_to(ns)
+        return ns
+
+    def _simulate(self, move: Move):
+        return self._engine.execute_move(self._bits, move)
+
+    def _scan(self) -> Tuple[List[Tuple[int, int]], int, bool]:
+        engine = self._engine
+        t = engine.max_exponent(self._bits)
+        return engine.empty_cells(self._bits), (1 << t if t else 0), engine.has_exponent(self._bits, bb.WIN_EXPONENT)
+
+    def _set_native(self, native: int) -> None:
+        self.bits = native
+
+    def _native_to_board(self, native: int) -> List[List[int]]:
+        return self._engine.unpack_board(native)
+
+    def _place(self, r: int, k: int, value: int) -> None:
+        self.bits = self._engine.set_cell(self._bits, r, k, value.bit_length() - 1)
+
+    # spakowana plansza to jedna liczba, więc do cofnięcia wystarczy poprzednia wartość
+
+    def _move_in_place(self, move: Move):
+        if move not in ALLOWED_MOVES:
+            raise ValueError(f"Nieznany ruch: {move}")
+        old = self._bits
+        new, moved, gain = self._engine.execute_move(old, move)
+        if not moved:
+            return None, 0
+        self._bits = new
+        return old, gain
+
+    def _place_in_place(self, r: int, k: int, value: int):
+        old = self._bits
+        self._bits = self._engine.set_cell(old, r, k, value.bit_length() - 1)
+        return old
+
+    def _restore(self, payload: int) -> None:
+        self._bits = payload
+
+
+BACKENDS = {
+    "list": GameState,
+    "bitboard": BitboardGameState,
+}
+
+
+def make_state(
+        backend: str = "list",
+        seed: Optional[int] = None,
+        board: Optional[List[List[int]]] = None,
+        score: int = 0,
+        size: Optional[int] = None,
+):
+    """
+    Tworzy stan gry dla wybranego backendu ("list" | "bitboard").
+    Backend "list" działa tylko dla constants.GRID_LEN; "bitboard" dla dowolnego `size`.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Nieznany backend: {backend}")
+    if backend == "bitboard":
+        return BitboardGameState(seed=seed, board=board, score=score, size=size)
+    if size is not None and size != c.GRID_LEN:
+        raise ValueError(f"Backend '{backend}' obsługuje tylko plansze {c.GRID_LEN}x{c.GRID_LEN}")
+    return BACKENDS[backend](seed=seed, board=board, score=score)
@@ -0,0 +1,140 @@
+# src/game/symmetry.py
+"""
+Symetrie planszy (grupa dihedralna D4: 4 obroty x odbicie = 8 przekształceń).
+
+Pozycja i jej obroty/odbicia mają tę samą wartość heurystyki i expectimaxa
+(po przemapowaniu ruchów), więc cache'e mogą trzymać jeden reprezentant
+("postać kanoniczną") na całą klasę symetrii.
+
+Przekształcenie t (0..7) to złożenie w kolejności:
+    1. transpozycja, jeśli t & 4,
+    2. odbicie poziome (odwrócenie kolejności komórek w wierszu), jeśli t & 1,
+    3. odbicie pionowe (odwrócenie kolejności wierszy), jeśli t & 2.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from operator import itemgetter
+from typing import Tuple
+
+from src.game import bitboard as bb
+
+BoardTuple = Tuple[Tuple[int, ...], ...]
+
+N_TRANSFORMS = 8
+
+_SWAP_LR = {"left": "right", "right": "left", "up": "up", "down": "down"}
+_SWAP_UD = {"up": "down", "down": "up", "left": "left", "right": "right"}
+_TRANSPOSE = {"up": "left", "left": "up", "down": "right", "right": "down"}
+
+
+# --- spakowana plansza 4x4 ---
+
+def flip_h(board: bb.Bitboard) -> bb.Bitboard:
+    """Odwraca kolejność komórek w każdym wierszu."""
+    return (
+        ((board & 0x000F000F000F000F) << 12)
+        | ((board & 0x00F000F000F000F0) << 4)
+        | ((board & 0x0F000F000F000F00) >> 4)
+        | ((board & 0xF000F000F000F000) >> 12)
+    )
+
+
+def flip_v(board: bb.Bitboard) -> bb.Bitboard:
+    """Odwraca kolejność wierszy."""
+    return (
+        ((board & 0xFFFF) << 48)
+        | (((board >> 16) & 0xFFFF) << 32)
+        | (((board >> 32) & 0xFFFF) << 16)
+        | (board >> 48)
+    )
+
+
+def all_transforms(board: bb.Bitboard) -> Tuple[bb.Bitboard, ...]:
+    """Wszystkie 8 obrazów planszy; indeks w krotce = numer przekształcenia."""
+    h = flip_h(board)
+    t = bb.transpose(board)
+    th = flip_h(t)
+    return (board, h, flip_v(board), flip_v(h), t, th, flip_v(t), flip_v(th))
+
+
+def canonicalize(board: bb.Bitboard) -> Tuple[bb.Bitboard, int]:
+    """(reprezentant kanoniczny = najmniejszy obraz, numer przekształcenia, które go daje)"""
+    images = all_transforms(board)
+    best = min(images)
+    return best, images.index(best)
+
+
+def canonical(board: bb.Bitboard) -> bb.Bitboard:
+    return min(all_transforms(board))
+
+
+def apply_transform(board: bb.Bitboard, t: int) -> bb.Bitboard:
+    if t & 4:
+        board = bb.transpose(board)
+    if t & 1:
+        board = flip_h(board)
+    if t & 2:
+        board = flip_v(board)
+    return board
+
+
+# --- krotki wierszy dowolnego rozmiaru ---
+
+def transform_rows(rows: BoardTuple, t: int) -> BoardTuple:
+    if t & 4:
+        rows = tuple(zip(*rows))
+    if t & 1:
+        rows = tuple(row[::-1] for row in rows)
+    if t & 2:
+        rows = rows[::-1]
+    return tuple(tuple(row) for row in rows)
+
+
+@lru_cache(maxsize = None)
+def _flat_getters(size: int) -> Tuple[itemgetter, ...]:
+    """Dla każdego przekształcenia: itemgetter, który z płaskiej krotki komórek buduje płaski obraz."""
+    idx = tuple(tuple(r * size + c for c in range(size)) for r in range(size))
+    return tuple(
+        itemgetter(*[i for row in transform_rows(idx, t) for i in row]) for t in range(N_TRANSFORMS)
+    )
+
+
+def canonicalize_rows(rows: BoardTuple) -> Tuple[BoardTuple, int]:
+    """Odpowiednik canonicalize dla krotki wierszy (dowolny rozmiar planszy)."""
+    n = len(rows)
+    flat = sum(rows, ())
+    images = [g(flat) for g in _flat_getters(n)]
+    best = min(images)
+    return tuple(best[r * n:(r + 1) * n] for r in range(n)), images.index(best)
+
+
+def canonical_rows(rows: BoardTuple) -> BoardTuple:
+    n = len(rows)
+    flat = sum(rows, ())
+    best = min(g(flat) for g in _flat_getters(n))
+    return tuple(best[r * n:(r + 1) * n] for r in range(n))
+
+
+# --- ruchy ---
+
+def transform_move(move: str, t: int) -> str:
+    """Ruch na planszy oryginalnej -> odpowiadający mu ruch na planszy po przekształceniu t."""
+    if t & 4:
+        move = _TRANSPOSE[move]
+    if t & 1:
+        move = _SWAP_LR[move]
+    if t & 2:
+        move = _SWAP_UD[move]
+    return move
+
+
+def inverse_move(move: str, t: int) -> str:
+    """Ruch na planszy po przekształceniu t -> ruch na planszy oryginalnej."""
+    if t & 2:
+        move = _SWAP_UD[move]
+    if t & 1:
+        move = _SWAP_LR[move]
+    if t & 4:
+        move = _TRANSPOSE[move]
+    return move
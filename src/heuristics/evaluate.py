@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import math
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 def _log_board(board: List[List[int]]) -> List[List[float]]:
     lb: List[List[float]] = []
@@ -117,18 +119,21 @@ def max_in_corner(board: List[List[int]]) -> float:
     return 0.0
 
 
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "empty": 250.0,
+    "mono": 1.0,
+    "smooth": 0.1,  # będzie użyte ze znakiem minus
+    "corner": 1000.0,
+}
+
+
 def evaluate(board: List[List[int]], weights: Dict[str, float] | None = None) -> float:
     """
     Łączy cechy w wynik końcowy. Dostosuj wagi w JSON-ach.
     """
 
     if weights is None:
-        weights = {
-            "empty": 250.0,
-            "mono": 1.0,
-            "smooth": 0.1,  # będzie użyte ze znakiem minus
-            "corner": 1000.0,
-        }
+        weights = DEFAULT_WEIGHTS
 
     empty = count_empty(board)
     mono = monotonicity(board)
@@ -143,4 +148,109 @@ def evaluate(board: List[List[int]], weights: Dict[str, float] | None = None) ->
         + weights["corner"] * float(corner)
     )
 
-    return float(score)
\ No newline at end of file
+    return float(score)
+
+
+def evaluate_bounds(
+        weights: Dict[str, float] | None = None,
+        size: int = 4,
+        max_exp: int = 17,
+        min_empty: int = 0,
+        max_empty: Optional[int] = None,
+) -> Tuple[float, float]:
+    """
+    Dolne i górne ograniczenie evaluate() dla plansz size x size z kafelkami <= 2 ** max_exp
+    i liczbą pustych pól w [min_empty, max_empty] (domyślnie size * size - 1).
+
+    Zakresy cech (E = max_exp, n = size):
+    - empty: [min_empty, max_empty],
+    - mono: linia ma n - 1 kroków o |różnicy| <= E, więc min(inc, dec) <= (n - 1) * E / 2;
+      po 2n liniach mono w [-n * (n - 1) * E, 0],
+    - smooth: 2n(n - 1) par sąsiadów, różnica niepustych <= E - 1, więc |smooth| w [0, 2n(n - 1)(E - 1)],
+    - corner: {0, 1}.
+    Ograniczenie to suma krańców w * zakres dobranych według znaku wagi.
+    """
+
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+    if max_empty is None:
+        max_empty = size * size - 1
+
+    ranges = (
+        (weights["empty"], float(min_empty), float(max_empty)),
+        (weights["mono"], -float(size * (size - 1) * max_exp), 0.0),
+        (-weights["smooth"], 0.0, float(2 * size * (size - 1) * max(max_exp - 1, 0))),
+        (weights["corner"], 0.0, 1.0),
+    )
+
+    lo = 0.0
+    hi = 0.0
+    for w, a, b in ranges:
+        lo += min(w * a, w * b)
+        hi += max(w * a, w * b)
+    return lo, hi
+
+
+def _lines_mono(lines: np.ndarray) -> np.ndarray:
+    """Monotoniczność dla stosu linii (N, L, K) -> suma po liniach (N,)."""
+    diff = lines[:, :, 1:] - lines[:, :, :-1]
+    inc = np.where(diff > 0, diff, 0.0).sum(axis = 2)
+    dec = np.where(diff > 0, 0.0, -diff).sum(axis = 2)
+    return (-np.minimum(inc, dec)).sum(axis = 1)
+
+
+def _evaluate_arrays(cells: np.ndarray, lb: np.ndarray, weights: Dict[str, float] | None) -> np.ndarray:
+    """
+    Wspólny rdzeń wersji wektorowych: `cells` (N, n, m) to wartości porównywane przy
+    szukaniu maksimum (kafelki lub wykładniki, 0 = puste), `lb` to plansza w log2.
+    """
+
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+
+    nz = cells != 0
+
+    empty = (~nz).sum(axis = (1, 2))
+    mono = _lines_mono(lb) + _lines_mono(lb.transpose(0, 2, 1))
+
+    horiz = np.where(nz[:, :, 1:] & nz[:, :, :-1], np.abs(lb[:, :, 1:] - lb[:, :, :-1]), 0.0)
+    vert = np.where(nz[:, 1:, :] & nz[:, :-1, :], np.abs(lb[:, 1:, :] - lb[:, :-1, :]), 0.0)
+    smooth = -(horiz.sum(axis = (1, 2)) + vert.sum(axis = (1, 2)))
+
+    maxv = cells.max(axis = (1, 2))
+    corners = np.stack([cells[:, 0, 0], cells[:, 0, -1], cells[:, -1, 0], cells[:, -1, -1]], axis = 1)
+    corner = (corners == maxv[:, None]).any(axis = 1).astype(np.float64)
+
+    return (
+        weights["empty"] * empty.astype(np.float64)
+        + weights["mono"] * mono
+        - weights["smooth"] * np.abs(smooth)
+        + weights["corner"] * corner
+    )
+
+
+def evaluate_exponents(exps: np.ndarray, weights: Dict[str, float] | None = None) -> np.ndarray:
+    """
+    Wektorowa wersja evaluate dla stosu plansz w postaci wykładników (N, n, m),
+    gdzie 0 = puste pole, k = kafelek 2 ** k. Wyniki są identyczne z evaluate().
+    """
+
+    return _evaluate_arrays(exps, exps.astype(np.float64), weights)
+
+
+def evaluate_batch(boards, weights: Dict[str, float] | None = None) -> np.ndarray:
+    """
+    evaluate() dla wielu plansz naraz: tablica (N, n, m) wartości kafelków albo lista plansz.
+    Zwraca tablicę (N,) wyników; dla plansz z kafelkami będącymi potęgami dwójki
+    wyniki są identyczne (co do bitu) z evaluate() wywołanym osobno dla każdej planszy.
+    """
+
+    cells = np.asarray(boards, dtype = np.int64)
+
+    if cells.size == 0:
+        return np.zeros(len(cells), dtype = np.float64)
+
+    lb = np.zeros(cells.shape, dtype = np.float64)
+    np.log2(cells, out = lb, where = cells > 0)
+
+    return _evaluate_arrays(cells, lb, weights)
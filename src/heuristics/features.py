@@ -0,0 +1,247 @@
+# src/heuristics/features.py
+"""
+Rejestr cech heurystyki i "skompilowany" ewaluator.
+
+evaluate() woła count_empty / monotonicity / smoothness / max_in_corner osobno.
+Każda z tych funkcji przechodzi po planszy od nowa, a dwie z nich liczą log2 planszy
+niezależnie. Tutaj plansza jest raz zamieniana na wykładniki (wiersze i kolumny),
+a każda cecha deklaruje tylko, z czego korzysta:
+- cecha liniowa: funkcja linii wykładników, sumowana po wierszach i/lub kolumnach,
+- cecha planszowa: funkcja (wiersze, kolumny, max wykładnik) wołana raz.
+
+CompiledEvaluator wiąże wagi z listą włączonych cech (waga != 0) i liczy wszystkie
+cechy w jednym przejściu po wspólnym widoku planszy. Wektory cech liniowych są
+zapamiętywane per linia, więc powtarzające się wiersze i kolumny nie są liczone
+ponownie. Nowa cecha to jedna funkcja z @register_feature, bez dodatkowego skanu planszy.
+
+Kafelki muszą być potęgami dwójki. Dla czterech cech bazowych wynik jest wtedy
+identyczny (co do bitu) z evaluate(): cechy są całkowite, a wagi są dodawane
+w tej samej kolejności.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.game.symmetry import N_TRANSFORMS, transform_rows
+from src.heuristics.evaluate import DEFAULT_WEIGHTS
+
+Board = Sequence[Sequence[int]]
+Line = Tuple[int, ...]
+Lines = Sequence[Line]
+LineFunc = Callable[[Line], float]
+BoardFunc = Callable[[Lines, Lines, int], float]
+
+# wartość kafelka -> wykładnik (0 = puste)
+_EXP: Dict[int, int] = {0: 0, **{1 << k: k for k in range(1, 32)}}
+
+
+@dataclass(frozen = True)
+class Feature:
+    name: str
+    line: Optional[LineFunc] = None
+    board: Optional[BoardFunc] = None
+    rows: bool = True
+    cols: bool = True
+
+
+FEATURES: Dict[str, Feature] = {}
+
+
+def register_feature(name: str, scope: str = "line", rows: bool = True, cols: bool = True):
+    """
+    Dekorator rejestrujący cechę pod kluczem wagi `name`.
+    scope="line": f(linia) sumowane po wierszach (rows) i/lub kolumnach (cols),
+    scope="board": f(wiersze, kolumny, max wykładnik) wołane raz na planszę.
+    """
+    if scope not in ("line", "board"):
+        raise ValueError(f"Nieznany zakres cechy: {scope}")
+
+    def decorator(func):
+        if scope == "line":
+            FEATURES[name] = Feature(name, line = func, rows = rows, cols = cols)
+        else:
+            FEATURES[name] = Feature(name, board = func)
+        return func
+
+    return decorator
+
+
+# --- cechy bazowe (te same co w evaluate) ---
+
+@register_feature("empty", cols = False)
+def empty_line(line: Line) -> float:
+    return line.count(0)
+
+
+@register_feature("mono")
+def mono_line(line: Line) -> float:
+    inc = 0
+    dec = 0
+    for i in range(len(line) - 1):
+        diff = line[i + 1] - line[i]
+        if diff > 0:
+            inc += diff
+        else:
+            dec -= diff
+    return -min(inc, dec)
+
+
+@register_feature("smooth")
+def smooth_line(line: Line) -> float:
+    """Ujemna suma |różnic| sąsiednich niepustych pól (jak smoothness())."""
+    s = 0
+    for i in range(len(line) - 1):
+        if line[i] and line[i + 1]:
+            s -= abs(line[i] - line[i + 1])
+    return s
+
+
+@register_feature("corner", scope = "board")
+def corner_board(rows: Lines, cols: Lines, max_exp: int) -> float:
+    first = rows[0]
+    last = rows[-1]
+    if max_exp in (first[0], first[-1], last[0], last[-1]):
+        return 1.0
+    return 0.0
+
+
+# --- cechy dodatkowe (włączane przez niezerową wagę) ---
+
+@register_feature("merges")
+def merges_line(line: Line) -> float:
+    """Liczba scaleń, które dałby ruch wzdłuż linii (pary równych kafelków po pominięciu zer)."""
+    count = 0
+    prev = 0
+    for v in line:
+        if not v:
+            continue
+        if v == prev:
+            count += 1
+            prev = 0
+        else:
+            prev = v
+    return count
+
+
+@lru_cache(maxsize = None)
+def _snake_weights(size: int) -> Tuple[Tuple[float, ...], ...]:
+    """Wagi ścieżki "wąż" (od rogu (0, 0), wiersze na przemian) dla 8 symetrii planszy."""
+    grid: List[List[float]] = []
+    k = 0
+    for r in range(size):
+        row = []
+        for _ in range(size):
+            row.append(0.5 ** k)
+            k += 1
+        grid.append(row[::-1] if r % 2 else row)
+
+    base = tuple(tuple(row) for row in grid)
+    return tuple(
+        tuple(w for row in transform_rows(base, t) for w in row) for t in range(N_TRANSFORMS)
+    )
+
+
+@register_feature("snake", scope = "board")
+def snake_board(rows: Lines, cols: Lines, max_exp: int) -> float:
+    """
+    Gradient "wąż": suma wykładników ważona malejąco (x0.5) wzdłuż ścieżki węża,
+    najlepsza z 8 orientacji (cecha niezmiennicza na symetrie planszy).
+    """
+    flat = [v for row in rows for v in row]
+    best = 0.0
+    for weights in _snake_weights(len(rows)):
+        s = 0.0
+        for w, v in zip(weights, flat):
+            s += w * v
+        if s > best:
+            best = s
+    return best
+
+
+class CompiledEvaluator:
+    """Ocena planszy: wszystkie włączone cechy w jednym przejściu, wagi związane z góry."""
+
+    # limit zapamiętanych linii (dla 4x4 wszystkich wierszy jest 65 536, więc się nie zapełnia)
+    memo_limit = 1 << 18
+
+    def __init__(self, weights: Dict[str, float] | None = None) -> None:
+        if weights is None:
+            weights = DEFAULT_WEIGHTS
+
+        unknown = set(weights) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"Nieznane cechy w wagach: {sorted(unknown)}")
+
+        self.weights = weights
+        # kolejność rejestracji = kolejność sumowania (bazowe cechy jak w evaluate)
+        self.names: Tuple[str, ...] = tuple(n for n in FEATURES if weights.get(n, 0.0) != 0.0)
+        self.weight_vector: Tuple[float, ...] = tuple(weights[n] for n in self.names)
+
+        features = [FEATURES[n] for n in self.names]
+        self._row_funcs = tuple(f.line if f.line and f.rows else None for f in features)
+        self._col_funcs = tuple(f.line if f.line and f.cols else None for f in features)
+        self._board_funcs = tuple((i, f.board) for i, f in enumerate(features) if f.board)
+
+        # linia -> wektor cech liniowych; wiersz trzymany po wartościach kafelków,
+        # razem z wykładnikami i maksimum, żeby konwersja też odbywała się raz na wiersz
+        self._row_memo: Dict[Line, Tuple[Line, Tuple[int, ...], int]] = {}
+        self._col_memo: Dict[Line, Tuple[int, ...]] = {}
+
+    def _row_entry(self, row: Line) -> Tuple[Line, Tuple[int, ...], int]:
+        exps = tuple([_EXP[v] for v in row])
+        vec = tuple(f(exps) if f else 0 for f in self._row_funcs)
+        if len(self._row_memo) >= self.memo_limit:
+            self._row_memo.clear()
+        entry = self._row_memo[row] = (exps, vec, max(exps))
+        return entry
+
+    def _col_entry(self, col: Line) -> Tuple[int, ...]:
+        vec = tuple(f(col) if f else 0 for f in self._col_funcs)
+        if len(self._col_memo) >= self.memo_limit:
+            self._col_memo.clear()
+        self._col_memo[col] = vec
+        return vec
+
+    def features(self, board: Board) -> List[float]:
+        """Wartości włączonych cech (w kolejności self.names)."""
+        row_memo = self._row_memo
+        col_memo = self._col_memo
+
+        rows = []
+        vecs = []
+        max_exp = 0
+        for row in board:
+            row = tuple(row)
+            entry = row_memo.get(row) or self._row_entry(row)
+            rows.append(entry[0])
+            vecs.append(entry[1])
+            if entry[2] > max_exp:
+                max_exp = entry[2]
+
+        cols = list(zip(*rows))
+        for col in cols:
+            vecs.append(col_memo.get(col) or self._col_entry(col))
+
+        acc = list(map(sum, zip(*vecs)))
+        for i, f in self._board_funcs:
+            acc[i] = f(rows, cols, max_exp)
+        return acc
+
+    def __call__(self, board: Board) -> float:
+        score = 0.0
+        for w, v in zip(self.weight_vector, self.features(board)):
+            score += w * v
+        return score
+
+
+_COMPILED: Dict[Tuple[Tuple[str, float], ...], CompiledEvaluator] = {}
+
+
+def get_compiled_evaluator(weights: Dict[str, float] | None = None) -> CompiledEvaluator:
+    """CompiledEvaluator dla danych wag (jeden na wektor wag)."""
+    key = tuple(sorted((weights or DEFAULT_WEIGHTS).items()))
+    if key not in _COMPILED:
+        _COMPILED[key] = CompiledEvaluator(weights)
+    return _COMPILED[key]
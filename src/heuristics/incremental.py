@@ -0,0 +1,174 @@
+# src/heuristics/incremental.py
+"""
+Przyrostowa ocena planszy po dołożeniu kafelka (węzły losowe expectimaxa).
+
+Cechy evaluate() poza narożnikiem to sumy po liniach:
+- empty i smooth poziome - po wierszach,
+- smooth pionowe - po kolumnach,
+- mono - po wierszach i kolumnach.
+
+FeatureBreakdown trzyma te składniki osobno dla każdego wiersza i kolumny.
+Dziecko różniące się od rodzica jednym kafelkiem w (r, c) wymaga więc
+przeliczenia tylko wiersza r i kolumny c, a nie całej planszy.
+
+Dla kafelków będących potęgami dwójki log2 daje liczby całkowite, więc sumy
+są dokładne niezależnie od kolejności dodawania. Wynik jest wtedy identyczny
+(co do bitu) z evaluate() wywołanym na planszy dziecka.
+"""
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Sequence, Tuple
+
+from src.heuristics.evaluate import DEFAULT_WEIGHTS
+
+Board = Sequence[Sequence[int]]
+
+
+def _log(v: int) -> float:
+    return math.log2(v) if v > 0 else 0.0
+
+
+def _line_terms(values: Sequence[int]) -> Tuple[float, float]:
+    """(mono, smooth) jednej linii; smooth jako suma |różnic| (wartość dodatnia)."""
+    inc = 0.0
+    dec = 0.0
+    smooth = 0.0
+    prev_v = values[0]
+    prev = _log(prev_v)
+
+    for v in values[1:]:
+        cur = _log(v)
+        diff = cur - prev
+        if diff > 0:
+            inc += diff
+        else:
+            dec -= diff
+        if v and prev_v:
+            smooth += abs(diff)
+        prev_v = v
+        prev = cur
+
+    return -min(inc, dec), smooth
+
+
+class FeatureBreakdown:
+    """Składniki evaluate() rozbite na wiersze i kolumny jednej planszy."""
+
+    __slots__ = (
+        "board", "row_empty", "row_mono", "row_smooth", "col_mono", "col_smooth",
+        "empty", "mono", "smooth", "max_tile",
+    )
+
+    def __init__(self, board: Board) -> None:
+        self.board = tuple(tuple(row) for row in board)
+        n = len(self.board)
+        m = len(self.board[0]) if n > 0 else 0
+
+        self.row_empty: List[int] = [row.count(0) for row in self.board]
+        self.row_mono: List[float] = []
+        self.row_smooth: List[float] = []
+        for row in self.board:
+            mono, smooth = _line_terms(row)
+            self.row_mono.append(mono)
+            self.row_smooth.append(smooth)
+
+        self.col_mono: List[float] = []
+        self.col_smooth: List[float] = []
+        for c in range(m):
+            mono, smooth = _line_terms([self.board[r][c] for r in range(n)])
+            self.col_mono.append(mono)
+            self.col_smooth.append(smooth)
+
+        self.empty = sum(self.row_empty)
+        self.mono = sum(self.row_mono) + sum(self.col_mono)
+        self.smooth = sum(self.row_smooth) + sum(self.col_smooth)
+        self.max_tile = max((max(row) for row in self.board), default = 0)
+
+    def _corner(self, max_tile: int, r: int = -1, c: int = -1, value: int = 0) -> float:
+        """1.0 jeśli max_tile leży w rogu (z uwzględnieniem kafelka `value` w (r, c))."""
+        board = self.board
+        n = len(board)
+        if n == 0:
+            return 0.0
+        last_r = n - 1
+        last_c = len(board[0]) - 1
+
+        for (cr, cc) in ((0, 0), (0, last_c), (last_r, 0), (last_r, last_c)):
+            v = value if (cr == r and cc == c) else board[cr][cc]
+            if v == max_tile:
+                return 1.0
+        return 0.0
+
+    def score(self, weights: Dict[str, float] | None = None) -> float:
+        """Ocena planszy; równa evaluate(board, weights)."""
+        if weights is None:
+            weights = DEFAULT_WEIGHTS
+        return self._combine(weights, self.empty, self.mono, self.smooth, self._corner(self.max_tile))
+
+    def _child_terms(self, r: int, c: int, value: int) -> Tuple[int, float, float, Tuple[float, float], Tuple[float, float]]:
+        board = self.board
+        row = board[r][:c] + (value,) + board[r][c + 1:]
+        col = [value if i == r else board[i][c] for i in range(len(board))]
+        row_terms = _line_terms(row)
+        col_terms = _line_terms(col)
+
+        empty = self.empty + (1 if value == 0 else 0) - (1 if board[r][c] == 0 else 0)
+        mono = self.mono - self.row_mono[r] - self.col_mono[c] + row_terms[0] + col_terms[0]
+        smooth = self.smooth - self.row_smooth[r] - self.col_smooth[c] + row_terms[1] + col_terms[1]
+        return empty, mono, smooth, row_terms, col_terms
+
+    def score_with_tile(self, r: int, c: int, value: int, weights: Dict[str, float] | None = None) -> float:
+        """
+        Ocena dziecka z kafelkiem `value` wstawionym w puste pole (r, c),
+        bez budowania planszy dziecka - przeliczany jest tylko wiersz r i kolumna c.
+        """
+        if weights is None:
+            weights = DEFAULT_WEIGHTS
+
+        empty, mono, smooth, _, _ = self._child_terms(r, c, value)
+        max_tile = value if value > self.max_tile else self.max_tile
+        return self._combine(weights, empty, mono, smooth, self._corner(max_tile, r, c, value))
+
+    def with_tile(self, r: int, c: int, value: int) -> "FeatureBreakdown":
+        """Rozbicie cech dla dziecka z kafelkiem `value` w (r, c)."""
+        empty, mono, smooth, row_terms, col_terms = self._child_terms(r, c, value)
+
+        child = object.__new__(FeatureBreakdown)
+        board = self.board
+        row = board[r][:c] + (value,) + board[r][c + 1:]
+        child.board = board[:r] + (row,) + board[r + 1:]
+
+        child.row_empty = list(self.row_empty)
+        child.row_empty[r] = row.count(0)
+        child.row_mono = list(self.row_mono)
+        child.row_mono[r] = row_terms[0]
+        child.row_smooth = list(self.row_smooth)
+        child.row_smooth[r] = row_terms[1]
+        child.col_mono = list(self.col_mono)
+        child.col_mono[c] = col_terms[0]
+        child.col_smooth = list(self.col_smooth)
+        child.col_smooth[c] = col_terms[1]
+
+        child.empty = empty
+        child.mono = mono
+        child.smooth = smooth
+        child.max_tile = value if value > self.max_tile else self.max_tile
+        # nadpisanie największego kafelka mniejszym wymaga pełnego przeliczenia maksimum
+        if board[r][c] == self.max_tile and value < self.max_tile:
+            child.max_tile = max(max(row) for row in child.board)
+        return child
+
+    @staticmethod
+    def _combine(weights: Dict[str, float], empty: int, mono: float, smooth: float, corner: float) -> float:
+        # ta sama kolejność działań co w evaluate()
+        return float(
+            weights["empty"] * float(empty)
+            + weights["mono"] * float(mono)
+            - weights["smooth"] * float(smooth)
+            + weights["corner"] * float(corner)
+        )
+
+
+def feature_breakdown(board: Board) -> FeatureBreakdown:
+    return FeatureBreakdown(board)
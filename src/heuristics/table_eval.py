@@ -0,0 +1,144 @@
+# src/heuristics/table_eval.py
+"""
+Tablicowa wersja evaluate() dla plansz 4x4.
+
+Wszystkie cechy poza narożnikiem rozkładają się na sumę po liniach:
+- empty: liczba zer w wierszach,
+- mono: -min(inc, dec) dla każdego wiersza i każdej kolumny,
+- smooth: |różnice| sąsiadów w wierszach (poziomo) i kolumnach (pionowo).
+
+Dla każdego z 65 536 spakowanych wierszy liczymy raz wynik wiersza
+(empty + mono + smooth) i wynik kolumny (mono + smooth) dla danych wag.
+Ocena planszy to 8 odczytów z tablic + człon narożnika (max wiersza z tablicy).
+Wynik jest równy evaluate() z dokładnością do zaokrągleń zmiennoprzecinkowych.
+"""
+from __future__ import annotations
+
+from functools import lru_cache, partial
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from src.game import bitboard as bb
+from src.heuristics.evaluate import DEFAULT_WEIGHTS, evaluate
+
+Board = Sequence[Sequence[int]]
+
+
+def _line_mono(line: List[int]) -> float:
+    inc = 0.0
+    dec = 0.0
+    for i in range(len(line) - 1):
+        diff = line[i + 1] - line[i]
+        if diff > 0:
+            inc += diff
+        else:
+            dec -= diff
+    return -min(inc, dec)
+
+
+def _line_smooth(line: List[int]) -> float:
+    """Suma |różnic| sąsiednich niepustych pól (wartość dodatnia, jak abs(smoothness))."""
+    s = 0.0
+    for i in range(len(line) - 1):
+        if line[i] and line[i + 1]:
+            s += abs(line[i] - line[i + 1])
+    return s
+
+
+@lru_cache(maxsize = 1)
+def _row_features() -> Tuple[List[int], List[float], List[float], List[int]]:
+    """Cechy niezależne od wag dla każdego wiersza: (empty, mono, smooth, max wykładnik)."""
+    empty: List[int] = []
+    mono: List[float] = []
+    smooth: List[float] = []
+    row_max: List[int] = []
+
+    for row in range(65536):
+        line = [(row >> (4 * i)) & 0xF for i in range(4)]
+        empty.append(line.count(0))
+        mono.append(_line_mono(line))
+        smooth.append(_line_smooth(line))
+        row_max.append(max(line))
+
+    return empty, mono, smooth, row_max
+
+
+class TableEvaluator:
+    """Ocena planszy przez tablice wierszy zbudowane dla jednego wektora wag."""
+
+    def __init__(self, weights: Dict[str, float] | None = None) -> None:
+        if weights is None:
+            weights = DEFAULT_WEIGHTS
+
+        self.weights = weights
+        we = weights["empty"]
+        wm = weights["mono"]
+        ws = weights["smooth"]
+        self.corner_weight = weights["corner"]
+
+        empty, mono, smooth, row_max = _row_features()
+        self.col_score = [wm * m - ws * s for m, s in zip(mono, smooth)]
+        self.row_score = [we * e + cs for e, cs in zip(empty, self.col_score)]
+        self.row_max = row_max
+
+    def evaluate_bits(self, bits: int) -> float:
+        rs = self.row_score
+        cs = self.col_score
+        rm = self.row_max
+
+        r0 = bits & 0xFFFF
+        r1 = (bits >> 16) & 0xFFFF
+        r2 = (bits >> 32) & 0xFFFF
+        r3 = bits >> 48
+
+        # bb.transpose wpisane w miejscu - to najgorętsza funkcja w expectimaxie
+        a = (bits & 0xF0F00F0FF0F00F0F) | ((bits & 0x0000F0F00000F0F0) << 12) | ((bits & 0x0F0F00000F0F0000) >> 12)
+        t = (a & 0xFF00FF0000FF00FF) | ((a & 0x00FF00FF00000000) >> 24) | ((a & 0x00000000FF00FF00) << 24)
+
+        score = (
+            rs[r0] + rs[r1] + rs[r2] + rs[r3]
+            + cs[t & 0xFFFF] + cs[(t >> 16) & 0xFFFF] + cs[(t >> 32) & 0xFFFF] + cs[t >> 48]
+        )
+
+        m = max(rm[r0], rm[r1], rm[r2], rm[r3])
+        if (r0 & 0xF) == m or (r0 >> 12) == m or (r3 & 0xF) == m or (r3 >> 12) == m:
+            score += self.corner_weight
+
+        return score
+
+    def __call__(self, board: Board) -> float:
+        """Ocena planszy jako listy list / krotki wierszy; inne rozmiary niż 4x4 -> evaluate()."""
+        if len(board) != 4:
+            return evaluate([list(row) for row in board], self.weights)
+        return self.evaluate_bits(bb.pack_board(board))
+
+
+_EVALUATORS: Dict[Tuple[Tuple[str, float], ...], TableEvaluator] = {}
+
+
+def get_table_evaluator(weights: Dict[str, float] | None = None) -> TableEvaluator:
+    """TableEvaluator dla danych wag; tablice budowane raz na wektor wag."""
+    key = tuple(sorted((weights or DEFAULT_WEIGHTS).items()))
+    if key not in _EVALUATORS:
+        _EVALUATORS[key] = TableEvaluator(weights)
+    return _EVALUATORS[key]
+
+
+EVAL_MODES: Tuple[str, ...] = ("scalar", "table", "fused")
+
+
+def get_evaluator(weights: Dict[str, float] | None = None, mode: str = "scalar") -> Callable[[Board], float]:
+    """
+    Funkcja oceny planszy dla trybu:
+    - "scalar": evaluate() na liście list,
+    - "table": TableEvaluator (plansze 4x4; inne rozmiary wracają do evaluate()),
+    - "fused": CompiledEvaluator z rejestru cech (jedno przejście, także cechy dodatkowe).
+    """
+    if mode == "scalar":
+        return partial(evaluate, weights = weights)
+    if mode == "table":
+        return get_table_evaluator(weights)
+    if mode == "fused":
+        # import lokalny: features importuje symmetry, a ten moduł ładuje się razem z agentami
+        from src.heuristics.features import get_compiled_evaluator
+        return get_compiled_evaluator(weights)
+    raise ValueError(f"Nieznany tryb oceny: {mode}")
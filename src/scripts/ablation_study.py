@@ -1,21 +1,38 @@
 from __future__ import annotations
 
+import argparse
 import csv
 import json
 from pathlib import Path
 from typing import Dict, List, Union
 
+from src.agents.disk_cache import DiskTable
 from src.agents.greedy import GreedyAgent
 from src.heuristics.weights_loader import load_weights
 from src.scripts.run_experiment import run_single_game, GameResult
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Greedy agent feature ablation study.")
+    parser.add_argument(
+        "--disk_cache",
+        type=str,
+        default=None,
+        help="Path of a persistent on-disk cache of heuristic values; later runs with the same "
+             "seeds and weights reuse it.",
+    )
+    parser.add_argument(
+        "--disk_cache_mb", type=float, default=64.0, help="Size of the on-disk cache file (MB)."
+    )
+    args = parser.parse_args()
+
     # Ustawienia badania
     num_games = 50
     base_weights_name = "balanced"
     output_dir = Path("results/ablation_greedy")
     output_dir.mkdir(parents=True, exist_ok=True)
+    # oceny heurystyki zapamiętane na dysku: kolejne uruchomienia (te same ziarna i wagi) liczą je raz
+    disk_cache = DiskTable(args.disk_cache, args.disk_cache_mb) if args.disk_cache else None
 
     base_weights = load_weights(base_weights_name)
     features_to_ablate = list(base_weights.keys())  # ['empty', 'mono', 'smooth', 'corner']
@@ -28,7 +45,7 @@ def main() -> None:
     print(f"\n--- Baseline (all features enabled, from {base_weights_name}) ---")
     baseline_game_results: List[GameResult] = []
     for j in range(num_games):
-        agent = GreedyAgent(weights=base_weights, fallback="up")
+        agent = GreedyAgent(weights=base_weights, fallback="up", disk_cache=disk_cache)
         game_result = run_single_game(agent, 4000 + j, game_logger=None)
         baseline_game_results.append(game_result)
         print(f"  Game {j + 1}/{num_games}... Score: {game_result['final_score']}")
@@ -53,7 +70,7 @@ def main() -> None:
         print(f"\n--- Ablating '{ablated_feature}' (Weights: {current_weights}) ---")
         config_game_results: List[GameResult] = []
         for j in range(num_games):
-            agent = GreedyAgent(weights=current_weights, fallback="up")
+            agent = GreedyAgent(weights=current_weights, fallback="up", disk_cache=disk_cache)
             game_result = run_single_game(agent, 5000 + j, game_logger=None)
             config_game_results.append(game_result)
             print(f"  Game {j + 1}/{num_games}... Score: {game_result['final_score']}")
@@ -71,6 +88,9 @@ def main() -> None:
         }
         ablation_results.append(ablation_entry)
 
+    if disk_cache is not None:
+        disk_cache.close()
+
     # Zapis wszystkich wyników do jednego CSV
     ablation_summary_path = output_dir / f"ablation_summary_greedy_{base_weights_name}.csv"
     if ablation_results:
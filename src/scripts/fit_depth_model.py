@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import argparse
+import glob
+from typing import List
+
+from src.agents.depth_model import FEATURES, DepthCostModel, Sample, samples_from_log
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Fit the Expectimax search cost model used for latency-targeted depth selection "
+                    "from game logs written by run_experiment --search_stats --log_full_games."
+    )
+    parser.add_argument(
+        "--logs",
+        type=str,
+        nargs="+",
+        required=True,
+        help="Glob patterns of per-game JSON logs (run them at several --max_depth values, without a time limit).",
+    )
+    parser.add_argument("--output", type=str, required=True, help="Where to write the model (JSON).")
+    parser.add_argument("--min_samples", type=int, default=20, help="Minimum moves per depth to fit that depth.")
+    args = parser.parse_args()
+
+    paths = sorted({path for pattern in args.logs for path in glob.glob(pattern)})
+    samples: List[Sample] = []
+    for path in paths:
+        samples.extend(samples_from_log(path))
+    print(f"{len(samples)} moves from {len(paths)} logs")
+
+    model = DepthCostModel.fit(samples, min_samples=args.min_samples)
+    model.save(args.output)
+
+    for depth in model.depths:
+        rows = [s for s in samples if s[0] == depth]
+        # kalibracja: jaka część ruchów zmieściła się w przewidywanym p99
+        covered = sum(ms <= model.predict_ms(depth, s[1:4]) for *s, ms in rows) / len(rows)
+        coef = ", ".join(f"{name}={c:+.3f}" for name, c in zip(("const",) + FEATURES, model.coefs[depth]))
+        print(f"  depth {depth}: {len(rows)} moves, {coef}, sigma={model.sigmas[depth]:.3f}, within p99: {covered:.1%}")
+    print(f"Model saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List, Union
+
+from src.game.state import GameState
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def _client(
+        host: str,
+        port: int,
+        agent: str,
+        client_id: int,
+        num_requests: int,
+        seed: int,
+        latencies: List[float],
+        errors: List[str],
+) -> None:
+    """Jeden klient: gra kolejne partie, pytając serwer o każdy ruch (jedno żądanie naraz)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    game = 0
+    state = GameState(seed=seed)
+    session = f"load-{client_id}-{game}"
+
+    try:
+        for i in range(num_requests):
+            if state.is_terminal():
+                # nowa partia = nowa sesja; poprzednia zwalnia tablicę transpozycji na serwerze
+                writer.write(json.dumps({"op": "close", "session": session}).encode() + b"\n")
+                await reader.readline()
+                game += 1
+                state = GameState(seed=seed + game)
+                session = f"load-{client_id}-{game}"
+
+            request = {"id": i, "agent": agent, "session": session, "board": state.board, "score": state.score}
+            start = time.perf_counter()
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            latencies.append((time.perf_counter() - start) * 1000.0)
+
+            if "error" in response:
+                errors.append(response["error"])
+                continue
+            state.step(response["move"], spawn=True)
+
+        writer.write(json.dumps({"op": "close", "session": session}).encode() + b"\n")
+        await reader.readline()
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run_load_test(
+        host: str = "127.0.0.1",
+        port: int = 8048,
+        agent: str = "greedy",
+        clients: int = 16,
+        requests_per_client: int = 200,
+        seed: int = 1000,
+) -> Dict[str, Union[int, float]]:
+    """`clients` równoległych połączeń, każde gra swoją partię; wynik: przepustowość i opóźnienia (ms)."""
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, agent, i, requests_per_client, seed + 1000 * i, latencies, errors)
+        for i in range(clients)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "max_ms": round(latencies[-1], 3) if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test a running agent server (src.scripts.serve).")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Server address.")
+    parser.add_argument("--port", type=int, default=8048, help="Server port.")
+    parser.add_argument("--agent", type=str, default="greedy", choices=["greedy", "expectimax"], help="Agent to query.")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent connections.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per connection.")
+    parser.add_argument("--seed", type=int, default=1000, help="Seed of the first client's game.")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run_load_test(args.host, args.port, args.agent, args.clients, args.requests, args.seed))
+    for key, value in summary.items():
+        print(f"{key:<15} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,14 @@ from datetime import datetime
 from pathlib import Path
 from typing import TYPE_CHECKING, Dict, List, Optional, Union
 
-from src.agents.expectimax import ExpectimaxAgent
+from src.agents.depth_model import DepthCostModel
+from src.agents.disk_cache import DiskTable
+from src.agents.expectimax import PRUNING_MODES, SAMPLE_STRATA, SEARCH_MODES, ExpectimaxAgent
 from src.agents.greedy import GreedyAgent
-from src.game.state import GameState
+from src.agents.time_manager import TimeManager
+from src.game.batch import BatchGameState
+from src.game.state import BACKENDS, make_state
+from src.heuristics.table_eval import EVAL_MODES
 from src.heuristics.weights_loader import load_weights
 from src.utils.logger import GameLogger
 
@@ -23,12 +28,21 @@ def run_single_game(
     agent: Agent,
     initial_seed: int,
     game_logger: Optional[GameLogger] = None,
+    backend: str = "list",
+    board_size: Optional[int] = None,
 ) -> GameResult:
     """Uruchamia jedną grę i zwraca jej wyniki."""
-    state = GameState(seed=initial_seed)
+    state = make_state(backend, seed=initial_seed, size=board_size)
     moves_count = 0
     game_start_time = time.monotonic()
     move_decision_times: List[float] = []
+    # głębokość osiągnięta w każdym ruchu (agenci z iteracyjnym pogłębianiem)
+    search_depths: List[int] = []
+    # tablica transpozycji żyje dłużej niż gra, więc trafienia liczymy jako przyrost
+    tt_stats = getattr(agent, "tt_stats", None)
+    tt_start = tt_stats() if tt_stats else None
+    # statystyki przeszukiwania kolejnych ruchów (agent z collect_stats)
+    move_stats: List[Dict] = []
 
     if game_logger:
         game_logger.log_step(
@@ -36,7 +50,7 @@ def run_single_game(
             reward=0,
             score=state.score,
             max_tile=state.max_tile(),
-            empty_cells=len(state.empty_cells()),
+            empty_cells=state.empty_count(),
             board=state.board,
         )
 
@@ -47,6 +61,14 @@ def run_single_game(
         move_duration = move_end_time - move_start_time
         move_decision_times.append(move_duration)
 
+        depth = getattr(agent, "last_depth", None)
+        if depth is not None:
+            search_depths.append(depth)
+
+        stats = getattr(agent, "last_stats", None)
+        if stats is not None:
+            move_stats.append(stats)
+
         res = state.step(move, spawn=True)
         moves_count += 1
 
@@ -56,9 +78,11 @@ def run_single_game(
                 reward=res.reward,
                 score=state.score,
                 max_tile=state.max_tile(),
-                empty_cells=len(state.empty_cells()),
+                empty_cells=state.empty_count(),
                 board=state.board,
                 move_time_s=move_duration,
+                search_depth=depth,
+                search_stats=stats,
             )
 
     game_end_time = time.monotonic()  # Czas zakończenia całej gry
@@ -70,7 +94,7 @@ def run_single_game(
     p95_index = min(len(sorted_move_times) - 1, int(0.95 * len(sorted_move_times)))
     p95_move_time = sorted_move_times[p95_index] if sorted_move_times else 0.0
 
-    return {
+    result: GameResult = {
         "seed": initial_seed,
         "final_score": state.score,
         "max_tile": state.max_tile(),
@@ -81,6 +105,94 @@ def run_single_game(
         "p95_move_decision_time_s": round(p95_move_time, 6),
     }
 
+    if tt_start is not None:
+        tt_end = tt_stats()
+        lookups = tt_end["lookups"] - tt_start["lookups"]
+        result["tt_hit_rate"] = round((tt_end["hits"] - tt_start["hits"]) / lookups, 4) if lookups else 0.0
+        result["tt_fill"] = round(tt_end["fill"], 4)
+
+    if search_depths:
+        result["avg_search_depth"] = round(sum(search_depths) / len(search_depths), 3)
+        result["min_search_depth"] = min(search_depths)
+
+    if move_stats:
+        result.update(summarize_search_stats(move_stats))
+
+    return result
+
+
+def summarize_search_stats(move_stats: List[Dict]) -> GameResult:
+    """Statystyki przeszukiwania ruchów gry zsumowane do kolumn podsumowania."""
+    n = len(move_stats)
+
+    def total(name: str) -> int:
+        return sum(s[name] for s in move_stats)
+
+    eval_lookups = total("eval_hits") + total("eval_misses")
+    # ruchy bez przeszukiwania (jedyny legalny) nie mają współczynnika rozgałęzienia
+    ebfs = [s["ebf"] for s in move_stats if s["depth"] > 0]
+
+    return {
+        "avg_max_nodes": round(total("max_nodes") / n, 1),
+        "avg_chance_nodes": round(total("chance_nodes") / n, 1),
+        "avg_probe_nodes": round(total("probe_nodes") / n, 1),
+        "avg_leaf_evals": round(total("leaf_evals") / n, 1),
+        "avg_ebf": round(sum(ebfs) / len(ebfs), 3) if ebfs else 0.0,
+        "tt_evictions": total("tt_evictions"),
+        "eval_hit_rate": round(total("eval_hits") / eval_lookups, 4) if eval_lookups else 0.0,
+        "eval_evictions": total("eval_evictions"),
+        "timeouts": total("timeouts"),
+    }
+
+
+def run_batch_games(agent: GreedyAgent, seeds: List[int]) -> List[GameResult]:
+    """
+    Uruchamia wiele gier naraz w BatchGameState (tylko GreedyAgent).
+    Czas decyzji jednego kroku partii jest dzielony po równo między aktywne gry.
+    """
+    batch = BatchGameState(seeds)
+    n = len(seeds)
+    batch_start_time = time.monotonic()
+    end_times = [0.0] * n
+    move_decision_times: List[List[float]] = [[] for _ in range(n)]
+
+    while not batch.all_done():
+        active = ~batch.done
+
+        move_start_time = time.perf_counter()
+        moves = agent.choose_moves_batch(batch)
+        move_duration = (time.perf_counter() - move_start_time) / int(active.sum())
+
+        batch.step(moves, spawn=True)
+
+        now = time.monotonic() - batch_start_time
+        for i in active.nonzero()[0]:
+            move_decision_times[i].append(move_duration)
+            if batch.done[i]:
+                end_times[i] = now
+
+    results: List[GameResult] = []
+    max_tiles = batch.max_tile()
+
+    for i, seed in enumerate(seeds):
+        times = sorted(move_decision_times[i])
+        avg_move_time = sum(times) / len(times) if times else 0.0
+        p95_index = min(len(times) - 1, int(0.95 * len(times)))
+        p95_move_time = times[p95_index] if times else 0.0
+
+        results.append({
+            "seed": seed,
+            "final_score": int(batch.scores[i]),
+            "max_tile": int(max_tiles[i]),
+            "moves_count": int(batch.moves_count[i]),
+            "game_duration_s": round(end_times[i], 3),
+            "end_state": "win" if max_tiles[i] >= 2048 else "lose",
+            "avg_move_decision_time_s": round(avg_move_time, 6),
+            "p95_move_decision_time_s": round(p95_move_time, 6),
+        })
+
+    return results
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(
@@ -104,7 +216,27 @@ def main() -> None:
         "--time_limit_ms",
         type=int,
         default=60,
-        help="Time limit per move for Expectimax (in milliseconds).",
+        help="Time limit per move for Expectimax (in milliseconds); searches depth 1, 2, ... up to "
+             "--max_depth and keeps the deepest completed iteration (0 = no limit, fixed depth).",
+    )
+    parser.add_argument(
+        "--time_budget_ms",
+        type=float,
+        default=0.0,
+        help="Expectimax: time budget per game (or per --time_budget_moves moves) split across moves by "
+             "position difficulty; replaces --time_limit_ms (0 = off).",
+    )
+    parser.add_argument(
+        "--time_budget_moves",
+        type=int,
+        default=0,
+        help="Refill --time_budget_ms every N moves (0 = one budget for the whole game).",
+    )
+    parser.add_argument(
+        "--expected_moves",
+        type=int,
+        default=1000,
+        help="Expected game length used to pace a per-game --time_budget_ms.",
     )
     parser.add_argument(
         "--adaptive_depth",
@@ -121,7 +253,126 @@ def main() -> None:
         "--adaptive_depth_bonus", type=int, default=1, help="Bonus depth when empty cells >= threshold."
     )
     parser.add_argument(
-        "--cache_maxsize", type=int, default=100000, help="Max size for LRU cache in Expectimax."
+        "--cache_maxsize", type=int, default=100000, help="Max size for the heuristic evaluation LRU cache in Expectimax."
+    )
+    parser.add_argument(
+        "--tt_mb",
+        type=float,
+        default=16.0,
+        help="Memory budget (MB) of the Expectimax transposition table; it is kept across moves and games.",
+    )
+    parser.add_argument(
+        "--eval_mode",
+        type=str,
+        default="scalar",
+        choices=list(EVAL_MODES),
+        help="Heuristic evaluation: 'scalar' (evaluate on lists), 'table' (precomputed per-row tables, 4x4) "
+             "or 'fused' (single-pass feature registry; enables extra features such as merges/snake from the weights).",
+    )
+    parser.add_argument(
+        "--no_symmetry_cache",
+        action="store_true",
+        help="Key Expectimax caches on the raw board instead of its canonical rotation/reflection.",
+    )
+    parser.add_argument(
+        "--search",
+        type=str,
+        default="copy",
+        choices=list(SEARCH_MODES),
+        help="Expectimax tree walk: 'copy' (new node states, cached MAX/CHANCE values), "
+             "'inplace' (one state per move searched with apply_move/place_tile + undo) or "
+             "'frontier' (like 'copy', but the last plies are expanded breadth-first and scored "
+             "with one vectorized call).",
+    )
+    parser.add_argument(
+        "--frontier_plies",
+        type=int,
+        default=3,
+        choices=[1, 2, 3],
+        help="Expectimax with --search frontier: chance nodes at most this many plies above the "
+             "leaves are expanded breadth-first.",
+    )
+    parser.add_argument(
+        "--min_prob",
+        type=float,
+        default=0.0,
+        help="Expectimax: stop expanding chance nodes whose cumulative spawn probability is below this "
+             "(e.g. 0.01-0.1; 0 = off).",
+    )
+    parser.add_argument(
+        "--sample_threshold",
+        type=int,
+        default=None,
+        help="Expectimax: sample spawn outcomes at chance nodes with more empty cells than this (default: off).",
+    )
+    parser.add_argument(
+        "--sample_budget", type=int, default=8, help="Spawn outcomes evaluated per sampled chance node."
+    )
+    parser.add_argument(
+        "--sample_seed", type=int, default=0, help="Seed of the chance-node sampler (reproducible per board/depth)."
+    )
+    parser.add_argument(
+        "--sample_stratify",
+        type=str,
+        default="none",
+        choices=list(SAMPLE_STRATA),
+        help="Stratify sampled spawns by tile value (2/4), by distance to the max tile, or both.",
+    )
+    parser.add_argument(
+        "--no_incremental_eval",
+        action="store_true",
+        help="Evaluate every spawn child from scratch instead of updating the parent's row/column features.",
+    )
+    parser.add_argument(
+        "--pruning",
+        type=str,
+        default="none",
+        choices=list(PRUNING_MODES),
+        help="Expectimax: skip chance children that cannot change the decision, using bounds of the "
+             "heuristic ('star1'), plus probing one move per child first ('star2'). Needs --search copy.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Expectimax: search depth-2 nodes on a pool of this many processes sharing one "
+             "transposition table in shared memory (0 = single process).",
+    )
+    parser.add_argument(
+        "--depth_model",
+        type=str,
+        default=None,
+        help="Expectimax: cost model from src.scripts.fit_depth_model; with --latency_target_ms it "
+             "replaces --adaptive_depth (deepest depth whose predicted p99 move time fits the target) "
+             "and turns off --time_limit_ms, which would cut the iterations the model was fitted on.",
+    )
+    parser.add_argument(
+        "--latency_target_ms",
+        type=float,
+        default=None,
+        help="Expectimax: p99 move time target for --depth_model.",
+    )
+    parser.add_argument(
+        "--search_stats",
+        action="store_true",
+        help="Expectimax: collect per-move search statistics (nodes per depth, leaf evaluations, cache "
+             "hits/evictions, timeouts, branching factor) into the summary CSV and the per-step logs.",
+    )
+    parser.add_argument(
+        "--ponder",
+        action="store_true",
+        help="Expectimax: between moves, search the possible spawns in a background thread and fill "
+             "the transposition table for the next move (single process only).",
+    )
+    parser.add_argument(
+        "--disk_cache",
+        type=str,
+        default=None,
+        help="Path of a persistent on-disk cache of heuristic values and Expectimax subtree values, "
+             "reused by later runs (keyed by weights and search settings; default: off).",
+    )
+    parser.add_argument(
+        "--disk_cache_mb", type=float, default=256.0, help="Size of the on-disk cache file (MB)."
     )
     parser.add_argument(
         "--weights",
@@ -129,6 +380,25 @@ def main() -> None:
         default="balanced",
         help='Weights preset name or path to JSON (e.g., "balanced").',
     )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default="list",
+        choices=sorted(BACKENDS),
+        help="Game state backend: 'list' (list of lists) or 'bitboard' (packed 64-bit board).",
+    )
+    parser.add_argument(
+        "--board_size",
+        type=int,
+        default=None,
+        help="Board size N for an NxN game (e.g. 3, 5, 6); sizes other than 4 need --backend bitboard.",
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=0,
+        help="Greedy only: play games in vectorized batches of this size (0 = one game at a time).",
+    )
     parser.add_argument(
         "--start_seed", type=int, default=1000, help="Starting seed for games."
     )
@@ -150,10 +420,13 @@ def main() -> None:
     output_path.mkdir(parents=True, exist_ok=True)
 
     weights = load_weights(args.weights)
+    disk_cache = DiskTable(args.disk_cache, args.disk_cache_mb) if args.disk_cache else None
     agent_instance: Agent
 
     if args.agent_type == "greedy":
-        agent_instance = GreedyAgent(weights=weights, fallback="up")
+        agent_instance = GreedyAgent(
+            weights=weights, fallback="up", eval_mode=args.eval_mode, disk_cache=disk_cache
+        )
     elif args.agent_type == "expectimax":
         adaptive_depth_config = None
 
@@ -164,13 +437,39 @@ def main() -> None:
                 "bonus": args.adaptive_depth_bonus,
             }
 
+        time_manager = None
+        if args.time_budget_ms > 0:
+            time_manager = TimeManager(
+                args.time_budget_ms,
+                per_moves=args.time_budget_moves or None,
+                expected_moves=args.expected_moves,
+            )
+
         agent_instance = ExpectimaxAgent(
             weights=weights,
             max_depth=args.max_depth,
             adaptive_depth_config=adaptive_depth_config,
-            time_limit_ms=args.time_limit_ms,
-            greedy_fallback=GreedyAgent(weights=weights, fallback="up"),
+            time_limit_ms=None if args.depth_model else args.time_limit_ms,
             cache_maxsize=args.cache_maxsize,
+            symmetry=not args.no_symmetry_cache,
+            eval_mode=args.eval_mode,
+            incremental_eval=not args.no_incremental_eval,
+            search=args.search,
+            tt_mb=args.tt_mb,
+            min_prob=args.min_prob,
+            sample_threshold=args.sample_threshold,
+            sample_budget=args.sample_budget,
+            sample_seed=args.sample_seed,
+            sample_stratify=args.sample_stratify,
+            workers=args.workers,
+            pruning=args.pruning,
+            disk_cache=disk_cache,
+            time_manager=time_manager,
+            ponder=args.ponder,
+            collect_stats=args.search_stats,
+            frontier_plies=args.frontier_plies,
+            depth_model=DepthCostModel.load(args.depth_model) if args.depth_model else None,
+            latency_target_ms=args.latency_target_ms,
         )
     else:
         raise ValueError(f"Unknown agent type: {args.agent_type}")
@@ -181,25 +480,53 @@ def main() -> None:
 
     print(f"Running {args.num_games} games with {args.agent_type} agent...")
 
-    for i in range(args.num_games):
-        current_seed = args.start_seed + i
+    if args.batch_size > 0:
+        if not isinstance(agent_instance, GreedyAgent):
+            raise ValueError("--batch_size is only supported for the greedy agent")
+        if args.board_size not in (None, 4):
+            raise ValueError("--batch_size only supports 4x4 boards")
+        if args.backend != "list":
+            raise ValueError("--batch_size plays on its own vectorized state; --backend is not supported")
+        if args.log_full_games:
+            raise ValueError("--batch_size does not record step logs; --log_full_games is not supported")
+
+        for batch_start in range(0, args.num_games, args.batch_size):
+            seeds = [
+                args.start_seed + i
+                for i in range(batch_start, min(args.num_games, batch_start + args.batch_size))
+            ]
+            print(f"  Batch of {len(seeds)} games (seeds {seeds[0]}..{seeds[-1]})... ", end="", flush=True)
+            batch_results = run_batch_games(agent_instance, seeds)
+            all_results.extend(batch_results)
+            print(f"Done. Avg Score: {sum(r['final_score'] for r in batch_results) / len(batch_results):.2f}")
+    else:
+        for i in range(args.num_games):
+            current_seed = args.start_seed + i
+
+            print(f"  Game {i+1}/{args.num_games} (seed: {current_seed})... ", end="", flush=True)
 
-        print(f"  Game {i+1}/{args.num_games} (seed: {current_seed})... ", end="", flush=True)
+            game_logger: Optional[GameLogger] = None
 
-        game_logger: Optional[GameLogger] = None
+            if args.log_full_games:
+                full_log_file = output_path / f"{results_file_base}_game_{current_seed}.json"
+                game_logger = GameLogger(log_filepath = full_log_file, agent_info = args.agent_type)
 
-        if args.log_full_games:
-            full_log_file = output_path / f"{results_file_base}_game_{current_seed}.json"
-            game_logger = GameLogger(log_filepath = full_log_file, agent_info = args.agent_type)
+            game_result = run_single_game(
+                agent_instance, current_seed, game_logger, backend=args.backend, board_size=args.board_size
+            )
+            all_results.append(game_result)
 
-        game_result = run_single_game(agent_instance, current_seed, game_logger)
-        all_results.append(game_result)
+            print(
+                f"Done. Score: {game_result['final_score']}, Max: {game_result['max_tile']}, "
+                f"Avg Move Time: {game_result['avg_move_decision_time_s']:.6f} s, "
+                f"P95 Move Time: {game_result['p95_move_decision_time_s']:.6f} s"
+                + (f", Avg Depth: {game_result['avg_search_depth']}" if "avg_search_depth" in game_result else "")
+            )
 
-        print(
-            f"Done. Score: {game_result['final_score']}, Max: {game_result['max_tile']}, "
-            f"Avg Move Time: {game_result['avg_move_decision_time_s']:.6f} s, "
-            f"P95 Move Time: {game_result['p95_move_decision_time_s']:.6f} s"
-        )
+    if isinstance(agent_instance, ExpectimaxAgent):
+        agent_instance.close()
+    if disk_cache is not None:
+        disk_cache.close()
 
     csv_filepath = output_path / f"{results_file_base}_summary.csv"
 
@@ -12,7 +12,7 @@ from typing import List, Literal, Optional
 from src.agents.base import Agent
 from src.agents.expectimax import ExpectimaxAgent
 from src.agents.greedy import GreedyAgent
-from src.game.state import GameState
+from src.game.state import BACKENDS, GameState, make_state
 from src.heuristics.weights_loader import load_weights
 
 project_root = Path(__file__).parent.parent
@@ -71,6 +71,9 @@ def run_one_interactive(
         seed: int | None,
         interactive_mode: Literal['live', 'step'],
         delay_s: float,
+        backend: str = "list",
+        workers: int = 0,
+        ponder: bool = False,
 ) -> None:
     import os, sys
     import time
@@ -100,13 +103,14 @@ def run_one_interactive(
             weights=weights,
             max_depth=3,
             time_limit_ms=50,
-            greedy_fallback=GreedyAgent(weights=weights, fallback="up"),
             cache_maxsize=100000,
+            workers=workers,
+            ponder=ponder,
         )
     else:
         raise ValueError(f"Unknown agent type: {agent_type}")
 
-    state = GameState(seed=seed)
+    state = make_state(backend, seed=seed)
     moves_count = 0
     exit_flag = False
 
@@ -139,6 +143,9 @@ def run_one_interactive(
 
     except KeyboardInterrupt:
         print("\nExiting...")
+    finally:
+        if isinstance(agent_instance, ExpectimaxAgent):
+            agent_instance.close()
 
 
 
@@ -167,6 +174,26 @@ def main() -> None:
         choices=["live", "step"],
         help="Interactive mode: 'live' for continuous play, 'step' for step-by-step.",
     )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default="list",
+        choices=sorted(BACKENDS),
+        help="Game state backend: 'list' (list of lists) or 'bitboard' (packed 64-bit board).",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Expectimax only: number of search processes (0 = single process).",
+    )
+
+    parser.add_argument(
+        "--ponder",
+        action="store_true",
+        help="Expectimax only: search the possible spawns in the background while the board is shown.",
+    )
 
     args = parser.parse_args()
     # run_one(seed = args.seed, delay_s = args.delay, weights_name = args.weights)
@@ -176,7 +203,10 @@ def main() -> None:
         weights_name=args.weights,
         seed=args.seed,
         delay_s=args.delay,
-        interactive_mode=args.mode
+        interactive_mode=args.mode,
+        backend=args.backend,
+        workers=args.workers,
+        ponder=args.ponder,
     )
 
 if __name__ == "__main__":
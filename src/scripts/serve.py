@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from src.agents.expectimax import SEARCH_MODES
+from src.agents.server import AgentServer
+from src.game.state import BACKENDS
+from src.heuristics.weights_loader import load_weights
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve 2048 agents over a local JSON-lines socket.")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=8048, help="Port to listen on (0 = any free port).")
+    parser.add_argument("--weights", type=str, default="balanced", help="Weights preset for both agents.")
+    parser.add_argument("--max_depth", type=int, default=3, help="Expectimax search depth.")
+    parser.add_argument(
+        "--time_limit_ms",
+        type=int,
+        default=None,
+        help="Expectimax time limit per move (enables iterative deepening).",
+    )
+    parser.add_argument(
+        "--search",
+        type=str,
+        default="copy",
+        choices=list(SEARCH_MODES),
+        help="Expectimax tree walk (see run_experiment).",
+    )
+    parser.add_argument("--tt_mb", type=float, default=4.0, help="Transposition table size per session (MB).")
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default="list",
+        choices=sorted(BACKENDS),
+        help="Game state backend used for Expectimax requests.",
+    )
+    parser.add_argument(
+        "--batch_window_ms",
+        type=float,
+        default=0.0,
+        help="How long the first greedy request waits for others to share its vectorized batch "
+             "(0 = requests read in the same event loop pass).",
+    )
+    parser.add_argument("--max_batch", type=int, default=256, help="Greedy batch size that is evaluated at once.")
+    parser.add_argument(
+        "--max_sessions",
+        type=int,
+        default=32,
+        help="Expectimax sessions kept alive (each has its own transposition table).",
+    )
+    parser.add_argument("--search_threads", type=int, default=1, help="Threads running Expectimax searches.")
+    args = parser.parse_args()
+
+    server = AgentServer(
+        host=args.host,
+        port=args.port,
+        weights=load_weights(args.weights),
+        expectimax_options={
+            "max_depth": args.max_depth,
+            "time_limit_ms": args.time_limit_ms,
+            "search": args.search,
+            "tt_mb": args.tt_mb,
+        },
+        backend=args.backend,
+        batch_window_ms=args.batch_window_ms,
+        max_batch=args.max_batch,
+        max_sessions=args.max_sessions,
+        search_threads=args.search_threads,
+    )
+
+    async def serve() -> None:
+        await server.start()
+        print(f"Serving agents on {server.host}:{server.port}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
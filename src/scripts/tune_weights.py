@@ -13,6 +13,7 @@ import random
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 
+from src.agents.disk_cache import DiskTable
 from src.agents.greedy import GreedyAgent
 from src.game.state import GameState
 from src.heuristics.evaluate import evaluate
@@ -68,12 +69,22 @@ def main() -> None:
         default="results/tuning",
         help="Directory to save tuning results.",
     )
+    parser.add_argument(
+        "--disk_cache",
+        type=str,
+        default=None,
+        help="Path of a persistent on-disk cache of heuristic values shared by all configs and later runs.",
+    )
+    parser.add_argument(
+        "--disk_cache_mb", type=float, default=256.0, help="Size of the on-disk cache file (MB)."
+    )
     args = parser.parse_args()
 
     output_path = Path(args.output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
     base_weights_dict = load_weights(args.base_weights)
+    disk_cache = DiskTable(args.disk_cache, args.disk_cache_mb) if args.disk_cache else None
 
     all_tuning_results: List[Dict[str, Union[str, float, int]]] = []
 
@@ -98,7 +109,7 @@ def main() -> None:
             # Tymczasowo tworzymy agenta dla każdej gry, by łatwiej zmieniać wagi
             # (W praktyce można tworzyć raz na konfigurację)
             if args.agent_type == "greedy":
-                agent_instance = GreedyAgent(weights=current_weights, fallback="up")
+                agent_instance = GreedyAgent(weights=current_weights, fallback="up", disk_cache=disk_cache)
             # elif args.agent_type == "expectimax":
             #    # W tym miejscu dodasz ExpectimaxAgent, gdy będzie gotowy
             #    # from src.agents.expectimax import ExpectimaxAgent
@@ -133,6 +144,9 @@ def main() -> None:
         }
         all_tuning_results.append(tuning_entry)
 
+    if disk_cache is not None:
+        disk_cache.close()
+
     # Zapis wszystkich wyników tuningu do jednego CSV
     tuning_summary_path = output_path / f"tuning_summary_{args.agent_type}_{args.base_weights}.csv"
     if all_tuning_results:
@@ -27,6 +27,8 @@ class GameLogger:
         empty_cells: int,
         board: List[List[int]],
         move_time_s: Optional[float] = None, # NOWE: opcjonalny czas ruchu
+        search_depth: Optional[int] = None,
+        search_stats: Optional[Dict[str, Any]] = None,
     ) -> None:
         """Loguje stan gry po każdym ruchu."""
         step_entry = {
@@ -40,6 +42,10 @@ class GameLogger:
         }
         if move_time_s is not None: # Dodajemy tylko jeśli podano
             step_entry["move_time_s"] = move_time_s
+        if search_depth is not None:
+            step_entry["search_depth"] = search_depth
+        if search_stats is not None:
+            step_entry["search_stats"] = search_stats
         self.log_data["steps"].append(step_entry)
 
     def __del__(self):
@@ -0,0 +1,85 @@
+# tests/batch_test.py
+import random
+
+import numpy as np
+import pytest
+
+from src.agents.greedy import GreedyAgent
+from src.game import bitboard as bb
+from src.game.batch import BatchGameState
+from src.game.state import ALLOWED_MOVES, BitboardGameState
+from src.heuristics.evaluate import evaluate, evaluate_exponents
+from src.heuristics.weights_loader import load_weights
+
+
+def random_boards(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    vals = [2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
+    return [
+        [[rng.choice(vals) if rng.random() < 0.75 else 0 for _ in range(4)] for _ in range(4)]
+        for _ in range(n)
+    ]
+
+
+def test_afterstates_match_bitboard_engine():
+    boards = random_boards(200)
+    batch = BatchGameState.from_boards(list(range(200)), boards)
+    after, gains, legal = batch.afterstates()
+    values = np.where(after > 0, np.left_shift(1, after.astype(np.int64)), 0)
+
+    for i, board in enumerate(boards):
+        state = BitboardGameState(board=board)
+        for m, move in enumerate(ALLOWED_MOVES):
+            new_bits, moved, gain = bb.execute_move(state.bits, move)
+            assert values[m, i].tolist() == bb.unpack_board(new_bits)
+            assert gains[m, i] == gain
+            assert legal[m, i] == (moved and not state.done)
+        assert batch.done[i] == state.is_terminal()
+
+
+def test_evaluate_exponents_matches_evaluate():
+    boards = random_boards(300, seed=1)
+    weights = load_weights("balanced")
+    batch = BatchGameState.from_boards(list(range(300)), boards)
+    values = evaluate_exponents(batch.exps, weights)
+    for i, board in enumerate(boards):
+        assert values[i] == evaluate(board, weights)
+
+
+def test_greedy_batch_matches_scalar_greedy():
+    boards = random_boards(200, seed=2)
+    agent = GreedyAgent(weights=load_weights("balanced"))
+    batch = BatchGameState.from_boards(list(range(200)), boards)
+    moves = agent.choose_moves_batch(batch)
+    for i, board in enumerate(boards):
+        assert ALLOWED_MOVES[moves[i]] == agent.choose_move(BitboardGameState(board=board))
+
+
+def test_games_depend_only_on_their_seed():
+    agent = GreedyAgent(weights=load_weights("balanced"))
+    big = BatchGameState([7, 8, 9, 10])
+    small = BatchGameState([9])
+    assert (big.exps[2] == small.exps[0]).all()
+
+    while not big.all_done():
+        big.step(agent.choose_moves_batch(big))
+    while not small.all_done():
+        small.step(agent.choose_moves_batch(small))
+
+    assert big.scores[2] == small.scores[0]
+    assert big.moves_count[2] == small.moves_count[0]
+    assert (big.exps[2] == small.exps[0]).all()
+
+
+def test_new_games_start_with_two_twos():
+    batch = BatchGameState(list(range(50)))
+    assert ((batch.exps == 1).sum(axis=(1, 2)) == 2).all()
+    assert ((batch.exps == 0).sum(axis=(1, 2)) == 14).all()
+
+
+def test_greedy_batch_rejects_unsupported_configs():
+    batch = BatchGameState([1, 2])
+    weights = dict(load_weights("balanced"), merges=2.0)
+    for agent in (GreedyAgent(weights=weights), GreedyAgent(weights=load_weights("balanced"), eval_mode="table")):
+        with pytest.raises(ValueError):
+            agent.choose_moves_batch(batch)
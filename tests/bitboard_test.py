@@ -0,0 +1,161 @@
+# tests/bitboard_test.py
+import random
+
+import pytest
+
+from src.game import bitboard as bb
+from src.game import logic
+from src.game.state import ALLOWED_MOVES, BitboardGameState, GameState, make_state
+
+
+def random_board(rng: random.Random, fill: float = 0.7):
+    vals = [2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
+    return [[rng.choice(vals) if rng.random() < fill else 0 for _ in range(4)] for _ in range(4)]
+
+
+def test_pack_unpack_roundtrip():
+    board = [
+        [2, 0, 4, 8],
+        [0, 16, 0, 32],
+        [64, 128, 256, 512],
+        [1024, 0, 0, 2],
+    ]
+    assert bb.unpack_board(bb.pack_board(board)) == board
+
+
+def test_transpose_matches_list_transpose():
+    rng = random.Random(1)
+    for _ in range(200):
+        board = random_board(rng)
+        transposed = [list(row) for row in zip(*board)]
+        assert bb.unpack_board(bb.transpose(bb.pack_board(board))) == transposed
+
+
+@pytest.mark.parametrize("move", ALLOWED_MOVES)
+def test_moves_match_list_engine(move):
+    rng = random.Random(ALLOWED_MOVES.index(move))
+    for _ in range(300):
+        board = random_board(rng, fill=rng.random())
+        ref = GameState(board=board, seed=0)
+        expected, moved, gain = ref._simulate_move_with_gain(move, ref.board)
+
+        new_bits, bb_moved, bb_gain = bb.execute_move(bb.pack_board(board), move)
+        assert bb.unpack_board(new_bits) == expected
+        assert bb_moved == moved
+        assert bb_gain == gain
+
+
+@pytest.mark.parametrize("move", ALLOWED_MOVES)
+def test_list_engine_matches_logic_moves(move):
+    rng = random.Random(10 + ALLOWED_MOVES.index(move))
+    for _ in range(300):
+        board = random_board(rng, fill=rng.random())
+        before = [row[:] for row in board]
+        expected, _ = getattr(logic, move)([row[:] for row in board])
+        after, moved, _ = GameState(board=board)._simulate_move_with_gain(move, board)
+        assert after == expected
+        assert moved == (expected != before)
+        assert board == before
+
+
+def test_row_merge_order():
+    # [2, 2, 2, 2] -> [4, 4]; [2, 2, 2, 0] -> [4, 2]
+    board = [
+        [2, 2, 2, 2],
+        [2, 2, 2, 0],
+        [0, 0, 0, 0],
+        [0, 0, 0, 0],
+    ]
+    new_bits, moved, gain = bb.execute_move(bb.pack_board(board), "left")
+    assert moved
+    assert gain == 12
+    assert bb.unpack_board(new_bits)[:2] == [[4, 4, 0, 0], [4, 2, 0, 0]]
+
+
+def test_legal_moves_and_terminal_match_list_engine():
+    rng = random.Random(7)
+    for _ in range(300):
+        board = random_board(rng, fill=0.95)
+        ref = GameState(board=board, seed=0)
+        state = BitboardGameState(board=board, seed=0)
+        assert state.legal_moves() == ref.legal_moves()
+        assert state.is_terminal() == ref.is_terminal()
+        assert state.empty_cells() == ref.empty_cells()
+        assert state.max_tile() == ref.max_tile()
+
+
+def test_same_seed_same_game():
+    board = [
+        [2, 0, 0, 0],
+        [0, 0, 0, 0],
+        [0, 0, 2, 0],
+        [0, 0, 0, 0],
+    ]
+    ref = GameState(board=board, seed=123)
+    state = make_state("bitboard", board=board, seed=123)
+    move_rng = random.Random(5)
+
+    while not ref.is_terminal():
+        moves = ref.legal_moves()
+        assert state.legal_moves() == moves
+        move = move_rng.choice(moves)
+        ref_res = ref.step(move)
+        res = state.step(move)
+        assert res == ref_res
+        assert state.board == ref.board
+        assert state.score == ref.score
+
+    assert state.is_terminal()
+
+
+def test_clone_is_independent():
+    state = BitboardGameState(board=[[2, 2, 0, 0], [0] * 4, [0] * 4, [0] * 4], seed=0)
+    ns = state.clone()
+    ns.step("left", spawn=False)
+    assert state.board[0][:2] == [2, 2]
+    assert ns.board[0][0] == 4
+    assert ns.score == 4 and state.score == 0
+
+
+def test_successors_match_list_engine():
+    rng = random.Random(11)
+    for _ in range(200):
+        board = random_board(rng, fill=0.8)
+        ref = GameState(board=board, seed=0)
+        state = BitboardGameState(board=board, seed=0)
+        assert state.successors() == ref.successors()
+
+
+def test_tiles_above_32768_are_rejected():
+    top = [[32768, 2, 0, 0], [0] * 4, [0] * 4, [0] * 4]
+    assert bb.unpack_board(bb.pack_board(top)) == top
+    for tile in (65536, 1 << 17):
+        board = [[tile, 2, 0, 0], [0] * 4, [0] * 4, [0] * 4]
+        with pytest.raises(ValueError):
+            bb.pack_board(board)
+        with pytest.raises(ValueError):
+            make_state("bitboard", board=board)
+    state = make_state("bitboard", board=top)
+    with pytest.raises(ValueError):
+        state.board = [[65536, 0, 0, 0], [0] * 4, [0] * 4, [0] * 4]
+
+
+def test_32768_tiles_do_not_merge():
+    # 65536 nie mieści się w półbajcie: wiersz zostaje bez zmian
+    board = [[32768, 32768, 0, 0], [0] * 4, [0] * 4, [0] * 4]
+    new, moved, gain = bb.execute_move(bb.pack_board(board), "left")
+    assert not moved and gain == 0
+    assert bb.unpack_board(new) == board
+
+
+@pytest.mark.parametrize("backend", ["list", "bitboard"])
+def test_cached_derivatives_survive_caller_changes(backend):
+    board = [[2, 4, 0, 0], [0] * 4, [0] * 4, [0, 0, 0, 2]]
+    state = make_state(backend, board=board)
+    state.empty_cells().clear()
+    assert state.empty_count() == 13 and not state.is_terminal()
+
+    filled = state.board
+    filled[1][1] = 8
+    state.board = filled
+    assert state.empty_count() == 12 and (1, 1) not in state.empty_cells()
@@ -0,0 +1,107 @@
+# tests/board_size_test.py
+import random
+
+import pytest
+
+from src.agents.expectimax import ExpectimaxAgent
+from src.agents.greedy import GreedyAgent
+from src.game import bitboard as bb
+from src.game.state import ALLOWED_MOVES, make_state
+
+
+def reference_move(board, move):
+    """Prosta referencja ruchu na liście list dowolnego rozmiaru."""
+    n = len(board)
+
+    def slide(line):
+        tiles = [v for v in line if v]
+        out, gain, i = [], 0, 0
+        while i < len(tiles):
+            if i + 1 < len(tiles) and tiles[i] == tiles[i + 1]:
+                out.append(tiles[i] * 2)
+                gain += tiles[i] * 2
+                i += 2
+            else:
+                out.append(tiles[i])
+                i += 1
+        return out + [0] * (n - len(out)), gain
+
+    if move in ("up", "down"):
+        lines = [[board[r][c] for r in range(n)] for c in range(n)]
+    else:
+        lines = [list(row) for row in board]
+    if move in ("right", "down"):
+        lines = [line[::-1] for line in lines]
+
+    total = 0
+    moved_lines = []
+    for line in lines:
+        new_line, gain = slide(line)
+        total += gain
+        moved_lines.append(new_line)
+
+    if move in ("right", "down"):
+        moved_lines = [line[::-1] for line in moved_lines]
+    if move in ("up", "down"):
+        moved_lines = [[moved_lines[c][r] for c in range(n)] for r in range(n)]
+    return moved_lines, total
+
+
+@pytest.mark.parametrize("size", [3, 4, 5, 6])
+def test_engine_moves_match_reference(size):
+    engine = bb.get_engine(size)
+    rng = random.Random(size)
+    vals = [2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 65536]
+    if size <= 4:
+        vals = vals[:-2]
+    for _ in range(200):
+        board = [[rng.choice(vals) if rng.random() < 0.7 else 0 for _ in range(size)] for _ in range(size)]
+        packed = engine.pack_board(board)
+        assert engine.unpack_board(packed) == board
+        for move in ALLOWED_MOVES:
+            expected, gain = reference_move(board, move)
+            new_bits, moved, bb_gain = engine.execute_move(packed, move)
+            assert engine.unpack_board(new_bits) == expected
+            assert moved == (expected != board)
+            assert bb_gain == gain
+
+
+@pytest.mark.parametrize("size", [3, 5, 6])
+def test_agents_play_non_4x4_boards(size):
+    greedy = GreedyAgent()
+    state = make_state("bitboard", seed=size, size=size)
+    assert len(state.board) == size
+
+    for _ in range(30):
+        if state.is_terminal():
+            break
+        move = greedy.choose_move(state)
+        assert move in state.legal_moves()
+        state.step(move)
+
+    state = make_state("bitboard", seed=size, size=size)
+    agent = ExpectimaxAgent(max_depth=2)
+    move = agent.choose_move(state)
+    assert move in state.legal_moves()
+
+
+def test_list_backend_rejects_other_sizes():
+    with pytest.raises(ValueError):
+        make_state("list", size=5)
+
+
+@pytest.mark.parametrize("size", [3, 5])
+def test_engine_rejects_tiles_wider_than_a_cell(size):
+    engine = bb.get_engine(size)
+    top = 1 << engine.cell_mask
+    board = [[0] * size for _ in range(size)]
+    board[0][0] = board[0][1] = top
+    assert engine.unpack_board(engine.pack_board(board)) == board
+    # największy kafelek się nie łączy
+    assert not engine.execute_move(engine.pack_board(board), "left")[1]
+
+    board[0][0] = 2 * top
+    with pytest.raises(ValueError):
+        engine.pack_board(board)
+    with pytest.raises(ValueError):
+        make_state("bitboard", board=board, size=size)
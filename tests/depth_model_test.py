@@ -0,0 +1,98 @@
+# tests/depth_model_test.py
+import math
+import random
+
+import pytest
+
+from src.agents.depth_model import DepthCostModel, board_features, samples_from_log
+from src.agents.expectimax import ExpectimaxAgent
+from src.game.state import GameState
+from src.heuristics.weights_loader import load_weights
+from src.utils.logger import GameLogger
+
+BOARD = [
+    [2, 4, 8, 0],
+    [0, 2, 0, 0],
+    [0, 0, 4, 0],
+    [2, 0, 0, 0],
+]
+
+
+def synthetic_samples(n: int = 200, seed: int = 0):
+    """log(ms) = -2 + depth + 0.2 * puste + szum: każda głębokość ~e razy droższa."""
+    rng = random.Random(seed)
+    samples = []
+    for depth in (2, 3, 4):
+        for _ in range(n):
+            empties, distinct, legal = rng.randint(0, 14), rng.randint(2, 10), rng.randint(1, 4)
+            ms = math.exp(-2.0 + depth + 0.2 * empties + rng.gauss(0.0, 0.1))
+            samples.append((depth, empties, distinct, legal, ms))
+    return samples
+
+
+def test_fit_recovers_cost_and_spread():
+    model = DepthCostModel.fit(synthetic_samples())
+    assert model.depths == [2, 3, 4]
+    const, empties, distinct, legal = model.coefs[3]
+    assert const == pytest.approx(1.0, abs=0.1) and empties == pytest.approx(0.2, abs=0.01)
+    assert abs(distinct) < 0.02 and abs(legal) < 0.05
+    assert model.sigmas[3] == pytest.approx(0.1, rel=0.2)
+    # p99 nad średnią o ~2.33 sigma
+    ratio = model.predict_ms(3, (5, 4, 3)) / model.predict_ms(3, (5, 4, 3), quantile=False)
+    assert ratio == pytest.approx(math.exp(2.326 * model.sigmas[3]))
+
+
+def test_select_depth_is_deepest_within_target(tmp_path):
+    model = DepthCostModel.fit(synthetic_samples())
+    crowded, open_board = (2, 8, 2), (14, 3, 4)
+    for features in (crowded, open_board):
+        depth = model.select_depth(features, target_ms=20.0)
+        assert model.predict_ms(depth, features) <= 20.0 or depth == 2
+        if depth < 4:
+            assert model.predict_ms(depth + 1, features) > 20.0
+    # więcej pustych pól = droższe drzewo = płycej przy tym samym celu
+    assert model.select_depth(crowded, 20.0) > model.select_depth(open_board, 20.0)
+    assert model.select_depth(crowded, 1e9, max_depth=3) == 3
+    assert model.select_depth(open_board, 1e-9) == 2
+    # wszystkie głębokości modelu ponad limitem: nie głębiej niż max_depth
+    assert model.select_depth(crowded, 1e9, max_depth=1) == 1
+
+    path = tmp_path / "model.json"
+    model.save(path)
+    loaded = DepthCostModel.load(path)
+    assert loaded.coefs == model.coefs and loaded.sigmas == model.sigmas
+
+
+def test_agent_uses_model_depth():
+    model = DepthCostModel.fit(synthetic_samples())
+    state = GameState(board=BOARD)
+    features = board_features(state.board, len(state.legal_moves()))
+    target = model.predict_ms(3, features) * 1.01
+    agent = ExpectimaxAgent(weights=load_weights("balanced"), max_depth=4, depth_model=model, latency_target_ms=target)
+    agent.choose_move(state)
+    assert agent.last_target_depth == agent.last_depth == 3
+
+    with pytest.raises(ValueError):
+        ExpectimaxAgent(depth_model=model)
+
+
+def test_samples_from_log_pair_decisions_with_boards(tmp_path):
+    path = tmp_path / "game.json"
+    logger = GameLogger(log_filepath=path)
+    agent = ExpectimaxAgent(weights=load_weights("balanced"), max_depth=2, collect_stats=True)
+    state = GameState(board=BOARD)
+    logger.log_step(move="INITIAL", reward=0, score=0, max_tile=8, empty_cells=state.empty_count(), board=state.board)
+    boards = []
+    for _ in range(5):
+        boards.append([row[:] for row in state.board])
+        move = agent.choose_move(state)
+        res = state.step(move)
+        logger.log_step(move=move, reward=res.reward, score=state.score, max_tile=state.max_tile(),
+                        empty_cells=state.empty_count(), board=state.board, move_time_s=0.004,
+                        search_depth=agent.last_depth, search_stats=agent.last_stats)
+    logger.save_log()
+
+    samples = samples_from_log(path)
+    assert len(samples) == 5
+    assert samples[0] == (2, *board_features(BOARD, len(GameState(board=BOARD).legal_moves())), 4.0)
+    assert [s[1] for s in samples] == [sum(v == 0 for row in b for v in row) for b in boards]
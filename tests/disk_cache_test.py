@@ -0,0 +1,81 @@
+# tests/disk_cache_test.py
+from src.agents.disk_cache import DiskTable, config_hash
+from src.agents.expectimax import ExpectimaxAgent
+from src.agents.greedy import GreedyAgent
+from src.agents.transposition import CHANCE_NODE, MAX_NODE
+from src.game.state import GameState
+from src.heuristics.weights_loader import load_weights
+
+
+# stała plansza startowa (new_game losuje z globalnego random)
+START = [[0, 0, 2, 0], [0, 0, 0, 0], [0, 2, 0, 0], [0, 0, 0, 0]]
+
+
+def play(agent, seed: int = 8, moves: int = 40):
+    state = GameState(seed=seed, board=START)
+    chosen = []
+    for _ in range(moves):
+        if state.is_terminal():
+            break
+        move = agent.choose_move(state)
+        chosen.append(move)
+        state.step(move)
+    return chosen
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = tmp_path / "cache.bin"
+    disk = DiskTable(path, size_mb=0.5)
+    disk.store(0xABCD, CHANCE_NODE, 3, 12.5)
+    generation = disk.generation
+    disk.close()
+
+    disk = DiskTable(path, size_mb=0.5)
+    assert disk.generation == generation + 1
+    assert disk.lookup(0xABCD, CHANCE_NODE, 2) == 12.5
+    assert disk.lookup(0xABCD, MAX_NODE, 2) is None
+    disk.close()
+
+    # inny rozmiar = nowy plik
+    disk = DiskTable(path, size_mb=1.0)
+    assert disk.lookup(0xABCD, CHANCE_NODE, 2) is None
+    disk.close()
+
+
+def test_warm_run_reuses_subtrees(tmp_path):
+    weights = load_weights("balanced")
+    disk = DiskTable(tmp_path / "cache.bin", size_mb=8.0)
+    try:
+        cold = ExpectimaxAgent(weights=weights, max_depth=3, disk_cache=disk)
+        moves = play(cold)
+
+        warm = ExpectimaxAgent(weights=weights, max_depth=3, disk_cache=disk)
+        assert play(warm) == moves
+        assert warm.tt_stats()["disk_hits"] > 0
+        # w ciepłym przebiegu korzenie przychodzą z dysku, więc liście prawie nie są oceniane
+        assert warm._evaluate_cached.cache_info().misses < cold._evaluate_cached.cache_info().misses / 10
+
+        # inne wagi to inne klucze
+        other = ExpectimaxAgent(weights=load_weights("aggressive"), max_depth=3, disk_cache=disk)
+        play(other, moves=5)
+        assert other.tt_stats()["disk_hits"] == 0
+    finally:
+        disk.close()
+
+
+def test_greedy_with_disk_cache_plays_the_same(tmp_path):
+    weights = load_weights("balanced")
+    disk = DiskTable(tmp_path / "cache.bin", size_mb=1.0)
+    try:
+        expected = play(GreedyAgent(weights=weights), moves=100)
+        assert play(GreedyAgent(weights=weights, disk_cache=disk), moves=100) == expected
+        assert play(GreedyAgent(weights=weights, disk_cache=disk), moves=100) == expected
+    finally:
+        disk.close()
+
+
+def test_config_hash_is_stable_and_weight_sensitive():
+    weights = load_weights("balanced")
+    assert config_hash(weights) == config_hash(dict(reversed(list(weights.items()))))
+    assert config_hash(weights) != config_hash(weights, min_prob=0.1)
+    assert config_hash(weights) != config_hash(load_weights("aggressive"))
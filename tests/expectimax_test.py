@@ -0,0 +1,129 @@
+# tests/expectimax_test.py
+import random
+
+from src.agents.expectimax import ExpectimaxAgent
+from src.game.state import GameState
+from src.heuristics.weights_loader import load_weights
+
+
+def seeded_state(seed: int) -> GameState:
+    # plansza startowa (logic.new_game) losowana jest z globalnego random, nie z seeda stanu
+    random.seed(seed)
+    return GameState(seed=seed)
+
+
+def midgame_state(seed: int = 2, moves: int = 30) -> GameState:
+    state = seeded_state(seed)
+    agent = ExpectimaxAgent(weights=load_weights("balanced"), max_depth=2)
+    for _ in range(moves):
+        state.step(agent.choose_move(state))
+    return state
+
+
+def test_no_time_limit_searches_full_depth():
+    agent = ExpectimaxAgent(weights=load_weights("balanced"), max_depth=3)
+    state = midgame_state()
+    assert agent.choose_move(state) in state.legal_moves()
+    assert agent.last_depth == 3
+
+
+def test_iterative_deepening_keeps_last_completed_iteration():
+    weights = load_weights("balanced")
+    state = midgame_state()
+
+    # limit za krótki na głębokość 8: ruch z płytszej, pełnej iteracji
+    agent = ExpectimaxAgent(weights=weights, max_depth=8, time_limit_ms=200)
+    move = agent.choose_move(state)
+    assert move in state.legal_moves()
+    assert 1 <= agent.last_depth < 8
+    assert agent.last_target_depth == 8
+
+
+def test_generous_time_limit_reaches_target_depth():
+    agent = ExpectimaxAgent(weights=load_weights("balanced"), max_depth=2, time_limit_ms=10_000)
+    state = midgame_state()
+    agent.choose_move(state)
+    assert agent.last_depth == 2
+
+
+def test_min_prob_one_cuts_below_first_spawn():
+    weights = load_weights("balanced")
+    state = midgame_state(seed=4)
+    # każdy węzeł losowy poniżej pierwszego spawnu ma p < 1, więc głębokość 5 = głębokość 3
+    pruned = ExpectimaxAgent(weights=weights, max_depth=5, min_prob=1.0)
+    shallow = ExpectimaxAgent(weights=weights, max_depth=3)
+    for _ in range(10):
+        move = shallow.choose_move(state)
+        assert pruned.choose_move(state) == move
+        state.step(move)
+
+
+def test_min_prob_reduces_expanded_nodes():
+    weights = load_weights("balanced")
+    state = midgame_state(seed=4)
+    full = ExpectimaxAgent(weights=weights, max_depth=5)
+    pruned = ExpectimaxAgent(weights=weights, max_depth=5, min_prob=0.05)
+    assert pruned.choose_move(state) in state.legal_moves()
+    full.choose_move(state)
+    assert pruned.tt_stats()["stores"] < full.tt_stats()["stores"]
+
+
+def test_parallel_root_matches_serial_search():
+    weights = load_weights("balanced")
+    serial = ExpectimaxAgent(weights=weights, max_depth=3, symmetry=False)
+    parallel = ExpectimaxAgent(weights=weights, max_depth=3, symmetry=False, workers=2)
+    state = seeded_state(5)
+
+    try:
+        for _ in range(15):
+            if state.is_terminal():
+                break
+            move = serial.choose_move(state)
+            assert parallel.choose_move(state) == move
+            state.step(move)
+        # proces główny zapisuje tylko korzenie; resztę wpisów dodały procesy robocze
+        filled = sum(1 for age in parallel.tt.ages if age)
+        assert filled > parallel.tt_stats()["stores"] > 0
+    finally:
+        parallel.close()
+
+
+def test_ponder_matches_plain_search_and_fills_table():
+    weights = load_weights("balanced")
+    plain = ExpectimaxAgent(weights=weights, max_depth=3, symmetry=False)
+    pondering = ExpectimaxAgent(weights=weights, max_depth=3, symmetry=False, ponder=True)
+    state = seeded_state(3)
+
+    try:
+        for i in range(10):
+            if state.is_terminal():
+                break
+            move = plain.choose_move(state)
+            assert pondering.choose_move(state) == move
+            state.step(move)
+            if i == 5:
+                # dokończony pondering: korzeń kolejnego ruchu jest już w tablicy
+                pondering._ponder_thread.join()
+                assert pondering.last_pondered == 2 * state.empty_count() + 2
+                hits = pondering.tt.hits
+                pondering.choose_move(state)
+                assert pondering.tt.hits - hits >= len(state.legal_moves())
+    finally:
+        pondering.close()
+    assert pondering._ponder_thread is None
+
+
+def test_ponder_is_interrupted_by_next_move():
+    weights = load_weights("balanced")
+    agent = ExpectimaxAgent(weights=weights, max_depth=6, time_limit_ms=50, search="inplace", ponder=True)
+    state = seeded_state(4)
+    move = agent.choose_move(state)
+    state.step(move)
+    thread = agent._ponder_thread
+    # pondering na głębokość 6 wszystkich spawnów trwa długo; przerwanie nie czeka na koniec
+    agent._stop_pondering()
+    assert agent._ponder_thread is None and not thread.is_alive()
+    assert agent.last_pondered < 2 * state.empty_count() + 2
+    assert agent.choose_move(state) in state.legal_moves()
+    assert agent.last_depth >= 1
+    agent.close()
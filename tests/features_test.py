@@ -0,0 +1,78 @@
+# tests/features_test.py
+import random
+
+import pytest
+
+from src.game import symmetry as sym
+from src.heuristics.evaluate import evaluate
+from src.heuristics.features import FEATURES, CompiledEvaluator, get_compiled_evaluator, register_feature
+from src.heuristics.table_eval import get_evaluator
+from src.heuristics.weights_loader import load_weights
+
+
+def random_board(rng: random.Random, size: int = 4):
+    vals = [0, 0, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048]
+    return [[rng.choice(vals) for _ in range(size)] for _ in range(size)]
+
+
+@pytest.mark.parametrize("preset", ["balanced", "aggressive", "conservative", "tuned_greedy_best_score"])
+def test_compiled_evaluator_matches_evaluate_exactly(preset):
+    weights = load_weights(preset)
+    compiled = get_compiled_evaluator(weights)
+    rng = random.Random(0)
+    for _ in range(500):
+        board = random_board(rng, size=rng.choice([3, 4, 5]))
+        assert compiled(board) == evaluate(board, weights)
+        # drugi raz: wszystkie linie już w pamięci
+        assert compiled(tuple(map(tuple, board))) == evaluate(board, weights)
+
+
+def test_extra_features_are_symmetry_invariant():
+    weights = dict(load_weights("balanced"), merges=40.0, snake=5.0)
+    compiled = CompiledEvaluator(weights)
+    assert compiled.names == ("empty", "mono", "smooth", "corner", "merges", "snake")
+
+    rng = random.Random(1)
+    for _ in range(100):
+        rows = tuple(map(tuple, random_board(rng)))
+        expected = compiled.features(rows)
+        for t in range(sym.N_TRANSFORMS):
+            assert compiled.features(sym.transform_rows(rows, t)) == pytest.approx(expected)
+
+
+def test_merges_feature_counts_slide_merges():
+    weights = {"merges": 1.0, "empty": 0.0, "mono": 0.0, "smooth": 0.0, "corner": 0.0}
+    compiled = CompiledEvaluator(weights)
+    board = [
+        [2, 2, 2, 2],
+        [2, 0, 2, 4],
+        [0, 0, 0, 0],
+        [8, 4, 8, 4],
+    ]
+    # wiersze: 2 + 1 + 0 + 0, kolumny: (2,2,8) 1, (2,4) 0, (2,2,8) 1, (2,4,4) 1
+    assert compiled.features(board) == [6]
+    assert compiled(board) == 6.0
+
+
+def test_registered_feature_is_picked_up_by_weight():
+    @register_feature("test_tiles", cols = False)
+    def tiles_line(line):
+        return len(line) - line.count(0)
+
+    try:
+        compiled = CompiledEvaluator({"empty": 1.0, "test_tiles": 2.0})
+        board = [[2, 0, 0, 0], [0, 4, 0, 0], [0, 0, 0, 0], [0, 0, 0, 8]]
+        assert compiled.features(board) == [13, 3]
+        assert compiled(board) == 13.0 + 2.0 * 3
+    finally:
+        del FEATURES["test_tiles"]
+
+
+def test_unknown_weight_key_is_rejected():
+    with pytest.raises(ValueError):
+        CompiledEvaluator({"empty": 1.0, "no_such_feature": 1.0})
+
+
+def test_fused_eval_mode():
+    board = [[2, 4, 0, 0], [0, 0, 8, 0], [0, 0, 0, 0], [16, 0, 0, 2]]
+    assert get_evaluator(None, "fused")(board) == evaluate(board)
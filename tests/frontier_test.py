@@ -0,0 +1,74 @@
+# tests/frontier_test.py
+import math
+
+import pytest
+
+from src.agents.expectimax import ExpectimaxAgent
+from src.game.state import GameState
+from src.heuristics.weights_loader import load_weights
+
+BOARDS = [
+    [[2, 4, 8, 0], [0, 2, 0, 0], [0, 0, 4, 0], [2, 0, 0, 0]],
+    [[128, 64, 16, 4], [32, 16, 8, 2], [4, 8, 2, 0], [2, 0, 0, 0]],
+]
+
+
+def root_values(agent: ExpectimaxAgent, board, depth: int):
+    state = GameState(board=board)
+    order = agent._root_order(state.successors())
+    return agent._search_root(state, order, depth)
+
+
+@pytest.mark.parametrize("board", BOARDS)
+@pytest.mark.parametrize("depth", [2, 3, 4, 5])
+def test_frontier_matches_recursive_search(board, depth):
+    weights = load_weights("balanced")
+    reference = root_values(ExpectimaxAgent(weights=weights, symmetry=False), board, depth)
+
+    for plies in (1, 2, 3):
+        agent = ExpectimaxAgent(weights=weights, symmetry=False, search="frontier", frontier_plies=plies)
+        values = root_values(agent, board, depth)
+        assert all(math.isclose(a, b, rel_tol=1e-9) for a, b in zip(values, reference))
+
+
+def test_frontier_with_sampling_matches_recursive_search():
+    weights = load_weights("balanced")
+    options = dict(weights=weights, symmetry=False, sample_threshold=4, sample_budget=5, sample_stratify="both")
+    reference = root_values(ExpectimaxAgent(**options), BOARDS[0], 3)
+
+    agent = ExpectimaxAgent(**options, search="frontier")
+    # drugi poziom spawnów nie jest próbkowany, więc frontier ogranicza się do 2 półruchów
+    assert agent.frontier_plies == 2
+    values = root_values(agent, BOARDS[0], 3)
+    assert all(math.isclose(a, b, rel_tol=1e-9) for a, b in zip(values, reference))
+
+
+def test_frontier_leaves_are_counted_in_stats():
+    agent = ExpectimaxAgent(
+        weights=load_weights("balanced"), max_depth=4, search="frontier", collect_stats=True
+    )
+    agent.choose_move(GameState(board=BOARDS[0]))
+    stats = agent.last_stats
+    # cały ruch to węzły losowe korzenia rozwinięte wszerz
+    assert stats["max_nodes"] == 0
+    assert stats["leaf_evals"] > 100 * stats["chance_nodes"]
+
+
+def test_frontier_rejects_extra_features():
+    with pytest.raises(ValueError):
+        ExpectimaxAgent(weights={"empty": 1.0, "mono": 1.0, "smooth": 0.1, "corner": 1.0, "merges": 2.0},
+                        search="frontier")
+
+
+def test_frontier_search_runs_in_worker_processes():
+    weights = load_weights("balanced")
+    reference = root_values(ExpectimaxAgent(weights=weights, symmetry=False), BOARDS[0], 4)
+
+    agent = ExpectimaxAgent(weights=weights, symmetry=False, search="frontier", frontier_plies=2, workers=2)
+    try:
+        # procesy robocze tworzą agenta z tej konfiguracji
+        assert agent._config["search"] == "frontier" and agent._config["frontier_plies"] == 2
+        values = root_values(agent, BOARDS[0], 4)
+        assert all(math.isclose(a, b, rel_tol=1e-9) for a, b in zip(values, reference))
+    finally:
+        agent.close()
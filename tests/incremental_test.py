@@ -0,0 +1,64 @@
+# tests/incremental_test.py
+import random
+
+import pytest
+
+from src.agents.expectimax import ExpectimaxAgent
+from src.game.state import GameState
+from src.heuristics.evaluate import evaluate
+from src.heuristics.incremental import feature_breakdown
+from src.heuristics.weights_loader import load_weights
+
+
+def random_board(rng: random.Random, size: int = 4):
+    vals = [0, 0, 0, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
+    return [[rng.choice(vals) for _ in range(size)] for _ in range(size)]
+
+
+@pytest.mark.parametrize("preset", ["balanced", "aggressive", "conservative", "tuned_greedy_best_score"])
+def test_spawn_children_match_full_evaluation(preset):
+    weights = load_weights(preset)
+    rng = random.Random(0)
+    for _ in range(200):
+        board = random_board(rng, size=rng.choice([3, 4, 5]))
+        parent = feature_breakdown(board)
+        assert parent.score(weights) == evaluate(board, weights)
+
+        for r, row in enumerate(board):
+            for c, v in enumerate(row):
+                if v:
+                    continue
+                for tile in (2, 4):
+                    child = [list(row) for row in board]
+                    child[r][c] = tile
+                    expected = evaluate(child, weights)
+                    assert parent.score_with_tile(r, c, tile, weights) == expected
+                    assert parent.with_tile(r, c, tile).score(weights) == expected
+
+
+def test_with_tile_chains_and_overwrites_max():
+    board = [
+        [0, 2, 0, 0],
+        [0, 0, 0, 0],
+        [0, 0, 64, 0],
+        [0, 0, 0, 0],
+    ]
+    bd = feature_breakdown(board).with_tile(0, 0, 4).with_tile(3, 3, 2).with_tile(2, 2, 8)
+    board[0][0], board[3][3], board[2][2] = 4, 2, 8
+    assert bd.board == tuple(map(tuple, board))
+    assert bd.max_tile == 8
+    assert bd.score() == evaluate(board)
+
+
+def test_incremental_search_matches_full_search():
+    weights = load_weights("balanced")
+    full = ExpectimaxAgent(weights=weights, max_depth=2, incremental_eval=False)
+    inc = ExpectimaxAgent(weights=weights, max_depth=2)
+    state = GameState(seed=4)
+
+    for _ in range(60):
+        if state.is_terminal():
+            break
+        move = full.choose_move(state)
+        assert inc.choose_move(state) == move
+        state.step(move)
@@ -108,4 +108,63 @@ def test_terminal_state_not_over():
     ]
     state = GameState(board=board, seed=0)
     assert state.is_terminal() is False
-    assert logic.game_state(state.board) == 'not over'
\ No newline at end of file
+    assert logic.game_state(state.board) == 'not over'
+
+# --- Testy successors ---
+def test_successors_match_step():
+    board = [
+        [2, 2, 0, 4],
+        [0, 4, 0, 4],
+        [8, 0, 0, 0],
+        [0, 0, 2, 0],
+    ]
+    state = GameState(board=board, seed=0)
+    successors = state.successors()
+    assert [m for m, _, _ in successors] == state.legal_moves()
+
+    for move, after, gain in successors:
+        ns = state.clone()
+        res = ns.step(move, spawn=False)
+        assert after == ns.board
+        assert gain == res.reward
+    assert state.board == board
+
+
+# --- Testy cache pochodnych stanu ---
+def test_cached_derived_state_matches_full_scan():
+    import random
+
+    rng = random.Random(3)
+    vals = [0, 0, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048]
+    for _ in range(300):
+        board = [[rng.choice(vals) for _ in range(4)] for _ in range(4)]
+        state = GameState(board=board, seed=0)
+        assert state.is_terminal() == (logic.game_state(board) in ("win", "lose"))
+        assert state.max_tile() == max(max(row) for row in board)
+        assert state.empty_count() == sum(row.count(0) for row in board)
+
+        mask = state.legal_mask()
+        assert [m for i, m in enumerate(ALLOWED_MOVES) if mask >> i & 1] == state.legal_moves()
+        assert (mask == 0) == state.is_terminal()
+
+
+def test_cache_invalidated_after_step():
+    board = [
+        [2, 2, 0, 0],
+        [0, 0, 0, 0],
+        [0, 0, 0, 0],
+        [0, 0, 0, 0],
+    ]
+    state = GameState(board=board, seed=0)
+    assert state.empty_count() == 14
+    assert "left" in state.legal_moves()
+
+    state.step("left", spawn=False)
+    assert state.board[0][:2] == [4, 0]
+    assert state.empty_count() == 15
+    assert state.max_tile() == 4
+    assert "left" not in state.legal_moves()
+
+    state.step("right", spawn=True)
+    assert state.empty_count() == 14
+    assert state.legal_moves() == GameState(board=state.board).legal_moves()
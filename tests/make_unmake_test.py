@@ -0,0 +1,77 @@
+# tests/make_unmake_test.py
+import random
+
+import pytest
+
+from src.agents.expectimax import ExpectimaxAgent
+from src.game.state import ALLOWED_MOVES, BitboardGameState, GameState
+from src.heuristics.weights_loader import load_weights
+
+
+def random_board(rng: random.Random):
+    vals = [0, 0, 0, 2, 4, 8, 16, 32, 64, 128]
+    return [[rng.choice(vals) for _ in range(4)] for _ in range(4)]
+
+
+@pytest.mark.parametrize("cls", [GameState, BitboardGameState])
+def test_apply_move_matches_successors_and_undo_restores(cls):
+    rng = random.Random(0)
+    for _ in range(300):
+        state = cls(board=random_board(rng), score=10)
+        before = state.board
+        expected = {m: (board, gain) for m, board, gain in state.successors()}
+
+        for move in ALLOWED_MOVES:
+            moved = state.apply_move(move)
+            assert moved == (move in expected)
+            if moved:
+                assert state.board == expected[move][0]
+                assert state.score == 10 + expected[move][1]
+                state.undo()
+            assert state.board == before
+            assert state.score == 10
+            assert state.undo_depth() == 0
+
+        # pochodne wracają razem z planszą
+        assert {m for m, _, _ in state.successors()} == set(expected)
+
+    with pytest.raises(ValueError):
+        state.apply_move("diagonal")
+    assert state.undo_depth() == 0
+
+
+@pytest.mark.parametrize("cls", [GameState, BitboardGameState])
+def test_place_and_remove_tile_nest(cls):
+    state = cls(board=[[2, 0, 0, 0], [0] * 4, [0] * 4, [0, 0, 0, 2]], seed=0)
+    assert state.apply_move("left")
+    state.place_tile(0, 1, 4)
+    state.place_tile(2, 2, 2)
+    assert state.board[0][:2] == [2, 4] and state.board[2][2] == 2
+    assert state.empty_count() == 12
+
+    with pytest.raises(ValueError):
+        state.remove_tile(0, 1)
+    state.remove_tile(2, 2)
+    state.remove_tile(0, 1)
+    state.undo()
+    assert state.board == [[2, 0, 0, 0], [0] * 4, [0] * 4, [0, 0, 0, 2]]
+    assert state.empty_count() == 14
+
+    with pytest.raises(IndexError):
+        state.undo()
+
+
+def test_inplace_search_matches_copy_search():
+    weights = load_weights("balanced")
+    copy_agent = ExpectimaxAgent(weights=weights, max_depth=3, symmetry=False)
+    inplace_agent = ExpectimaxAgent(weights=weights, max_depth=3, symmetry=False, search="inplace")
+    state = GameState(seed=6)
+
+    for _ in range(25):
+        if state.is_terminal():
+            break
+        board = state.board
+        move = copy_agent.choose_move(state)
+        assert inplace_agent.choose_move(state) == move
+        assert state.board == board and state.undo_depth() == 0
+        state.step(move)
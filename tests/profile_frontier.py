@@ -0,0 +1,47 @@
+import time
+
+from src.agents.expectimax import ExpectimaxAgent
+from src.game.state import GameState
+from src.heuristics.weights_loader import load_weights
+from tests.profile_pruning import sample_positions
+
+# benchmark: ostatnie półruchy expectimaxa rozwijane wszerz i oceniane wektorowo
+# (search="frontier") wobec rekurencji z ocenami pojedynczych liści (search="copy")
+
+CONFIGS = [("copy", 3), ("frontier", 1), ("frontier", 2), ("frontier", 3)]
+
+
+def run(positions, weights, search: str, plies: int, max_depth: int):
+    moves = []
+    start = time.perf_counter()
+    for board in positions:
+        # świeże cache'e na pozycję: porównujemy samo drzewo
+        agent = ExpectimaxAgent(
+            weights=weights, max_depth=max_depth, symmetry=False, search=search, frontier_plies=plies
+        )
+        moves.append(agent.choose_move(GameState(board=board)))
+    return time.perf_counter() - start, moves
+
+
+def main():
+    positions = sample_positions()
+    weights = load_weights("balanced")
+    print(f"{len(positions)} positions")
+
+    for depth in (3, 4, 5, 6):
+        print(f"\ndepth {depth}")
+        base = None
+        for search, plies in CONFIGS:
+            elapsed, moves = run(positions, weights, search, plies, depth)
+            if base is None:
+                base = (elapsed, moves)
+            same = sum(a == b for a, b in zip(moves, base[1]))
+            label = search if search == "copy" else f"{search}/{plies}"
+            print(
+                f"  {label:<11} {elapsed / len(positions) * 1000:8.1f} ms/move  "
+                f"({base[0] / elapsed:4.1f}x)  same move {same}/{len(positions)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
 import timeit
 import random
 
-from src.heuristics.evaluate import evaluate
+from src.game import bitboard as bb
+import numpy as np
+
+from src.heuristics.evaluate import evaluate, evaluate_batch
+from src.heuristics.features import get_compiled_evaluator
+from src.heuristics.table_eval import get_table_evaluator
 
 # utwórz losową tablicę 4x4 z wartościami 0–1024
 def random_board():
@@ -16,8 +21,38 @@ def main():
         for b in boards:
             evaluate(b)
 
-    t = timeit.timeit(run, number=1)
+    t = min(timeit.repeat(run, number=1, repeat=5))
     print(f"1000 evaluations took: {t:.4f} s | {t/1000:.6f} s per state")
 
+    table = get_table_evaluator()  # budowa tablic poza pomiarem
+    packed = [bb.pack_board(b) for b in boards]
+
+    def run_table():
+        for p in packed:
+            table.evaluate_bits(p)
+
+    t_table = min(timeit.repeat(run_table, number=1, repeat=5))
+    print(f"1000 table evaluations took: {t_table:.4f} s | {t_table/1000:.6f} s per state "
+          f"({t / t_table:.1f}x faster)")
+
+    fused = get_compiled_evaluator()
+
+    def run_fused():
+        for b in boards:
+            fused(b)
+
+    t_fused = min(timeit.repeat(run_fused, number=1, repeat=5))
+    print(f"1000 fused evaluations took: {t_fused:.4f} s | {t_fused/1000:.6f} s per state "
+          f"({t / t_fused:.1f}x faster)")
+
+    stacked = np.array(boards)
+
+    def run_batch():
+        evaluate_batch(stacked)
+
+    t_batch = min(timeit.repeat(run_batch, number=1, repeat=5))
+    print(f"1000 batch evaluations took: {t_batch:.4f} s | {t_batch/1000:.6f} s per state "
+          f"({t / t_batch:.1f}x faster)")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,81 @@
+import time
+
+from src.agents.expectimax import PRUNING_MODES, ExpectimaxAgent
+from src.game.state import GameState
+from src.heuristics.weights_loader import load_weights
+
+# benchmark: węzły expectimaxa z odcinaniem star1/star2 i bez, przy tej samej głębokości
+
+
+def sample_positions(num_games: int = 3, moves_per_game: int = 120, every: int = 8):
+    agent = ExpectimaxAgent(weights=load_weights("balanced"), max_depth=2)
+    positions = []
+    for seed in range(num_games):
+        state = GameState(seed=seed)
+        for i in range(moves_per_game):
+            if state.is_terminal():
+                break
+            if i % every == 0:
+                positions.append([row[:] for row in state.board])
+            state.step(agent.choose_move(state))
+    return positions
+
+
+def count_nodes(agent: ExpectimaxAgent):
+    """Licznik liści: opakowuje cache ocen i przyrostowe liście węzłów losowych."""
+    counter = {"leaves": 0}
+    evaluate_cached = agent._evaluate_cached
+    chance_leaf_value = agent._chance_leaf_value
+
+    def counted_eval(key):
+        counter["leaves"] += 1
+        return evaluate_cached(key)
+
+    def counted_leaf(board, empties):
+        counter["leaves"] += 2 * len(empties)
+        return chance_leaf_value(board, empties)
+
+    agent._evaluate_cached = counted_eval
+    agent._chance_leaf_value = counted_leaf
+    return counter
+
+
+def run(positions, weights, pruning: str, max_depth: int):
+    nodes = 0
+    leaves = 0
+    moves = []
+    start = time.perf_counter()
+    for board in positions:
+        # świeża tablica na pozycję: porównujemy samo drzewo, bez trafień z poprzednich ruchów
+        agent = ExpectimaxAgent(weights=weights, max_depth=max_depth, symmetry=False, pruning=pruning)
+        counter = count_nodes(agent)
+        moves.append(agent.choose_move(GameState(board=board)))
+        tt = agent.tt_stats()
+        nodes += tt["lookups"] - tt["hits"]
+        leaves += counter["leaves"]
+    return nodes, leaves, time.perf_counter() - start, moves
+
+
+def main():
+    positions = sample_positions()
+    print(f"{len(positions)} positions")
+
+    for preset in ("balanced", "aggressive"):
+        weights = load_weights(preset)
+        for depth in (3, 4, 5):
+            print(f"\n{preset}, depth {depth}")
+            base = None
+            for pruning in PRUNING_MODES:
+                nodes, leaves, elapsed, moves = run(positions, weights, pruning, depth)
+                if base is None:
+                    base = (nodes, leaves, elapsed, moves)
+                same = sum(a == b for a, b in zip(moves, base[3]))
+                print(
+                    f"  {pruning:<6} inner={nodes:<8d} ({nodes / base[0]:.0%})  leaves={leaves:<9d} "
+                    f"({leaves / base[1]:.0%})  {elapsed / len(positions) * 1000:7.1f} ms/move  "
+                    f"same move {same}/{len(positions)}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import copy
+import random
+import timeit
+import tracemalloc
+
+from src.game.logic import game_state
+from src.game.state import BitboardGameState, GameState
+
+# mikro-benchmark: koszt tworzenia węzła przeszukiwania (klon / stan z krotki)
+
+BOARD = (
+    (2, 4, 0, 8),
+    (16, 0, 2, 0),
+    (4, 32, 8, 2),
+    (0, 2, 64, 4),
+)
+
+
+def legacy_node(board_tuple):
+    # dawna ścieżka GameState.__init__: deepcopy planszy + nowy Random + pełne game_state()
+    board = copy.deepcopy([list(row) for row in board_tuple])
+    rng = random.Random(None)
+    done = game_state(board) in ("win", "lose")
+    return board, rng, done
+
+
+def measure(name, fn, number=20000):
+    t = timeit.timeit(fn, number=number)
+
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    keep = [fn() for _ in range(1000)]
+    snapshot_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(s.size_diff for s in snapshot_after.compare_to(snapshot_before, "filename"))
+    del keep
+
+    print(f"{name:<32} {t / number * 1e6:8.2f} us/node | {size / 1000:8.0f} B/node")
+
+
+def main():
+    state = GameState(board=[list(r) for r in BOARD])
+    bstate = BitboardGameState(board=[list(r) for r in BOARD])
+
+    measure("legacy node (deepcopy+rng+done)", lambda: legacy_node(BOARD))
+    measure("GameState.from_rows", lambda: GameState.from_rows(BOARD))
+    measure("GameState.clone", state.clone)
+    measure("BitboardGameState.clone", bstate.clone)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import random
+import time
+
+from src.agents.expectimax import ExpectimaxAgent
+from src.agents.greedy import GreedyAgent
+from src.game.state import GameState
+
+# benchmark: trafienia cache'y i liczba rozwiniętych węzłów expectimaxa z/bez symetrii
+
+
+def early_positions(num_games: int = 5, moves_per_game: int = 30):
+    positions = []
+    greedy = GreedyAgent()
+    for seed in range(num_games):
+        random.seed(seed)  # logic.new_game korzysta z globalnego random
+        state = GameState(seed=seed)
+        for _ in range(moves_per_game):
+            if state.is_terminal():
+                break
+            positions.append([row[:] for row in state.board])
+            state.step(greedy.choose_move(state))
+    return positions
+
+
+def run(positions, symmetry: bool, max_depth: int = 3):
+    agent = ExpectimaxAgent(max_depth=max_depth, symmetry=symmetry)
+    moves = []
+
+    start = time.perf_counter()
+    for board in positions:
+        moves.append(agent.choose_move(GameState(board=board)))
+    elapsed = time.perf_counter() - start
+    return agent.cache_stats(), elapsed, moves
+
+
+def main():
+    positions = early_positions()
+    print(f"{len(positions)} early-game positions, depth 3")
+
+    results = {}
+    for symmetry in (False, True):
+        totals, elapsed, moves = run(positions, symmetry)
+        results[symmetry] = moves
+        print(f"\nsymmetry={symmetry}: {elapsed:.2f} s ({elapsed / len(positions) * 1000:.1f} ms/move)")
+        for name, (hits, misses) in totals.items():
+            rate = hits / (hits + misses) if hits + misses else 0.0
+            print(f"  {name:<7} hits={hits:<8d} misses(nodes)={misses:<8d} hit rate={rate:.1%}")
+
+    same = sum(a == b for a, b in zip(results[False], results[True]))
+    print(f"\nsame move chosen in {same}/{len(positions)} positions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# tests/pruning_test.py
+import random
+
+import pytest
+
+from src.agents.expectimax import ExpectimaxAgent
+from src.game.state import GameState
+from src.heuristics.evaluate import evaluate, evaluate_bounds
+from src.heuristics.weights_loader import load_weights
+
+
+@pytest.mark.parametrize("preset", ["balanced", "aggressive", "conservative", "tuned_greedy_best_score"])
+def test_bounds_hold_for_random_boards(preset):
+    weights = load_weights(preset)
+    rng = random.Random(0)
+    for size in (3, 4, 5):
+        for max_exp in (3, 8, 15):
+            lo, hi = evaluate_bounds(weights, size=size, max_exp=max_exp)
+            tiles = [0] + [1 << k for k in range(1, max_exp + 1)]
+            for _ in range(300):
+                board = [[rng.choice(tiles) for _ in range(size)] for _ in range(size)]
+                board[rng.randrange(size)][rng.randrange(size)] = rng.choice(tiles[1:])
+                assert lo <= evaluate(board, weights) <= hi
+
+
+@pytest.mark.parametrize("pruning", ["star1", "star2"])
+def test_pruned_search_picks_the_same_moves(pruning):
+    weights = load_weights("balanced")
+    full = ExpectimaxAgent(weights=weights, max_depth=3, symmetry=False)
+    pruned = ExpectimaxAgent(weights=weights, max_depth=3, symmetry=False, pruning=pruning)
+    state = GameState(seed=6)
+
+    for _ in range(40):
+        if state.is_terminal():
+            break
+        move = full.choose_move(state)
+        assert pruned.choose_move(state) == move
+        state.step(move)
+
+
+def test_pruning_needs_bounds_for_every_feature():
+    with pytest.raises(ValueError):
+        ExpectimaxAgent(weights={**load_weights("balanced"), "snake": 10.0}, eval_mode="fused", pruning="star1")
+    with pytest.raises(ValueError):
+        ExpectimaxAgent(search="inplace", pruning="star1")
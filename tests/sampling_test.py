@@ -0,0 +1,63 @@
+# tests/sampling_test.py
+import random
+
+import pytest
+
+from src.agents.expectimax import ExpectimaxAgent
+from src.agents.sampling import max_tile_position, sample_spawns
+from src.game.state import GameState
+from src.heuristics.weights_loader import load_weights
+
+EMPTIES = [(r, c) for r in range(4) for c in range(4) if (r, c) not in {(0, 0), (1, 2), (3, 3)}]
+
+
+def value_of(r, c, v):
+    # dowolna funkcja wyniku spawnu; estymator ma być nieobciążony dla każdej
+    return (r * 4 + c) ** 1.5 + (50.0 if v == 4 else 0.0)
+
+
+def exact_expectation():
+    n = len(EMPTIES)
+    return sum(0.9 * value_of(r, c, 2) + 0.1 * value_of(r, c, 4) for r, c in EMPTIES) / n
+
+
+@pytest.mark.parametrize("stratify_value,stratify_distance", [(False, False), (True, False), (False, True), (True, True)])
+def test_sample_is_unbiased(stratify_value, stratify_distance):
+    rng = random.Random(0)
+    total = 0.0
+    trials = 4000
+    for _ in range(trials):
+        outcomes = sample_spawns(EMPTIES, 6, rng, stratify_value, stratify_distance, anchor=(0, 0))
+        assert sum(w for w, _, _, _ in outcomes) == pytest.approx(1.0)
+        total += sum(w * value_of(r, c, v) for w, r, c, v in outcomes)
+    assert total / trials == pytest.approx(exact_expectation(), rel=0.02)
+
+
+def test_sample_is_reproducible_and_respects_budget():
+    a = sample_spawns(EMPTIES, 8, random.Random(5), True, True, anchor=(0, 0))
+    b = sample_spawns(EMPTIES, 8, random.Random(5), True, True, anchor=(0, 0))
+    assert a == b
+    assert len(sample_spawns(EMPTIES, 8, random.Random(5))) == 8
+    assert all((r, c) in EMPTIES for _, r, c, _ in a)
+
+
+def test_max_tile_position():
+    assert max_tile_position([[2, 0], [0, 8]]) == (1, 1)
+
+
+def test_sampled_search_scales_with_budget():
+    weights = load_weights("balanced")
+    state = GameState(board=[[2, 4, 0, 0], [0, 0, 0, 0], [0, 2, 0, 0], [0, 0, 0, 8]], seed=0)
+
+    stores = []
+    for budget in (4, 8):
+        agent = ExpectimaxAgent(weights=weights, max_depth=5, sample_threshold=4, sample_budget=budget, sample_seed=1)
+        move = agent.choose_move(state)
+        assert move in state.legal_moves()
+        again = ExpectimaxAgent(weights=weights, max_depth=5, sample_threshold=4, sample_budget=budget, sample_seed=1)
+        assert again.choose_move(state) == move
+        stores.append(agent.tt_stats()["stores"])
+
+    full = ExpectimaxAgent(weights=weights, max_depth=5)
+    full.choose_move(state)
+    assert stores[0] < stores[1] < full.tt_stats()["stores"]
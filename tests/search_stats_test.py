@@ -0,0 +1,74 @@
+# tests/search_stats_test.py
+from src.agents.expectimax import ExpectimaxAgent
+from src.game.state import GameState
+from src.heuristics.weights_loader import load_weights
+from src.scripts.run_experiment import summarize_search_stats
+
+BOARD = [
+    [2, 4, 8, 0],
+    [0, 2, 0, 0],
+    [0, 0, 4, 0],
+    [2, 0, 0, 0],
+]
+
+
+def test_disabled_stats_leave_search_untouched():
+    agent = ExpectimaxAgent(weights=load_weights("balanced"), max_depth=2)
+    agent.choose_move(GameState(board=BOARD))
+    assert agent.last_stats is None
+    assert "_max_value" not in vars(agent)
+
+
+def test_stats_count_nodes_without_changing_moves():
+    weights = load_weights("balanced")
+    plain = ExpectimaxAgent(weights=weights, max_depth=3, symmetry=False)
+    counted = ExpectimaxAgent(weights=weights, max_depth=3, symmetry=False, collect_stats=True)
+    state = GameState(board=BOARD)
+
+    move = plain.choose_move(state)
+    assert counted.choose_move(state) == move
+    stats = counted.last_stats
+    assert stats["depth"] == 3
+    # korzeń: jeden węzeł losowy na legalny ruch, pod nimi 2 x puste pola węzłów MAX
+    assert stats["chance_nodes_by_depth"][1] == len(state.legal_moves())
+    assert stats["max_nodes_by_depth"][2] > stats["chance_nodes_by_depth"][1]
+    assert stats["leaf_evals"] > stats["max_nodes"] > 0
+    assert stats["tt_hits"] + stats["tt_misses"] > 0 and stats["timeouts"] == 0
+    assert stats["ebf"] > 1.0
+
+    # kolejne wywołanie na tej samej planszy: korzeń prosto z tablicy transpozycji
+    counted.choose_move(state)
+    again = counted.last_stats
+    assert again["chance_nodes"] == again["tt_hits"] == len(state.legal_moves())
+    assert again["max_nodes"] == 0
+
+
+def test_timeouts_and_summary():
+    agent = ExpectimaxAgent(
+        weights=load_weights("balanced"), max_depth=8, time_limit_ms=200, collect_stats=True
+    )
+    state = GameState(board=BOARD)
+    agent.choose_move(state)
+    stats = agent.last_stats
+    # głębokość 8 nie mieści się w limicie, głębokość 1 liczona jest zawsze
+    assert stats["timeouts"] == 1 and 1 <= stats["depth"] < 8
+
+    summary = summarize_search_stats([stats, stats])
+    assert summary["timeouts"] == 2
+    assert summary["avg_max_nodes"] == stats["max_nodes"]
+
+
+def test_star2_probes_are_counted_apart_from_max_nodes():
+    weights = load_weights("balanced")
+    # sondy Star2 są tylko tam, gdzie ruchy dziecka prowadzą do liści
+    options = dict(weights=weights, max_depth=3, symmetry=False, collect_stats=True)
+    plain = ExpectimaxAgent(**options)
+    star1 = ExpectimaxAgent(**options, pruning="star1")
+    star2 = ExpectimaxAgent(**options, pruning="star2")
+    state = GameState(board=BOARD)
+
+    assert plain.choose_move(state) == star1.choose_move(state) == star2.choose_move(state)
+    assert star1.last_stats["probe_nodes"] == 0
+    assert star2.last_stats["probe_nodes"] > 0
+    # odcinanie nie dodaje węzłów MAX - sondy ich nie podbijają
+    assert star2.last_stats["max_nodes"] <= plain.last_stats["max_nodes"]
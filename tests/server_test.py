@@ -0,0 +1,114 @@
+# tests/server_test.py
+import asyncio
+import json
+
+from src.agents.greedy import GreedyAgent
+from src.agents.server import AgentServer
+from src.game.state import GameState
+from src.heuristics.weights_loader import load_weights
+from src.scripts.load_test import run_load_test
+
+BOARDS = [
+    [[2, 4, 8, 0], [0, 2, 0, 0], [0, 0, 4, 0], [2, 0, 0, 0]],
+    [[128, 64, 16, 4], [32, 16, 8, 2], [4, 8, 2, 0], [2, 0, 0, 0]],
+    [[0, 0, 0, 2], [0, 0, 2, 4], [0, 2, 4, 8], [2, 4, 8, 16]],
+]
+
+
+def with_server(test, **options):
+    async def run():
+        server = AgentServer(port=0, weights=load_weights("balanced"), **options)
+        await server.start()
+        try:
+            return await test(server)
+        finally:
+            await server.close()
+
+    return asyncio.run(run())
+
+
+async def exchange(port, requests):
+    """Wysyła wszystkie żądania naraz jednym połączeniem; odpowiedzi według "id"."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"".join(json.dumps(r).encode() + b"\n" for r in requests))
+    await writer.drain()
+    responses = {}
+    for _ in requests:
+        response = json.loads(await reader.readline())
+        responses[response["id"]] = response
+    writer.close()
+    return responses
+
+
+def test_concurrent_greedy_requests_share_a_batch():
+    greedy = GreedyAgent(weights=load_weights("balanced"))
+    requests = [{"id": i, "agent": "greedy", "board": board} for i, board in enumerate(BOARDS * 4)]
+
+    async def test(server):
+        responses = await exchange(server.port, requests)
+        return responses, server.stats()
+
+    responses, stats = with_server(test, batch_window_ms=20.0)
+    for r in requests:
+        assert responses[r["id"]]["move"] == greedy.choose_move(GameState(board=r["board"]))
+    assert stats["greedy_batches"] < len(requests)
+    assert max(r["stats"]["batch_size"] for r in responses.values()) > 1
+
+
+def test_expectimax_sessions_keep_their_tables():
+    async def test(server):
+        first = await exchange(server.port, [{"id": 1, "agent": "expectimax", "session": "a", "board": BOARDS[0]}])
+        # ta sama pozycja w tej samej sesji: korzeń prosto z tablicy transpozycji
+        again = await exchange(server.port, [{"id": 2, "agent": "expectimax", "session": "a", "board": BOARDS[0]}])
+        other = await exchange(server.port, [{"id": 3, "agent": "expectimax", "session": "b", "board": BOARDS[0]}])
+        closed = await exchange(server.port, [{"id": 4, "op": "close", "session": "a"}])
+        return first[1], again[2], other[3], closed[4], server.stats()
+
+    first, again, other, closed, stats = with_server(test, expectimax_options={"max_depth": 3})
+    assert first["move"] == again["move"] == other["move"]
+    assert again["stats"]["max_nodes"] == 0 and again["stats"]["tt_hits"] > 0
+    assert other["stats"]["max_nodes"] == first["stats"]["max_nodes"] > 0
+    assert closed["closed"] and stats["sessions"] == 1
+
+
+def test_bad_request_reports_error():
+    async def test(server):
+        return await exchange(server.port, [{"id": 1, "agent": "minimax", "board": BOARDS[0]}, {"id": 2}])
+
+    responses = with_server(test)
+    assert "minimax" in responses[1]["error"]
+    assert "board" in responses[2]["error"]
+
+
+def test_invalid_greedy_boards_fail_alone():
+    greedy = GreedyAgent(weights=load_weights("balanced"))
+    invalid = [
+        [[2, 4, 8], [0, 2, 0, 0], [0, 0, 4, 0], [2, 0, 0, 0]],
+        [[3, 0, 0, 0], [0, 2, 0, 0], [0, 0, 4, 0], [2, 0, 0, 0]],
+        [[65536, 0, 0, 0], [0, 2, 0, 0], [0, 0, 4, 0], [2, 0, 0, 0]],
+        [[2.0, 0, 0, 0], [0, 2, 0, 0], [0, 0, 4, 0], [2, 0, 0, 0]],
+    ]
+    boards = BOARDS + invalid
+    requests = [{"id": i, "agent": "greedy", "board": board} for i, board in enumerate(boards)]
+
+    async def test(server):
+        responses = await exchange(server.port, requests)
+        # otwarte połączenie przy zamykaniu serwera
+        await asyncio.open_connection("127.0.0.1", server.port)
+        return responses
+
+    responses = with_server(test, batch_window_ms=20.0)
+    for i, board in enumerate(BOARDS):
+        assert responses[i]["move"] == greedy.choose_move(GameState(board=board))
+    for i in range(len(BOARDS), len(boards)):
+        assert responses[i]["error"].startswith("ValueError")
+
+
+def test_load_test_reports_latency():
+    async def test(server):
+        return await run_load_test(port=server.port, agent="greedy", clients=4, requests_per_client=20)
+
+    summary = with_server(test, batch_window_ms=1.0)
+    assert summary["requests"] == 80 and summary["errors"] == 0
+    assert 0 < summary["p50_ms"] <= summary["p99_ms"] <= summary["max_ms"]
+    assert summary["throughput_rps"] > 0
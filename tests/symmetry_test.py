@@ -0,0 +1,64 @@
+# tests/symmetry_test.py
+import random
+
+from src.game import bitboard as bb
+from src.game import symmetry as sym
+from src.game.state import ALLOWED_MOVES
+from src.heuristics.evaluate import evaluate
+
+
+def random_rows(rng: random.Random, size: int = 4):
+    vals = [0, 0, 2, 4, 8, 16, 32, 64, 128, 256]
+    return tuple(tuple(rng.choice(vals) for _ in range(size)) for _ in range(size))
+
+
+def test_packed_transforms_match_tuple_transforms():
+    rng = random.Random(0)
+    for _ in range(100):
+        rows = random_rows(rng)
+        images = sym.all_transforms(bb.pack_board(rows))
+        for t in range(sym.N_TRANSFORMS):
+            expected = sym.transform_rows(rows, t)
+            assert tuple(map(tuple, bb.unpack_board(images[t]))) == expected
+            assert sym.apply_transform(bb.pack_board(rows), t) == images[t]
+
+
+def test_canonical_form_is_shared_by_all_images():
+    rng = random.Random(1)
+    for size in (3, 4, 5):
+        for _ in range(50):
+            rows = random_rows(rng, size)
+            canon, t = sym.canonicalize_rows(rows)
+            assert sym.transform_rows(rows, t) == canon
+            for k in range(sym.N_TRANSFORMS):
+                assert sym.canonical_rows(sym.transform_rows(rows, k)) == canon
+
+    for _ in range(50):
+        bits = bb.pack_board(random_rows(rng))
+        canon, t = sym.canonicalize(bits)
+        assert sym.apply_transform(bits, t) == canon
+        assert all(sym.canonical(img) == canon for img in sym.all_transforms(bits))
+
+
+def test_evaluate_is_symmetry_invariant():
+    rng = random.Random(2)
+    for _ in range(100):
+        rows = random_rows(rng)
+        value = evaluate([list(r) for r in rows])
+        for t in range(sym.N_TRANSFORMS):
+            assert evaluate([list(r) for r in sym.transform_rows(rows, t)]) == value
+
+
+def test_moves_commute_with_transforms():
+    rng = random.Random(3)
+    for _ in range(100):
+        bits = bb.pack_board(random_rows(rng))
+        for t in range(sym.N_TRANSFORMS):
+            image = sym.apply_transform(bits, t)
+            for move in ALLOWED_MOVES:
+                after, _, gain = bb.execute_move(bits, move)
+                mapped = sym.transform_move(move, t)
+                after_image, _, gain_image = bb.execute_move(image, mapped)
+                assert sym.apply_transform(after, t) == after_image
+                assert gain == gain_image
+                assert sym.inverse_move(mapped, t) == move
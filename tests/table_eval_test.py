@@ -0,0 +1,66 @@
+# tests/table_eval_test.py
+import random
+
+import pytest
+
+from src.game import bitboard as bb
+import numpy as np
+
+from src.heuristics.evaluate import evaluate, evaluate_batch
+from src.heuristics.table_eval import get_evaluator, get_table_evaluator
+from src.heuristics.weights_loader import load_weights
+
+
+def random_board(rng: random.Random):
+    vals = [0, 0, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048]
+    return [[rng.choice(vals) for _ in range(4)] for _ in range(4)]
+
+
+@pytest.mark.parametrize("preset", ["balanced", "aggressive", "conservative", "tuned_greedy_best_score"])
+def test_table_evaluator_matches_evaluate(preset):
+    weights = load_weights(preset)
+    table = get_table_evaluator(weights)
+    rng = random.Random(0)
+    for _ in range(500):
+        board = random_board(rng)
+        expected = evaluate(board, weights)
+        assert table(board) == pytest.approx(expected, rel=1e-12, abs=1e-9)
+        assert table.evaluate_bits(bb.pack_board(board)) == pytest.approx(expected, rel=1e-12, abs=1e-9)
+
+
+def test_table_evaluator_edge_boards():
+    table = get_table_evaluator()
+    for board in ([[0] * 4 for _ in range(4)], [[2] * 4 for _ in range(4)]):
+        assert table(board) == pytest.approx(evaluate(board))
+
+
+def test_get_evaluator_modes():
+    board = [[2, 4, 0, 0], [0, 0, 8, 0], [0, 0, 0, 0], [16, 0, 0, 2]]
+    assert get_evaluator(None, "scalar")(board) == evaluate(board)
+    assert get_evaluator(None, "table")(board) == pytest.approx(evaluate(board))
+    assert get_table_evaluator(load_weights("balanced")) is get_table_evaluator(load_weights("balanced"))
+    with pytest.raises(ValueError):
+        get_evaluator(None, "nope")
+
+
+@pytest.mark.parametrize("preset", ["balanced", "aggressive", "conservative", "tuned_greedy_best_score"])
+def test_evaluate_batch_matches_evaluate_exactly(preset):
+    weights = load_weights(preset)
+    rng = random.Random(3)
+    boards = [random_board(rng) for _ in range(500)]
+    boards += [[[0] * 4 for _ in range(4)], [[2] * 4 for _ in range(4)]]
+
+    values = evaluate_batch(boards, weights)
+    stacked = evaluate_batch(np.array(boards), weights)
+    for i, board in enumerate(boards):
+        assert values[i] == evaluate(board, weights)
+        assert stacked[i] == values[i]
+
+
+def test_evaluate_batch_other_sizes_and_empty_input():
+    rng = random.Random(4)
+    vals = [0, 2, 4, 8, 64, 1024]
+    boards = [[[rng.choice(vals) for _ in range(5)] for _ in range(5)] for _ in range(50)]
+    values = evaluate_batch(boards)
+    assert [float(v) for v in values] == [evaluate(b) for b in boards]
+    assert evaluate_batch([]).shape == (0,)
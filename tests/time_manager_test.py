@@ -0,0 +1,47 @@
+# tests/time_manager_test.py
+from src.agents.expectimax import ExpectimaxAgent
+from src.agents.time_manager import TimeManager
+from src.game.state import GameState
+from src.heuristics.weights_loader import load_weights
+
+
+def test_single_legal_move_returns_without_search():
+    board = [
+        [0, 2, 4, 2],
+        [0, 4, 2, 4],
+        [0, 2, 4, 2],
+        [0, 4, 2, 4],
+    ]
+    state = GameState(board=board)
+    assert state.legal_moves() == ["left"]
+
+    tm = TimeManager(1000.0, per_moves=10)
+    agent = ExpectimaxAgent(weights=load_weights("balanced"), max_depth=4, time_manager=tm)
+    assert agent.choose_move(state) == state.legal_moves()[0]
+    assert agent.last_depth == 0
+    assert tm.last_allocated_ms == 0.0 and tm.moves == 1
+
+
+def test_crowded_positions_get_more_time():
+    open_board = [[2048, 2, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]]
+    crowded = [[2, 4, 8, 16], [32, 2048, 4, 2], [8, 16, 2, 0], [4, 8, 0, 2]]
+    assert TimeManager.difficulty(crowded, 2, 2) > TimeManager.difficulty(open_board, 4, 14)
+    assert TimeManager.difficulty(crowded, 1, 2) == 0.0
+
+
+def test_window_budget_is_respected_and_new_game_resets():
+    tm = TimeManager(200.0, per_moves=20, max_factor=4.0)
+    agent = ExpectimaxAgent(weights=load_weights("balanced"), max_depth=6, time_manager=tm)
+    state = GameState(seed=1)
+
+    spent = []
+    for _ in range(20):
+        if state.is_terminal():
+            break
+        state.step(agent.choose_move(state))
+        spent.append(tm.spent_ms)
+    # twardy limit nigdy nie przekracza reszty budżetu (plus narzut ostatniej iteracji)
+    assert spent[-1] <= 200.0 * 1.25
+
+    agent.choose_move(GameState(seed=2))
+    assert tm.moves == 1
@@ -0,0 +1,76 @@
+# tests/transposition_test.py
+import random
+
+from src.agents.expectimax import ExpectimaxAgent
+from src.agents.transposition import CHANCE_NODE, ENTRY_BYTES, MAX_NODE, TranspositionTable, pack_rows
+from src.game import bitboard as bb
+from src.game.state import GameState
+from src.heuristics.weights_loader import load_weights
+
+
+def test_pack_rows_matches_bitboard_pack():
+    rng = random.Random(0)
+    vals = [0, 2, 4, 8, 1024, 32768]
+    for _ in range(200):
+        board = [[rng.choice(vals) for _ in range(4)] for _ in range(4)]
+        assert pack_rows(board) == bb.pack_board(board)
+        assert pack_rows(tuple(map(tuple, board))) == bb.pack_board(board)
+
+
+def test_deeper_entries_answer_shallower_queries():
+    tt = TranspositionTable(size_mb=0.01)
+    tt.store(0x1234, MAX_NODE, 3, 42.0)
+
+    assert tt.lookup(0x1234, MAX_NODE, 3) == 42.0
+    assert tt.lookup(0x1234, MAX_NODE, 1) == 42.0
+    assert tt.lookup(0x1234, MAX_NODE, 4) is None
+    assert tt.lookup(0x1234, CHANCE_NODE, 1) is None
+    assert tt.lookup(0x4321, MAX_NODE, 1) is None
+
+    # płytszy zapis nie nadpisuje głębszego, głębszy - tak
+    tt.store(0x1234, MAX_NODE, 2, 1.0)
+    assert tt.lookup(0x1234, MAX_NODE, 3) == 42.0
+    tt.store(0x1234, MAX_NODE, 5, 7.0)
+    assert tt.lookup(0x1234, MAX_NODE, 5) == 7.0
+
+    stats = tt.stats()
+    assert stats["hits"] == 4 and stats["shallow"] == 1 and stats["lookups"] == 7
+
+
+def test_budget_and_replacement_prefers_old_generations():
+    tt = TranspositionTable(size_mb=16 * ENTRY_BYTES / (1 << 20), probe=4)
+    assert tt.size == 16
+
+    rng = random.Random(1)
+    old = [rng.getrandbits(64) for _ in range(64)]
+    for key in old:
+        tt.store(key, MAX_NODE, 1, 1.0)
+    assert tt.used == 16
+    assert tt.stats()["evictions"] == 64 - 16
+
+    tt.new_search()
+    fresh = [rng.getrandbits(64) for _ in range(4)]
+    for key in fresh:
+        tt.store(key, CHANCE_NODE, 1, 2.0)
+    # wpisy z bieżącej generacji wypierają tylko stare
+    assert all(tt.lookup(key, CHANCE_NODE, 1) == 2.0 for key in fresh)
+
+
+def test_keys_longer_than_64_bits():
+    tt = TranspositionTable(size_mb=0.01)
+    big = bb.get_engine(5).pack_board([[2] * 5 for _ in range(5)])
+    assert big >= 1 << 64
+    tt.store(big, CHANCE_NODE, 2, 3.5)
+    assert tt.lookup(big, CHANCE_NODE, 2) == 3.5
+
+
+def test_table_survives_across_moves():
+    agent = ExpectimaxAgent(weights=load_weights("balanced"), max_depth=4, tt_mb=1)
+    state = GameState(seed=3)
+    for _ in range(5):
+        state.step(agent.choose_move(state))
+
+    stats = agent.tt_stats()
+    assert stats["stores"] > 0 and stats["hits"] > 0
+    assert agent.tt.generation == 6
+    assert 0.0 < stats["fill"] <= 1.0